@@ -21,6 +21,7 @@ Dependências:
 - pymarkdownlnt>=0.9.33 (para validação/linting de Markdown)
 - mdformat>=0.7.17 (para formatação automática de Markdown)
 - mdformat-frontmatter>=0.4.1 (para preservar YAML frontmatter)
+- orjson (opcional, acelera o parse dos manifestos JSON)
 
 Uso:
     ./CI.py                                      # Valida JSON + Markdown
@@ -30,6 +31,15 @@ Uso:
     ./CI.py --markdown-strict                   # Trata warnings MD como erros
     ./CI.py --format-markdown                   # Formata + Valida Markdown
     ./CI.py --format-markdown --check-format    # Apenas verifica formatação
+    ./CI.py --mdformat-engine inprocess         # mdformat via API Python (sem subprocess)
+    ./CI.py --jobs 8                            # Markdown em 8 processos paralelos
+    ./CI.py --no-cache                          # Ignora o cache de resultados (.ci-cache/)
+    ./CI.py --clear-cache                       # Apaga o cache antes de validar
+    ./CI.py --changed-since origin/main         # Valida só o que mudou desde a ref
+    ./CI.py --watch --check-format              # Revalida a cada arquivo salvo
+    ./CI.py --format jsonl > findings.jsonl     # Findings em JSON Lines (streaming)
+    ./CI.py --format sarif > ci.sarif           # Findings em SARIF 2.1.0
+    ./CI.py --profile --profile-trace t.json    # Tempos por fase/arquivo + Chrome trace
     ./CI.py --verbose --markdown-strict         # Combinações
 
     # Com UV (recomendado):
@@ -46,11 +56,23 @@ Exit codes:
     1 - Validação falhou (erros encontrados)
 """
 
+import ctypes
+import ctypes.util
+import hashlib
 import json
+import os
+import select
+import struct
 import sys
 import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from functools import partial
+from importlib import metadata as importlib_metadata
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Set, Tuple, Optional
 import argparse
 
 try:
@@ -58,6 +80,17 @@ try:
 except ImportError:
     PyMarkdownApi = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import mdformat
+    import mdformat.plugins
+except ImportError:
+    mdformat = None
+
 
 class Colors:
     """Cores ANSI para terminal"""
@@ -71,50 +104,892 @@ class Colors:
     RESET = '\033[0m'
 
 
-class JSONValidator:
-    """Validador de arquivos JSON do claudecode_plugins"""
+@dataclass
+class PluginInfo:
+    """Plugin encontrado em `plugins/<nome>/` pelo RepoIndex"""
+
+    name: str
+    path: Path
+    # Nomes (arquivos e diretórios) no nível raiz do plugin
+    entries: Set[str] = field(default_factory=set)
+    # True se existe `.claude-plugin/plugin.json`
+    nested_manifest: bool = False
+
+    # Componentes reconhecidos: entrada no diretório do plugin -> nome exibido
+    COMPONENTS = (
+        ("commands", "commands"),
+        ("agents", "agents"),
+        ("hooks", "hooks"),
+        ("skills", "skills"),
+        (".mcp.json", "mcp"),
+    )
+
+    @classmethod
+    def from_dir(cls, path: Path) -> "PluginInfo":
+        """Cria o PluginInfo lendo apenas o diretório do plugin"""
+        info = cls(path.name, path)
+        try:
+            with os.scandir(path) as it:
+                info.entries = {entry.name for entry in it}
+        except OSError:
+            pass
+        info.nested_manifest = (path / ".claude-plugin" / "plugin.json").is_file()
+        return info
+
+    @property
+    def manifest(self) -> Optional[Path]:
+        """plugin.json do plugin (.claude-plugin/ tem prioridade sobre a raiz)"""
+        if self.nested_manifest:
+            return self.path / ".claude-plugin" / "plugin.json"
+        if "plugin.json" in self.entries:
+            return self.path / "plugin.json"
+        return None
+
+    @property
+    def components(self) -> List[str]:
+        return [label for entry, label in self.COMPONENTS if entry in self.entries]
+
+    @property
+    def has_readme(self) -> bool:
+        return "README.md" in self.entries
+
+
+class RepoIndex:
+    """Índice do repositório construído em uma única varredura
+
+    Percorre a árvore com `os.scandir`, podando diretórios ignorados durante a
+    travessia (não depois), e registra plugins, seus manifestos e componentes e
+    todos os arquivos Markdown. JSONValidator, MarkdownFormatter e
+    MarkdownValidator consomem o mesmo índice.
+    """
+
+    IGNORED_DIRS = {
+        ".git", "node_modules", ".venv", "venv", "__pycache__",
+        ".ci-cache", ".pytest_cache", ".mypy_cache", ".ruff_cache", ".tox", ".nox",
+    }
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.plugins_dir = root / "plugins"
+        self.has_plugins_dir = False
+        self.plugins: Dict[str, PluginInfo] = {}
+        self.markdown_files: List[Path] = []
+
+    @classmethod
+    def scan(cls, root: Path) -> "RepoIndex":
+        index = cls(root)
+        index._scan()
+        return index
+
+    def _scan(self):
+        stack: List[Tuple[str, Tuple[str, ...]]] = [(str(self.root), ())]
+        while stack:
+            directory, rel = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+
+            in_plugins = rel == ("plugins",)
+            plugin = self.plugins.get(rel[1]) if len(rel) >= 2 and rel[0] == "plugins" else None
+
+            with it:
+                for entry in it:
+                    if plugin is not None:
+                        if len(rel) == 2:
+                            plugin.entries.add(entry.name)
+                        elif len(rel) == 3 and rel[2] == ".claude-plugin" \
+                                and entry.name == "plugin.json":
+                            plugin.nested_manifest = True
+
+                    # Plugins podem ser links simbólicos; abaixo deles não seguimos links
+                    if entry.is_dir(follow_symlinks=in_plugins):
+                        if entry.name in self.IGNORED_DIRS:
+                            continue
+                        if in_plugins:
+                            self.plugins[entry.name] = PluginInfo(entry.name, Path(entry.path))
+                        elif rel == () and entry.name == "plugins":
+                            self.has_plugins_dir = True
+                        stack.append((entry.path, rel + (entry.name,)))
+                    elif entry.name.endswith(".md"):
+                        self.markdown_files.append(Path(entry.path))
+
+        self.markdown_files.sort()
+
+    def is_ignored(self, path: Path) -> bool:
+        """Indica se o path está dentro de um diretório ignorado"""
+        try:
+            parts = path.relative_to(self.root).parts
+        except ValueError:
+            return True
+        return any(part in self.IGNORED_DIRS for part in parts[:-1])
+
+    def plugin(self, plugin_path: Path) -> PluginInfo:
+        """PluginInfo de um diretório de plugin (fora do índice, lê o diretório)"""
+        if plugin_path.parent == self.plugins_dir and plugin_path.name in self.plugins:
+            return self.plugins[plugin_path.name]
+        return PluginInfo.from_dir(plugin_path)
+
+
+class ManifestStore:
+    """Carrega e faz o parse de cada manifesto JSON uma única vez
+
+    marketplace.json e os plugin.json são lidos por várias verificações
+    (sintaxe, campos, consistência, chave de cache); todas consultam este
+    store. Usa orjson quando disponível; se o orjson rejeitar o arquivo, o
+    parse é refeito com o módulo json para manter exatamente as mesmas
+    mensagens de erro.
+    """
+
+    def __init__(self):
+        self._raw: Dict[Path, bytes] = {}
+        self._parsed: Dict[Path, Tuple[Any, Optional[Exception]]] = {}
+
+    def read_bytes(self, path: Path) -> bytes:
+        """Conteúdo bruto do manifesto (lido do disco apenas na primeira vez)"""
+        if path not in self._raw:
+            self._raw[path] = path.read_bytes()
+        return self._raw[path]
+
+    def load(self, path: Path) -> Any:
+        """Manifesto já parseado; relança o mesmo erro em chamadas seguintes"""
+        if path not in self._parsed:
+            try:
+                self._parsed[path] = (self._parse(self.read_bytes(path)), None)
+            except (OSError, ValueError) as e:
+                self._parsed[path] = (None, e)
+
+        data, error = self._parsed[path]
+        if error is not None:
+            raise error
+        return data
+
+    @staticmethod
+    def _parse(raw: bytes) -> Any:
+        text = raw.decode('utf-8')
+        if orjson is not None:
+            try:
+                return orjson.loads(text)
+            except orjson.JSONDecodeError:
+                pass
+        return json.loads(text)
+
+    def invalidate(self, path: Optional[Path] = None):
+        """Descarta o manifesto (ou todos) para que seja relido"""
+        if path is None:
+            self._raw.clear()
+            self._parsed.clear()
+        else:
+            self._raw.pop(path, None)
+            self._parsed.pop(path, None)
+
+
+MARKETPLACE_FILE = ".claude-plugin/marketplace.json"
+
+
+@dataclass
+class Finding:
+    """Resultado estruturado (erro ou aviso) compartilhado por todos os validadores"""
+
+    severity: str
+    message: str
+    file: Optional[str] = None
+    line: Optional[int] = None
+    column: Optional[int] = None
+    rule_id: Optional[str] = None
+    # Segundos desde o início da execução, preenchido pelo sink
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "finding",
+            "severity": self.severity,
+            "rule_id": self.rule_id,
+            "file": self.file,
+            "line": self.line,
+            "column": self.column,
+            "message": self.message,
+            "elapsed": round(self.elapsed, 6),
+        }
+
+
+class FindingSink:
+    """Destino dos findings em formato de máquina (--format jsonl|sarif)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.start = time.perf_counter()
+
+    def emit(self, finding: Finding):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink(FindingSink):
+    """Emite cada finding como uma linha JSON assim que é produzido"""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.counts = {"error": 0, "warning": 0}
+
+    def emit(self, finding: Finding):
+        finding.elapsed = time.perf_counter() - self.start
+        self.counts[finding.severity] += 1
+        self.stream.write(json.dumps(finding.to_dict(), ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        summary = {
+            "type": "summary",
+            "errors": self.counts["error"],
+            "warnings": self.counts["warning"],
+            "elapsed": round(time.perf_counter() - self.start, 6),
+        }
+        self.stream.write(json.dumps(summary) + "\n")
+        self.stream.flush()
+
+
+class SarifSink(FindingSink):
+    """Acumula os findings e grava um log SARIF 2.1.0 ao final
+
+    SARIF é um único documento JSON, então não pode ser transmitido
+    incrementalmente; para consumo em streaming use `--format jsonl`.
+    """
+
+    SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.findings: List[Finding] = []
+
+    def emit(self, finding: Finding):
+        finding.elapsed = time.perf_counter() - self.start
+        self.findings.append(finding)
+
+    def close(self):
+        rule_ids = sorted({f.rule_id for f in self.findings if f.rule_id})
+        results = []
+        for finding in self.findings:
+            result: Dict[str, Any] = {
+                "level": finding.severity,
+                "message": {"text": finding.message},
+                "properties": {"elapsed": round(finding.elapsed, 6)},
+            }
+            if finding.rule_id:
+                result["ruleId"] = finding.rule_id
+            if finding.file:
+                location: Dict[str, Any] = {"artifactLocation": {"uri": finding.file}}
+                if finding.line:
+                    location["region"] = {"startLine": finding.line}
+                    if finding.column:
+                        location["region"]["startColumn"] = finding.column
+                result["locations"] = [{"physicalLocation": location}]
+            results.append(result)
+
+        sarif = {
+            "$schema": self.SCHEMA,
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {"driver": {
+                    "name": "claudecode-plugins-ci",
+                    "informationUri": "https://github.com/cadugevaerd/claudecode_plugins",
+                    "rules": [{"id": rule_id} for rule_id in rule_ids],
+                }},
+                "results": results,
+            }],
+        }
+        json.dump(sarif, self.stream, ensure_ascii=False, indent=2)
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class FileTiming(NamedTuple):
+    """Tempo gasto em uma verificação de arquivo"""
+
+    file: str
+    # Início (time.time(), comparável entre processos) e duração em segundos
+    start: float
+    elapsed: float
+    pid: int
+    # Subprocessos iniciados durante a verificação, por comando
+    spawns: Dict[str, int]
 
-    def __init__(self, verbose: bool = False, fix: bool = False):
+
+# Subprocessos iniciados por este processo, por comando (ver run_command)
+SPAWN_COUNTS: Dict[str, int] = {}
+
+
+def run_command(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run contabilizando o subprocesso em SPAWN_COUNTS"""
+    SPAWN_COUNTS[cmd[0]] = SPAWN_COUNTS.get(cmd[0], 0) + 1
+    return subprocess.run(cmd, **kwargs)
+
+
+class Profiler:
+    """Instrumentação do --profile: tempo por fase, por arquivo e subprocessos"""
+
+    def __init__(self):
+        self.start = time.time()
+        self.pid = os.getpid()
+        self.phases: List[Tuple[str, float, float]] = []
+        self.files: List[Tuple[str, FileTiming]] = []
+        self.current_phase = "-"
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Mede o tempo de parede de uma fase (marketplace, plugins, format...)"""
+        previous, self.current_phase = self.current_phase, name
+        started = time.time()
+        clock = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, started, time.perf_counter() - clock))
+            self.current_phase = previous
+
+    def add_files(self, timings: List[FileTiming]):
+        self.files.extend((self.current_phase, timing) for timing in timings)
+
+    def spawn_counts(self) -> Dict[str, int]:
+        """Subprocessos deste processo somados aos iniciados pelos workers"""
+        totals = dict(SPAWN_COUNTS)
+        for _, timing in self.files:
+            if timing.pid != self.pid:
+                for command, count in timing.spawns.items():
+                    totals[command] = totals.get(command, 0) + count
+        return totals
+
+    def print_report(self, top: int = 10):
+        """Imprime fases, subprocessos e os arquivos mais lentos"""
+        print(f"\n{Colors.BOLD}{'=' * 60}{Colors.RESET}")
+        print(f"{Colors.BOLD}⏱️  PERFIL DE EXECUÇÃO{Colors.RESET}")
+        print(f"{Colors.BOLD}{'=' * 60}{Colors.RESET}\n")
+
+        print(f"{Colors.BOLD}Fases:{Colors.RESET}")
+        for name, _, elapsed in self.phases:
+            print(f"  {name:<14} {elapsed * 1000:10.1f} ms")
+        print(f"  {'total':<14} {(time.time() - self.start) * 1000:10.1f} ms\n")
+
+        spawns = self.spawn_counts()
+        details = ", ".join(f"{command}: {count}" for command, count in sorted(spawns.items()))
+        workers = {timing.pid for _, timing in self.files if timing.pid != self.pid}
+        print(f"{Colors.BOLD}Subprocessos:{Colors.RESET} {sum(spawns.values())}"
+              f"{f' ({details})' if details else ''}; workers do pool: {len(workers)}\n")
+
+        if not self.files:
+            return
+        print(f"{Colors.BOLD}Top {top} arquivos mais lentos:{Colors.RESET}")
+        slowest = sorted(self.files, key=lambda item: item[1].elapsed, reverse=True)[:top]
+        for phase, timing in slowest:
+            spawned = sum(timing.spawns.values())
+            suffix = f"  ({spawned} subprocesso(s))" if spawned else ""
+            print(f"  {timing.elapsed * 1000:10.1f} ms  [{phase}] {timing.file}{suffix}")
+        print()
+
+    def write_chrome_trace(self, path: Path):
+        """Grava os tempos no formato Chrome Trace (chrome://tracing, Perfetto)"""
+        def microseconds(value: float) -> float:
+            return round(value * 1e6, 3)
+
+        events: List[Dict[str, Any]] = [{
+            "name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.pid,
+            "args": {"name": "principal"},
+        }]
+        for name, started, elapsed in self.phases:
+            events.append({
+                "name": name, "cat": "phase", "ph": "X", "pid": self.pid, "tid": self.pid,
+                "ts": microseconds(started - self.start), "dur": microseconds(elapsed),
+            })
+        for pid in sorted({timing.pid for _, timing in self.files} - {self.pid}):
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": self.pid, "tid": pid,
+                "args": {"name": f"worker {pid}"},
+            })
+        for phase, timing in self.files:
+            events.append({
+                "name": timing.file, "cat": phase, "ph": "X", "pid": self.pid, "tid": timing.pid,
+                "ts": microseconds(timing.start - self.start),
+                "dur": microseconds(timing.elapsed),
+                "args": {"spawns": timing.spawns},
+            })
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# Mensagem gravada: (nível, mensagem, localização/regra do finding)
+Record = Tuple[str, str, Dict[str, Any]]
+
+# Resultado de um arquivo: (ok, mensagens gravadas, tempos, transitório)
+FileOutcome = Tuple[bool, List[Record], List[FileTiming], bool]
+
+
+class ResultCache:
+    """Cache persistente de resultados por arquivo em `.ci-cache/`
+
+    Cada entrada guarda o resultado (ok + mensagens gravadas) de uma verificação
+    e é indexada por uma chave que combina o hash do conteúdo do arquivo com o
+    "contexto" da ferramenta: hash do próprio CI.py, versão do mdformat ou
+    pymarkdown e hash do `.markdownlintrc.json`. Qualquer mudança em um desses
+    itens gera chaves novas; entradas antigas deixam de ser usadas e são
+    descartadas pelo limite LRU ao salvar.
+    """
+
+    VERSION = 2
+    DEFAULT_MAX_ENTRIES = 20000
+
+    def __init__(self, root: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.root = root
+        self.cache_dir = root / ".ci-cache"
+        self.path = self.cache_dir / "results.json"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._salts: Dict[str, str] = {}
+        self._entries: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        return data.get("entries", {})
+
+    @staticmethod
+    def hash_bytes(*parts: bytes) -> str:
+        """Hash sha256 de uma sequência de blocos de bytes"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def salt(self, namespace: str) -> str:
+        """Contexto de ferramenta/configuração de um tipo de verificação"""
+        if namespace not in self._salts:
+            parts = [namespace.encode(), Path(__file__).read_bytes()]
+            if namespace == "format":
+                parts.append(_package_version("mdformat").encode())
+                parts.append(_package_version("mdformat-frontmatter").encode())
+                parts.append(_read_optional(self.root / ".mdformat.toml"))
+            elif namespace == "lint":
+                parts.append(_package_version("pymarkdownlnt").encode())
+                parts.append(_read_optional(self.root / ".markdownlintrc.json"))
+            self._salts[namespace] = self.hash_bytes(*parts)
+        return self._salts[namespace]
+
+    def key(self, namespace: str, *parts: bytes) -> str:
+        """Chave de cache: contexto da ferramenta + partes (conteúdo, opções)"""
+        return self.hash_bytes(self.salt(namespace).encode(), *parts)
+
+    def get(self, key: str) -> Optional[Tuple[bool, List[Record]]]:
+        """Retorna (ok, mensagens) se a chave estiver no cache"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["atime"] = time.time()
+        self._dirty = True
+        return entry["ok"], [tuple(record) for record in entry["records"]]
+
+    def put(self, key: str, ok: bool, records: List[Record]):
+        """Armazena o resultado de uma verificação"""
+        self._entries[key] = {"ok": ok, "records": records, "atime": time.time()}
+        self._dirty = True
+
+    def clear(self):
+        """Remove todas as entradas (em memória e em disco)"""
+        self._entries = {}
+        self._dirty = False
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        """Grava o cache em disco, descartando as entradas menos usadas (LRU)"""
+        if not self._dirty:
+            return
+        if len(self._entries) > self.max_entries:
+            newest = sorted(
+                self._entries.items(), key=lambda item: item[1]["atime"], reverse=True
+            )[:self.max_entries]
+            self._entries = dict(newest)
+
+        self.cache_dir.mkdir(exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "entries": self._entries}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def _package_version(name: str) -> str:
+    try:
+        return importlib_metadata.version(name)
+    except importlib_metadata.PackageNotFoundError:
+        return "not-installed"
+
+
+def _read_optional(path: Path) -> bytes:
+    try:
+        return path.read_bytes()
+    except OSError:
+        return b""
+
+
+class Reporter:
+    """Base comum dos validadores: registra erros, avisos e sucessos
+
+    As mensagens podem ser gravadas (`record`) em vez de impressas e depois
+    reproduzidas (`replay`) em outra instância, o que permite executar a
+    validação em processos worker e mesclar os resultados no processo principal.
+    """
+
+    def __init__(self, verbose: bool = False, root: Optional[Path] = None,
+                 sink: Optional[FindingSink] = None):
         self.verbose = verbose
-        self.fix = fix
         self.errors: List[str] = []
         self.warnings: List[str] = []
         self.success: List[str] = []
-        self.root = Path(__file__).parent
+        self.timings: List[FileTiming] = []
+        self.root = root if root is not None else Path(__file__).parent
+        self.cache: Optional[ResultCache] = None
+        self._index: Optional[RepoIndex] = None
+        # Recebido no construtor: os validadores já registram achados no __init__
+        self.sink = sink
+        self.profiler: Optional[Profiler] = None
+        self._records: Optional[List[Record]] = None
+        self._transient = False
+
+    def _emit(self, level: str, message: str, location: Dict[str, Any]) -> bool:
+        """Grava a mensagem se houver gravação ativa. Retorna True se gravou"""
+        if self._records is None:
+            return False
+        self._records.append((level, message, location))
+        return True
 
-    def log_error(self, message: str):
-        """Registra erro"""
+    def log_error(self, message: str, **location):
+        """Registra erro (`location`: file, line, column, rule_id)"""
+        if self._emit("error", message, location):
+            return
         self.errors.append(message)
         print(f"{Colors.RED}❌ {message}{Colors.RESET}")
+        if self.sink is not None:
+            self.sink.emit(Finding("error", message, **location))
 
-    def log_warning(self, message: str):
-        """Registra aviso"""
+    def log_warning(self, message: str, **location):
+        """Registra aviso (`location`: file, line, column, rule_id)"""
+        if self._emit("warning", message, location):
+            return
         self.warnings.append(message)
         print(f"{Colors.YELLOW}⚠️  {message}{Colors.RESET}")
+        if self.sink is not None:
+            self.sink.emit(Finding("warning", message, **location))
 
-    def log_success(self, message: str):
+    def log_success(self, message: str, **location):
         """Registra sucesso"""
+        if self._emit("success", message, location):
+            return
         self.success.append(message)
         if self.verbose:
             print(f"{Colors.GREEN}✅ {message}{Colors.RESET}")
 
-    def log_info(self, message: str):
+    def log_info(self, message: str, **location):
         """Registra informação"""
+        if self._emit("info", message, location):
+            return
         if self.verbose:
             print(f"{Colors.CYAN}ℹ️  {message}{Colors.RESET}")
 
+    @contextmanager
+    def record(self) -> Iterator[List[Record]]:
+        """Grava as mensagens registradas no bloco em vez de imprimi-las"""
+        previous = self._records
+        self._records = []
+        try:
+            yield self._records
+        finally:
+            self._records = previous
+
+    @property
+    def index(self) -> RepoIndex:
+        """Índice do repositório (varrido sob demanda se não foi fornecido)"""
+        if self._index is None:
+            self._index = RepoIndex.scan(self.root)
+        return self._index
+
+    @index.setter
+    def index(self, value: Optional[RepoIndex]):
+        self._index = value
+
+    def reset(self):
+        """Limpa os resultados acumulados (usado entre ciclos do modo --watch)"""
+        self.errors.clear()
+        self.warnings.clear()
+        self.success.clear()
+        self.timings.clear()
+
+    def mark_transient(self):
+        """Marca o resultado em gravação como não cacheável (timeout, erro de I/O, arquivo reescrito)"""
+        self._transient = True
+
+    def phase(self, name: str):
+        """Contexto que mede uma fase quando o --profile está ativo"""
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def timed_call(self, method_name: str, file_path: Path) -> Tuple[bool, FileTiming]:
+        """Executa um método medindo tempo e subprocessos iniciados"""
+        spawns_before = dict(SPAWN_COUNTS)
+        started = time.time()
+        clock = time.perf_counter()
+        try:
+            ok = getattr(self, method_name)(file_path)
+        finally:
+            elapsed = time.perf_counter() - clock
+        spawns = {
+            command: count - spawns_before.get(command, 0)
+            for command, count in SPAWN_COUNTS.items()
+            if count != spawns_before.get(command, 0)
+        }
+        timing = FileTiming(
+            str(file_path.relative_to(self.root)), started, elapsed, os.getpid(), spawns
+        )
+        return ok, timing
+
+    def run_recorded(self, method_name: str, file_path: Path) -> FileOutcome:
+        """Executa um método gravando mensagens em vez de imprimi-las"""
+        self._transient = False
+        with self.record() as records:
+            ok, timing = self.timed_call(method_name, file_path)
+        return ok, records, [timing], self._transient
+
+    def cache_key(self, method_name: str, file_path: Path) -> Optional[str]:
+        """Chave de cache do resultado de `method_name` para o arquivo (None = não cachear)"""
+        return None
+
+    def replay(self, records: List[Record]):
+        """Reproduz mensagens gravadas por `record`"""
+        for level, message, location in records:
+            getattr(self, f"log_{level}")(message, **location)
+
+    def worker_factory(self) -> Callable[[], "Reporter"]:
+        """Retorna um callable (picklable) que cria a instância usada nos workers
+
+        Os workers não imprimem nada: suas mensagens são gravadas e reproduzidas
+        pela instância principal, que aplica o próprio `verbose`.
+        """
+        raise NotImplementedError
+
+    def process_files(self, files: List[Path], method_name: str, jobs: int = 1) -> bool:
+        """Aplica `method_name` a cada arquivo, em série ou em um pool de processos
+
+        No modo paralelo cada worker mantém sua própria instância (e portanto seu
+        próprio PyMarkdownApi/mdformat). As mensagens são mescladas na ordem de
+        `files`, então a saída é a mesma da execução serial.
+
+        Com cache ativo, arquivos cujo resultado já está em `.ci-cache/` não são
+        reprocessados: as mensagens gravadas são reproduzidas diretamente.
+        """
+        keys: Dict[Path, Optional[str]] = {}
+        cached: Dict[Path, Tuple[bool, List[Record]]] = {}
+        if self.cache is not None:
+            for file_path in files:
+                keys[file_path] = self.cache_key(method_name, file_path)
+                hit = self.cache.get(keys[file_path]) if keys[file_path] else None
+                if hit is not None:
+                    cached[file_path] = hit
+
+        pending = [file_path for file_path in files if file_path not in cached]
+        parallel = jobs > 1 and len(pending) > 1
+
+        executor = None
+        outcomes: Iterator[FileOutcome] = iter(())
+        if parallel:
+            chunksize = max(1, len(pending) // (jobs * 4))
+            executor = ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(self.worker_factory(),)
+            )
+            tasks = [(method_name, file_path) for file_path in pending]
+            outcomes = executor.map(_run_worker_task, tasks, chunksize=chunksize)
+
+        all_ok = True
+        try:
+            for file_path in files:
+                records: Optional[List[Record]] = None
+                if file_path in cached:
+                    ok, records = cached[file_path]
+                    timings: List[FileTiming] = []
+                    transient = True
+                elif parallel:
+                    ok, records, timings, transient = next(outcomes)
+                elif self.cache is None:
+                    # Sem cache nem workers: execução direta, sem gravação
+                    ok, timing = self.timed_call(method_name, file_path)
+                    timings = [timing]
+                    transient = True
+                else:
+                    ok, records, timings, transient = self.run_recorded(method_name, file_path)
+
+                key = keys.get(file_path)
+                if key and not transient:
+                    self.cache.put(key, ok, records)
+
+                if records is not None:
+                    self.replay(records)
+                self.timings.extend(timings)
+                if self.profiler is not None:
+                    self.profiler.add_files(timings)
+                all_ok = all_ok and ok
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return all_ok
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Converte o valor de --jobs em número de workers (0 = número de CPUs)"""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+# Instância do validador mantida por cada processo worker do pool
+_worker: Optional[Reporter] = None
+
+
+def _init_worker(factory: Callable[[], Reporter]):
+    """Inicializa o worker: cria o validador uma única vez por processo"""
+    global _worker
+    _worker = factory()
+
+
+def _run_worker_task(task: Tuple[str, Path]) -> FileOutcome:
+    """Executa um método do validador no worker e devolve mensagens gravadas"""
+    method_name, file_path = task
+    return _worker.run_recorded(method_name, file_path)
+
+
+class ChangeSet:
+    """Arquivos alterados desde uma referência git (modo --changed-since)
+
+    Mapeia os paths alterados para os plugins afetados (`plugins/<nome>/...`),
+    indica se o marketplace.json mudou e lista os arquivos Markdown alterados,
+    para que apenas as verificações afetadas sejam executadas. Uma mudança na
+    configuração do mdformat ou do pymarkdown vale para todos os Markdown.
+    """
+
+    MARKETPLACE = MARKETPLACE_FILE
+    MARKDOWN_CONFIG = (".markdownlintrc.json", ".mdformat.toml")
+
+    def __init__(self, root: Path, paths: Set[str]):
+        self.root = root
+        self.paths = sorted(paths)
+        self.marketplace_changed = self.MARKETPLACE in paths
+        self.markdown_config_changed = any(name in paths for name in self.MARKDOWN_CONFIG)
+        self.plugins: Set[str] = set()
+        for path in self.paths:
+            parts = Path(path).parts
+            if len(parts) > 2 and parts[0] == "plugins":
+                self.plugins.add(parts[1])
+
+    @classmethod
+    def from_git(cls, root: Path, ref: str) -> "ChangeSet":
+        """Coleta paths alterados (commits, staged, working tree e não rastreados)"""
+        # -z: sem ele o git coloca entre aspas e escapa paths não ASCII
+        commands = [
+            ["git", "diff", "--name-only", "-z", "--no-renames", ref, "--"],
+            ["git", "ls-files", "-z", "--others", "--exclude-standard"],
+        ]
+        paths: Set[str] = set()
+        for cmd in commands:
+            try:
+                result = run_command(
+                    cmd,
+                    cwd=root,
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                raise RuntimeError(f"falha ao executar {' '.join(cmd)}: {e}")
+            if result.returncode != 0:
+                raise RuntimeError(f"{' '.join(cmd)}: {result.stderr.strip()}")
+            paths.update(path for path in result.stdout.split("\0") if path)
+        return cls(root, paths)
+
+    def markdown_files(self, index: RepoIndex) -> Optional[List[Path]]:
+        """Arquivos .md alterados que ainda existem e não estão em diretórios ignorados
+
+        None (todos os arquivos) se a configuração do Markdown mudou.
+        """
+        if self.markdown_config_changed:
+            return None
+        files = []
+        for path in self.paths:
+            file_path = self.root / path
+            if path.endswith(".md") and not index.is_ignored(file_path) \
+                    and file_path.is_file():
+                files.append(file_path)
+        return files
+
+
+class JSONValidator(Reporter):
+    """Validador de arquivos JSON do claudecode_plugins"""
+
+    def __init__(self, verbose: bool = False, fix: bool = False,
+                 cache: Optional[ResultCache] = None, index: Optional[RepoIndex] = None,
+                 manifests: Optional[ManifestStore] = None, root: Optional[Path] = None,
+                 sink: Optional[FindingSink] = None):
+        super().__init__(verbose, root, sink)
+        self.fix = fix
+        self.cache = cache
+        self.index = index
+        self.manifests = manifests if manifests is not None else ManifestStore()
+
+    def cache_key(self, method_name: str, file_path: Path) -> Optional[str]:
+        # O resultado de validate_plugin_json depende do manifesto e de quais
+        # componentes e README existem
+        plugin = self.index.plugin(file_path)
+        manifest = plugin.manifest
+        parts = [
+            str(file_path.relative_to(self.root)).encode(),
+            str(manifest).encode() + b"\0" + self.manifests.read_bytes(manifest) if manifest else b"",
+            ",".join(plugin.components).encode(),
+            b"1" if plugin.has_readme else b"0",
+        ]
+        return self.cache.key("json", *parts)
+
     def validate_json_syntax(self, file_path: Path) -> Optional[Dict]:
         """Valida sintaxe JSON de um arquivo"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self.manifests.load(file_path)
             self.log_success(f"JSON válido: {file_path.relative_to(self.root)}")
             return data
         except json.JSONDecodeError as e:
-            self.log_error(f"JSON inválido em {file_path.relative_to(self.root)}: {e}")
+            self.log_error(
+                f"JSON inválido em {file_path.relative_to(self.root)}: {e}",
+                file=str(file_path.relative_to(self.root)),
+                line=e.lineno,
+                column=e.colno,
+                rule_id="json-syntax"
+            )
             return None
         except FileNotFoundError:
-            self.log_error(f"Arquivo não encontrado: {file_path.relative_to(self.root)}")
+            self.log_error(
+                f"Arquivo não encontrado: {file_path.relative_to(self.root)}",
+                file=str(file_path.relative_to(self.root)),
+                rule_id="file-not-found"
+            )
             return None
 
     def validate_marketplace_json(self) -> bool:
@@ -139,11 +1014,17 @@ class JSONValidator:
 
         for field, expected_type in required_fields.items():
             if field not in data:
-                self.log_error(f"marketplace.json: campo obrigatório '{field}' ausente")
+                self.log_error(
+                    f"marketplace.json: campo obrigatório '{field}' ausente",
+                    file=MARKETPLACE_FILE,
+                    rule_id="marketplace-required-field"
+                )
             elif not isinstance(data[field], expected_type):
                 self.log_error(
                     f"marketplace.json: campo '{field}' deve ser {expected_type.__name__}, "
-                    f"encontrado {type(data[field]).__name__}"
+                    f"encontrado {type(data[field]).__name__}",
+                    file=MARKETPLACE_FILE,
+                    rule_id="marketplace-field-type"
                 )
             else:
                 self.log_success(f"marketplace.json: campo '{field}' presente e válido")
@@ -153,7 +1034,11 @@ class JSONValidator:
             owner_required = ["name", "email"]
             for field in owner_required:
                 if field not in data["owner"]:
-                    self.log_error(f"marketplace.json: owner.{field} ausente")
+                    self.log_error(
+                        f"marketplace.json: owner.{field} ausente",
+                        file=MARKETPLACE_FILE,
+                        rule_id="marketplace-owner-field"
+                    )
                 else:
                     self.log_success(f"marketplace.json: owner.{field} presente")
 
@@ -163,7 +1048,11 @@ class JSONValidator:
 
             for idx, plugin in enumerate(data["plugins"]):
                 if not isinstance(plugin, dict):
-                    self.log_error(f"marketplace.json: plugins[{idx}] não é um objeto")
+                    self.log_error(
+                        f"marketplace.json: plugins[{idx}] não é um objeto",
+                        file=MARKETPLACE_FILE,
+                        rule_id="marketplace-plugin-entry"
+                    )
                     continue
 
                 plugin_name = plugin.get("name", f"plugin_{idx}")
@@ -173,7 +1062,9 @@ class JSONValidator:
                     if field not in plugin:
                         self.log_error(
                             f"marketplace.json: plugins[{idx}] ({plugin_name}): "
-                            f"campo '{field}' ausente"
+                            f"campo '{field}' ausente",
+                            file=MARKETPLACE_FILE,
+                            rule_id="marketplace-plugin-field"
                         )
 
                 # Verificar se source path existe
@@ -182,7 +1073,9 @@ class JSONValidator:
                     if not source_path.exists():
                         self.log_error(
                             f"marketplace.json: plugins[{idx}] ({plugin_name}): "
-                            f"path '{plugin['source']}' não existe"
+                            f"path '{plugin['source']}' não existe",
+                            file=MARKETPLACE_FILE,
+                            rule_id="marketplace-source-missing"
                         )
                     else:
                         self.log_success(
@@ -194,27 +1087,26 @@ class JSONValidator:
     def validate_plugin_json(self, plugin_path: Path) -> bool:
         """Valida plugin.json de um plugin específico"""
         plugin_name = plugin_path.name
+        plugin = self.index.plugin(plugin_path)
 
-        # Procurar plugin.json (pode estar em .claude-plugin/ ou na raiz)
-        possible_paths = [
-            plugin_path / ".claude-plugin" / "plugin.json",
-            plugin_path / "plugin.json"
-        ]
-
-        plugin_json_path = None
-        for path in possible_paths:
-            if path.exists():
-                plugin_json_path = path
-                break
+        # plugin.json pode estar em .claude-plugin/ ou na raiz
+        plugin_json_path = plugin.manifest
 
         if not plugin_json_path:
-            self.log_error(f"{plugin_name}: plugin.json não encontrado")
+            self.log_error(
+                f"{plugin_name}: plugin.json não encontrado",
+                file=str(plugin_path.relative_to(self.root)),
+                rule_id="plugin-manifest-missing"
+            )
             return False
 
         data = self.validate_json_syntax(plugin_json_path)
         if not data:
             return False
 
+        manifest_file = str(plugin_json_path.relative_to(self.root))
+        plugin_file = str(plugin_path.relative_to(self.root))
+
         # Campos obrigatórios
         required_fields = {
             "name": str,
@@ -226,11 +1118,17 @@ class JSONValidator:
 
         for field, expected_type in required_fields.items():
             if field not in data:
-                self.log_error(f"{plugin_name}/plugin.json: campo '{field}' ausente")
+                self.log_error(
+                    f"{plugin_name}/plugin.json: campo '{field}' ausente",
+                    file=manifest_file,
+                    rule_id="plugin-required-field"
+                )
             elif not isinstance(data[field], expected_type):
                 self.log_error(
                     f"{plugin_name}/plugin.json: campo '{field}' deve ser "
-                    f"{expected_type.__name__}, encontrado {type(data[field]).__name__}"
+                    f"{expected_type.__name__}, encontrado {type(data[field]).__name__}",
+                    file=manifest_file,
+                    rule_id="plugin-field-type"
                 )
             else:
                 self.log_success(f"{plugin_name}/plugin.json: campo '{field}' válido")
@@ -238,34 +1136,24 @@ class JSONValidator:
         # Validar author
         if "author" in data and isinstance(data["author"], dict):
             if "name" not in data["author"]:
-                self.log_error(f"{plugin_name}/plugin.json: author.name ausente")
+                self.log_error(
+                    f"{plugin_name}/plugin.json: author.name ausente",
+                    file=manifest_file,
+                    rule_id="plugin-author-name"
+                )
             else:
                 self.log_success(f"{plugin_name}/plugin.json: author.name presente")
 
         # Verificar se tem pelo menos um componente
-        has_component = False
-        components = []
-
-        if (plugin_path / "commands").exists():
-            has_component = True
-            components.append("commands")
-        if (plugin_path / "agents").exists():
-            has_component = True
-            components.append("agents")
-        if (plugin_path / "hooks").exists():
-            has_component = True
-            components.append("hooks")
-        if (plugin_path / "skills").exists():
-            has_component = True
-            components.append("skills")
-        if (plugin_path / ".mcp.json").exists():
-            has_component = True
-            components.append("mcp")
+        components = plugin.components
+        has_component = bool(components)
 
         if not has_component:
             self.log_error(
                 f"{plugin_name}: nenhum componente encontrado "
-                "(commands/agents/hooks/skills/mcp)"
+                "(commands/agents/hooks/skills/mcp)",
+                file=plugin_file,
+                rule_id="plugin-no-components"
             )
         else:
             self.log_success(
@@ -273,27 +1161,35 @@ class JSONValidator:
             )
 
         # Verificar README
-        if not (plugin_path / "README.md").exists():
-            self.log_warning(f"{plugin_name}: README.md não encontrado")
+        if not plugin.has_readme:
+            self.log_warning(
+                f"{plugin_name}: README.md não encontrado",
+                file=plugin_file,
+                rule_id="plugin-readme-missing"
+            )
         else:
             self.log_success(f"{plugin_name}: README.md presente")
 
         return True
 
-    def validate_all_plugins(self) -> bool:
-        """Valida todos os plugins"""
+    def validate_all_plugins(self, only: Optional[Set[str]] = None) -> bool:
+        """Valida todos os plugins (ou apenas os nomes em `only`)"""
         print(f"\n{Colors.BOLD}🔌 Validando plugins{Colors.RESET}")
         print("=" * 60)
 
-        plugins_dir = self.root / "plugins"
-        if not plugins_dir.exists():
-            self.log_error("Diretório plugins/ não encontrado")
+        if not self.index.has_plugins_dir:
+            self.log_error("Diretório plugins/ não encontrado", rule_id="plugins-dir-missing")
             return False
 
-        plugin_dirs = [d for d in plugins_dir.iterdir() if d.is_dir()]
+        plugin_dirs = [plugin.path for plugin in self.index.plugins.values()]
 
-        if not plugin_dirs:
-            self.log_warning("Nenhum plugin encontrado em plugins/")
+        if only is not None:
+            plugin_dirs = [d for d in plugin_dirs if d.name in only]
+            if not plugin_dirs:
+                self.log_info("Nenhum plugin alterado")
+                return True
+        elif not plugin_dirs:
+            self.log_warning("Nenhum plugin encontrado em plugins/", rule_id="plugins-empty")
             return True
 
         self.log_info(f"Encontrados {len(plugin_dirs)} plugins")
@@ -301,23 +1197,34 @@ class JSONValidator:
         all_valid = True
         for plugin_dir in sorted(plugin_dirs):
             print(f"\n{Colors.CYAN}→ {plugin_dir.name}{Colors.RESET}")
-            if not self.validate_plugin_json(plugin_dir):
+            if not self.process_files([plugin_dir], "validate_plugin_json"):
                 all_valid = False
 
         return all_valid
 
-    def check_marketplace_plugin_consistency(self) -> bool:
-        """Verifica consistência entre marketplace.json e plugins"""
+    def check_marketplace_plugin_consistency(self, only: Optional[Set[str]] = None) -> bool:
+        """Verifica consistência entre marketplace.json e plugins
+
+        Com `only`, verifica apenas as entradas dos plugins cujo diretório
+        (ou nome) está no conjunto.
+        """
         print(f"\n{Colors.BOLD}🔄 Verificando consistência{Colors.RESET}")
         print("=" * 60)
 
+        if only is not None and not only:
+            self.log_info("Nenhum plugin alterado")
+            return True
+
         marketplace_path = self.root / ".claude-plugin" / "marketplace.json"
 
         try:
-            with open(marketplace_path, 'r', encoding='utf-8') as f:
-                marketplace = json.load(f)
+            marketplace = self.manifests.load(marketplace_path)
         except Exception as e:
-            self.log_error(f"Não foi possível ler marketplace.json: {e}")
+            self.log_error(
+                f"Não foi possível ler marketplace.json: {e}",
+                file=MARKETPLACE_FILE,
+                rule_id="marketplace-unreadable"
+            )
             return False
 
         if "plugins" not in marketplace:
@@ -331,20 +1238,21 @@ class JSONValidator:
                 marketplace_plugins[plugin_name] = plugin_entry
 
         # Coletar plugins existentes no diretório
-        plugins_dir = self.root / "plugins"
-        filesystem_plugins = set()
-        if plugins_dir.exists():
-            for plugin_dir in plugins_dir.iterdir():
-                if plugin_dir.is_dir() and not plugin_dir.name.startswith('.'):
-                    filesystem_plugins.add(plugin_dir.name)
+        filesystem_plugins = {
+            name for name in self.index.plugins if not name.startswith('.')
+        }
 
         # Validação bidirecional: verificar plugins no diretório que não estão no marketplace
         unregistered = filesystem_plugins - set(marketplace_plugins.keys())
+        if only is not None:
+            unregistered &= only
         if unregistered:
             for plugin_name in sorted(unregistered):
                 self.log_warning(
                     f"{plugin_name}: plugin existe em plugins/ mas NÃO está "
-                    f"registrado no marketplace.json"
+                    f"registrado no marketplace.json",
+                    file=f"plugins/{plugin_name}",
+                    rule_id="plugin-unregistered"
                 )
 
         # Verificar se versões batem e se paths existem
@@ -358,31 +1266,25 @@ class JSONValidator:
 
             # Verificar se path existe
             plugin_path = self.root / source.lstrip("./")
+            if only is not None and plugin_path.name not in only and plugin_name not in only:
+                continue
             if not plugin_path.exists():
                 self.log_error(
                     f"{plugin_name}: registrado no marketplace.json mas "
-                    f"diretório '{source}' NÃO EXISTE"
+                    f"diretório '{source}' NÃO EXISTE",
+                    file=MARKETPLACE_FILE,
+                    rule_id="plugin-source-missing"
                 )
                 continue
 
             # Encontrar plugin.json
-            possible_paths = [
-                plugin_path / ".claude-plugin" / "plugin.json",
-                plugin_path / "plugin.json"
-            ]
-
-            plugin_json_path = None
-            for path in possible_paths:
-                if path.exists():
-                    plugin_json_path = path
-                    break
+            plugin_json_path = self.index.plugin(plugin_path).manifest
 
             if not plugin_json_path:
                 continue
 
             try:
-                with open(plugin_json_path, 'r', encoding='utf-8') as f:
-                    plugin_data = json.load(f)
+                plugin_data = self.manifests.load(plugin_json_path)
 
                 plugin_version = plugin_data.get("version")
 
@@ -390,7 +1292,9 @@ class JSONValidator:
                     self.log_error(
                         f"{plugin_name}: versão inconsistente - "
                         f"marketplace.json={marketplace_version}, "
-                        f"plugin.json={plugin_version}"
+                        f"plugin.json={plugin_version}",
+                        file=str(plugin_json_path.relative_to(self.root)),
+                        rule_id="version-mismatch"
                     )
                 else:
                     self.log_success(
@@ -398,7 +1302,11 @@ class JSONValidator:
                     )
 
             except Exception as e:
-                self.log_warning(f"{plugin_name}: erro ao ler plugin.json: {e}")
+                self.log_warning(
+                    f"{plugin_name}: erro ao ler plugin.json: {e}",
+                    file=str(plugin_json_path.relative_to(self.root)),
+                    rule_id="plugin-manifest-unreadable"
+                )
 
         # Resumo da validação bidirecional
         if unregistered:
@@ -435,16 +1343,36 @@ class JSONValidator:
             print(f"{Colors.GREEN}Todos os arquivos JSON estão válidos{Colors.RESET}\n")
             return True
 
-    def run(self) -> bool:
-        """Executa todas as validações"""
+    def run(self, changes: Optional[ChangeSet] = None) -> bool:
+        """Executa todas as validações
+
+        Com `changes` (modo --changed-since), valida o marketplace.json apenas se
+        ele mudou e restringe plugins e consistência aos plugins alterados.
+        """
         print(f"\n{Colors.BOLD}{Colors.MAGENTA}{'=' * 60}{Colors.RESET}")
         print(f"{Colors.BOLD}{Colors.MAGENTA}🔍 CI - Validador de JSON - claudecode_plugins{Colors.RESET}")
         print(f"{Colors.BOLD}{Colors.MAGENTA}{'=' * 60}{Colors.RESET}\n")
 
         # Executar validações
-        marketplace_valid = self.validate_marketplace_json()
-        plugins_valid = self.validate_all_plugins()
-        consistency_valid = self.check_marketplace_plugin_consistency()
+        if changes is None:
+            with self.phase("marketplace"):
+                marketplace_valid = self.validate_marketplace_json()
+            with self.phase("plugins"):
+                plugins_valid = self.validate_all_plugins()
+            with self.phase("consistency"):
+                consistency_valid = self.check_marketplace_plugin_consistency()
+        else:
+            marketplace_valid = True
+            if changes.marketplace_changed:
+                with self.phase("marketplace"):
+                    marketplace_valid = self.validate_marketplace_json()
+            with self.phase("plugins"):
+                plugins_valid = self.validate_all_plugins(changes.plugins)
+            # Se o marketplace.json mudou, todas as entradas precisam ser conferidas
+            with self.phase("consistency"):
+                consistency_valid = self.check_marketplace_plugin_consistency(
+                    None if changes.marketplace_changed else changes.plugins
+                )
 
         # Resumo
         success = self.print_summary()
@@ -452,76 +1380,217 @@ class JSONValidator:
         return success and marketplace_valid and plugins_valid and consistency_valid
 
 
-class MarkdownFormatter:
-    """Formatador de arquivos Markdown usando mdformat com preservação de frontmatter YAML"""
+class MdformatEngine:
+    """Executa o mdformat in-process via API Python
 
-    def __init__(self, verbose: bool = False, check_only: bool = False):
-        self.verbose = verbose
-        self.check_only = check_only
-        self.errors: List[str] = []
-        self.success: List[str] = []
-        self.root = Path(__file__).parent
+    Carrega o mdformat e seus plugins (ex: mdformat-frontmatter) uma única vez
+    e reproduz o comportamento do CLI: mesmas extensões e formatadores de
+    código, mesmas opções de `.mdformat.toml`, mesmo tratamento de fim de linha
+    e, no modo escrita, a mesma verificação de que o HTML renderizado não muda.
 
-    def log_error(self, message: str):
-        """Registra erro"""
-        self.errors.append(message)
-        print(f"{Colors.RED}❌ {message}{Colors.RESET}")
+    Para isso usa as funções internas que o CLI usa; se esta versão do mdformat
+    não as tiver, o construtor falha e o formatador fica com o CLI. Arquivos
+    cuja configuração o engine não reproduz (TOML inválido, `exclude`,
+    extensão ausente) também ficam com o CLI: `format_file` devolve None.
+    """
 
-    def log_success(self, message: str):
-        """Registra sucesso"""
-        self.success.append(message)
-        if self.verbose:
-            print(f"{Colors.GREEN}✅ {message}{Colors.RESET}")
+    def __init__(self):
+        if mdformat is None:
+            raise RuntimeError("mdformat não está instalado")
+        try:
+            from mdformat._conf import DEFAULT_OPTS, InvalidConfError, read_toml_opts
+            from mdformat._util import detect_newline_type, is_md_equal
+        except ImportError as e:
+            raise RuntimeError(f"mdformat sem a API interna usada pelo CLI ({e})")
+        self.default_options = DEFAULT_OPTS
+        self.invalid_conf_error = InvalidConfError
+        self.read_toml_opts = read_toml_opts
+        self.detect_newline_type = detect_newline_type
+        self.is_md_equal = is_md_equal
+        self._options_cache: Dict[Path, Optional[Dict]] = {}
+
+    def options_for(self, file_path: Path) -> Optional[Dict]:
+        """Opções do mdformat para o diretório do arquivo (com cache); None = usar o CLI"""
+        directory = file_path.parent
+        if directory not in self._options_cache:
+            try:
+                loaded = self.read_toml_opts(directory)
+            except self.invalid_conf_error:
+                options = None  # O CLI reporta o erro de configuração
+            else:
+                # mdformat>=0.7.18 retorna (opts, path); versões anteriores só opts
+                if isinstance(loaded, tuple):
+                    loaded = loaded[0]
+                # Os padrões de `exclude` são relativos ao .mdformat.toml: só o CLI os aplica
+                options = None if loaded.get("exclude") else {**self.default_options, **loaded}
+            self._options_cache[directory] = options
+        return self._options_cache[directory]
+
+    @staticmethod
+    def plugins_for(options: Dict) -> Optional[Tuple[Dict, Dict]]:
+        """Extensões e formatadores de código habilitados, como no CLI; None = usar o CLI"""
+        extensions = mdformat.plugins.PARSER_EXTENSIONS
+        codeformatters = mdformat.plugins.CODEFORMATTERS
+        try:
+            if options.get("extensions") is not None:
+                extensions = {name: extensions[name] for name in options["extensions"]}
+            if options.get("codeformatters") is not None:
+                codeformatters = {name: codeformatters[name] for name in options["codeformatters"]}
+        except KeyError:
+            return None  # O CLI reporta a extensão ausente
+        return extensions, codeformatters
+
+    def format_file(self, file_path: Path, check_only: bool) -> Optional[bool]:
+        """Formata (ou verifica) um arquivo. True se formatado, None se o CLI deve ser usado"""
+        options = self.options_for(file_path)
+        plugins = self.plugins_for(options) if options is not None else None
+        if plugins is None:
+            return None
+        extensions, codeformatters = plugins
+
+        original = file_path.read_bytes().decode()
+        formatted = mdformat.text(
+            original,
+            options=options,
+            extensions=extensions,
+            codeformatters=codeformatters,
+        )
+        newline = self.detect_newline_type(original, options.get("end_of_line", "lf"))
+        formatted = formatted.replace("\n", newline)
+
+        if formatted == original:
+            return True
+        if check_only:
+            return False
 
-    def log_info(self, message: str):
-        """Registra informação"""
-        if self.verbose:
-            print(f"{Colors.CYAN}ℹ️  {message}{Colors.RESET}")
+        # Como o CLI: não grava uma saída que renderize HTML diferente da entrada
+        changes_ast = any(getattr(plugin, "CHANGES_AST", False) for plugin in extensions.values())
+        if options.get("validate", True) and not changes_ast and not self.is_md_equal(
+            original, formatted, options=options, extensions=extensions, codeformatters=codeformatters
+        ):
+            return False
+
+        file_path.write_bytes(formatted.encode())
+        return True
+
+
+class MarkdownFormatter(Reporter):
+    """Formatador de arquivos Markdown usando mdformat com preservação de frontmatter YAML"""
+
+    ENGINES = ("subprocess", "inprocess")
+
+    def __init__(self, verbose: bool = False, check_only: bool = False,
+                 engine: str = "subprocess", jobs: int = 1,
+                 cache: Optional[ResultCache] = None, index: Optional[RepoIndex] = None,
+                 root: Optional[Path] = None, sink: Optional[FindingSink] = None):
+        super().__init__(verbose, root, sink)
+        self.cache = cache
+        self.index = index
+        self.check_only = check_only
+        self.jobs = resolve_jobs(jobs)
+        self.engine = engine
+        self.mdformat_engine: Optional[MdformatEngine] = None
+
+        if engine == "inprocess":
+            try:
+                self.mdformat_engine = MdformatEngine()
+                self.log_info("mdformat carregado in-process")
+            except RuntimeError as e:
+                self.engine = "subprocess"
+                self.log_info(f"{e}; usando mdformat via subprocess")
+
+    def worker_factory(self) -> Callable[[], Reporter]:
+        return partial(
+            MarkdownFormatter,
+            check_only=self.check_only,
+            engine=self.engine,
+            root=self.root
+        )
+
+    def cache_key(self, method_name: str, file_path: Path) -> Optional[str]:
+        # Em modo escrita só arquivos que já estavam formatados chegam ao cache
+        # (ver format_markdown_file): a chave é o conteúdo antes do mdformat
+        mode = b"check" if self.check_only else b"write"
+        rel_path = str(file_path.relative_to(self.root)).encode()
+        return self.cache.key("format", mode, rel_path, file_path.read_bytes())
+
+    def run_mdformat(self, file_path: Path) -> bool:
+        """Executa o mdformat no engine configurado. Retorna True se formatado"""
+        if self.mdformat_engine is not None:
+            formatted = self.mdformat_engine.format_file(file_path, self.check_only)
+            if formatted is not None:
+                return formatted
+
+        cmd = ["mdformat", str(file_path)]
+        if self.check_only:
+            cmd.insert(1, "--check")
+
+        result = run_command(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        return result.returncode == 0
 
     def format_markdown_file(self, file_path: Path) -> bool:
         """Formata um arquivo Markdown específico"""
+        file_rel = str(file_path.relative_to(self.root))
         try:
-            cmd = ["mdformat", str(file_path)]
-            if self.check_only:
-                cmd.insert(1, "--check")
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode == 0:
+            original = None if self.check_only else file_path.read_bytes()
+            if self.run_mdformat(file_path):
                 if self.check_only:
                     self.log_success(f"Formatação OK: {file_path.relative_to(self.root)}")
                 else:
+                    if file_path.read_bytes() != original:
+                        # Se o arquivo voltar a esse conteúdo não formatado, o mdformat precisa rodar de novo
+                        self.mark_transient()
                     self.log_success(f"Formatado: {file_path.relative_to(self.root)}")
                 return True
             else:
                 if self.check_only:
                     self.log_error(
-                        f"Formatação incorreta: {file_path.relative_to(self.root)}"
+                        f"Formatação incorreta: {file_path.relative_to(self.root)}",
+                        file=file_rel,
+                        rule_id="mdformat-check"
                     )
                 else:
-                    self.log_error(f"Erro ao formatar: {file_path.relative_to(self.root)}")
+                    self.log_error(
+                        f"Erro ao formatar: {file_path.relative_to(self.root)}",
+                        file=file_rel,
+                        rule_id="mdformat-error"
+                    )
                 return False
 
         except subprocess.TimeoutExpired:
-            self.log_error(f"Timeout ao formatar: {file_path.relative_to(self.root)}")
+            self.mark_transient()
+            self.log_error(
+                f"Timeout ao formatar: {file_path.relative_to(self.root)}",
+                file=file_rel,
+                rule_id="mdformat-timeout"
+            )
             return False
         except Exception as e:
-            self.log_error(f"Erro ao formatar {file_path.relative_to(self.root)}: {e}")
+            self.mark_transient()
+            self.log_error(
+                f"Erro ao formatar {file_path.relative_to(self.root)}: {e}",
+                file=file_rel,
+                rule_id="mdformat-error"
+            )
             return False
 
-    def format_all_markdown(self) -> bool:
-        """Formata todos os arquivos Markdown no repositório"""
+    def format_all_markdown(self, files: Optional[List[Path]] = None) -> bool:
+        """Formata todos os arquivos Markdown no repositório (ou apenas `files`)"""
         action = "Verificando formatação" if self.check_only else "Formatando"
         print(f"\n{Colors.BOLD}📝 {action} Markdown{Colors.RESET}")
         print("=" * 60)
 
         # Encontrar todos os arquivos .md
-        md_files = list(self.root.glob("**/*.md"))
+        md_files = list(self.index.markdown_files if files is None else files)
+
+        if files is not None and not md_files:
+            self.log_info("Nenhum arquivo Markdown alterado")
+            return True
 
         if not md_files:
             self.log_info("Nenhum arquivo Markdown encontrado")
@@ -529,16 +1598,12 @@ class MarkdownFormatter:
 
         self.log_info(f"Encontrados {len(md_files)} arquivos Markdown")
 
-        all_formatted = True
-        for md_file in sorted(md_files):
-            # Ignorar node_modules e outras pastas não relevantes
-            if "node_modules" in md_file.parts or ".git" in md_file.parts:
-                continue
-
-            if not self.format_markdown_file(md_file):
-                all_formatted = False
+        # node_modules, .git e outras pastas ignoradas já foram podadas pelo RepoIndex
+        md_files = sorted(md_files)
+        if self.jobs > 1:
+            self.log_info(f"Usando {self.jobs} workers")
 
-        return all_formatted
+        return self.process_files(md_files, "format_markdown_file", self.jobs)
 
     def print_summary(self):
         """Imprime resumo da formatação"""
@@ -553,6 +1618,8 @@ class MarkdownFormatter:
         print(f"{Colors.RED}❌ Erros:    {len(self.errors)}{Colors.RESET}")
         print(f"\n{Colors.BOLD}Total de verificações: {total}{Colors.RESET}\n")
 
+        self.print_timings()
+
         if self.errors:
             print(f"{Colors.RED}{Colors.BOLD}❌ {action.upper()} COM ERROS{Colors.RESET}\n")
             return False
@@ -561,19 +1628,39 @@ class MarkdownFormatter:
             return True
 
 
-class MarkdownValidator:
+    def print_timings(self, top: int = 5):
+        """Imprime o tempo gasto por arquivo (engine, total e mais lentos)"""
+        if not self.timings:
+            return
+
+        total_time = sum(timing.elapsed for timing in self.timings)
+        average = total_time / len(self.timings)
+        print(f"{Colors.CYAN}⏱️  Engine: {self.engine} | Total: {total_time:.2f}s | "
+              f"Média: {average * 1000:.1f} ms/arquivo{Colors.RESET}")
+
+        slowest = sorted(self.timings, key=lambda timing: timing.elapsed, reverse=True)[:top]
+        for timing in slowest:
+            print(f"{Colors.CYAN}   {timing.elapsed * 1000:8.1f} ms  {timing.file}{Colors.RESET}")
+        print()
+
+
+class MarkdownValidator(Reporter):
     """Validador de arquivos Markdown usando pymarkdown"""
 
-    def __init__(self, verbose: bool = False, strict: bool = False):
-        self.verbose = verbose
+    def __init__(self, verbose: bool = False, strict: bool = False, jobs: int = 1,
+                 cache: Optional[ResultCache] = None, index: Optional[RepoIndex] = None,
+                 root: Optional[Path] = None, sink: Optional[FindingSink] = None):
+        super().__init__(verbose, root, sink)
+        self.cache = cache
+        self.index = index
         self.strict = strict
-        self.errors: List[str] = []
-        self.warnings: List[str] = []
-        self.success: List[str] = []
-        self.root = Path(__file__).parent
+        self.jobs = resolve_jobs(jobs)
 
         if PyMarkdownApi is None:
-            self.log_error("pymarkdownlnt não está instalado. Instale com: pip install pymarkdownlnt")
+            self.log_error(
+                "pymarkdownlnt não está instalado. Instale com: pip install pymarkdownlnt",
+                rule_id="pymarkdown-missing"
+            )
             self.available = False
         else:
             self.available = True
@@ -588,30 +1675,21 @@ class MarkdownValidator:
                     self.log_info("Usando configuração padrão (arquivo .markdownlintrc.json não encontrado)")
             except Exception as e:
                 self.api = PyMarkdownApi()
-                self.log_warning(f"Não foi possível carregar .markdownlintrc.json: {e}")
+                self.log_warning(
+                    f"Não foi possível carregar .markdownlintrc.json: {e}",
+                    file=".markdownlintrc.json",
+                    rule_id="pymarkdown-config"
+                )
 
             self.api.log_error_and_above()
 
-    def log_error(self, message: str):
-        """Registra erro"""
-        self.errors.append(message)
-        print(f"{Colors.RED}❌ {message}{Colors.RESET}")
+    def worker_factory(self) -> Callable[[], Reporter]:
+        return partial(MarkdownValidator, strict=self.strict, root=self.root)
 
-    def log_warning(self, message: str):
-        """Registra aviso"""
-        self.warnings.append(message)
-        print(f"{Colors.YELLOW}⚠️  {message}{Colors.RESET}")
-
-    def log_success(self, message: str):
-        """Registra sucesso"""
-        self.success.append(message)
-        if self.verbose:
-            print(f"{Colors.GREEN}✅ {message}{Colors.RESET}")
-
-    def log_info(self, message: str):
-        """Registra informação"""
-        if self.verbose:
-            print(f"{Colors.CYAN}ℹ️  {message}{Colors.RESET}")
+    def cache_key(self, method_name: str, file_path: Path) -> Optional[str]:
+        mode = b"strict" if self.strict else b"default"
+        rel_path = str(file_path.relative_to(self.root)).encode()
+        return self.cache.key("lint", mode, rel_path, file_path.read_bytes())
 
     def validate_markdown_file(self, file_path: Path) -> bool:
         """Valida um arquivo Markdown específico"""
@@ -628,12 +1706,19 @@ class MarkdownValidator:
                         f"[{failure.rule_id}] {failure.rule_description}"
                     )
 
+                    location = {
+                        "file": str(file_rel),
+                        "line": failure.line_number,
+                        "column": failure.column_number,
+                        "rule_id": failure.rule_id,
+                    }
+
                     # Classificar como erro ou aviso
                     if self.strict or failure.rule_id.startswith("MD0"):
-                        self.log_error(message)
+                        self.log_error(message, **location)
                         has_errors = True
                     else:
-                        self.log_warning(message)
+                        self.log_warning(message, **location)
 
                 return not has_errors
             else:
@@ -641,11 +1726,16 @@ class MarkdownValidator:
                 return True
 
         except Exception as e:
-            self.log_error(f"Erro ao validar {file_path.relative_to(self.root)}: {e}")
+            self.mark_transient()
+            self.log_error(
+                f"Erro ao validar {file_path.relative_to(self.root)}: {e}",
+                file=str(file_path.relative_to(self.root)),
+                rule_id="pymarkdown-error"
+            )
             return False
 
-    def validate_all_markdown(self) -> bool:
-        """Valida todos os arquivos Markdown no repositório"""
+    def validate_all_markdown(self, files: Optional[List[Path]] = None) -> bool:
+        """Valida todos os arquivos Markdown no repositório (ou apenas `files`)"""
         print(f"\n{Colors.BOLD}📝 Validando Markdown{Colors.RESET}")
         print("=" * 60)
 
@@ -653,24 +1743,24 @@ class MarkdownValidator:
             return False
 
         # Encontrar todos os arquivos .md
-        md_files = list(self.root.glob("**/*.md"))
+        md_files = list(self.index.markdown_files if files is None else files)
+
+        if files is not None and not md_files:
+            self.log_info("Nenhum arquivo Markdown alterado")
+            return True
 
         if not md_files:
-            self.log_warning("Nenhum arquivo Markdown encontrado")
+            self.log_warning("Nenhum arquivo Markdown encontrado", rule_id="markdown-none-found")
             return True
 
         self.log_info(f"Encontrados {len(md_files)} arquivos Markdown")
 
-        all_valid = True
-        for md_file in sorted(md_files):
-            # Ignorar node_modules e outras pastas não relevantes
-            if "node_modules" in md_file.parts or ".git" in md_file.parts:
-                continue
+        # node_modules, .git e outras pastas ignoradas já foram podadas pelo RepoIndex
+        md_files = sorted(md_files)
+        if self.jobs > 1:
+            self.log_info(f"Usando {self.jobs} workers")
 
-            if not self.validate_markdown_file(md_file):
-                all_valid = False
-
-        return all_valid
+        return self.process_files(md_files, "validate_markdown_file", self.jobs)
 
     def print_summary(self):
         """Imprime resumo da validação"""
@@ -703,6 +1793,323 @@ class MarkdownValidator:
             return True
 
 
+class PollingWatcher:
+    """Detecta alterações comparando mtime/tamanho dos arquivos periodicamente
+
+    Fallback do InotifyWatcher para sistemas sem inotify (macOS, Windows).
+    """
+
+    def __init__(self, root: Path, interval: float = 0.5):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        stack = [str(self.root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in RepoIndex.IGNORED_DIRS:
+                                stack.append(entry.path)
+                                snapshot[Path(entry.path)] = (0, -1)
+                        else:
+                            stat = entry.stat()
+                            snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        continue
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Bloqueia até haver alterações (ou `timeout`) e retorna os paths alterados"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None
+                       else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Observa o repositório com inotify (Linux) via ctypes, sem dependências
+
+    Registra um watch por diretório (podando os diretórios ignorados) e adiciona
+    watches para diretórios criados durante a execução.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE)
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, root: Path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify disponível apenas no Linux")
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._watches: Dict[int, Path] = {}
+        self._add_tree(root)
+
+    def _add_watch(self, directory: Path) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), self.MASK)
+        if wd < 0:
+            return False
+        self._watches[wd] = directory
+        return True
+
+    def _add_tree(self, directory: Path) -> Set[Path]:
+        """Adiciona watches recursivamente; retorna os arquivos já existentes"""
+        files: Set[Path] = set()
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            if not self._add_watch(current):
+                continue
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in RepoIndex.IGNORED_DIRS:
+                                stack.append(Path(entry.path))
+                        else:
+                            files.add(Path(entry.path))
+            except OSError:
+                continue
+        return files
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Bloqueia até haver eventos (ou `timeout`) e retorna os paths alterados"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed: Set[Path] = set()
+        while True:
+            try:
+                buffer = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(buffer, offset)
+                offset += self.EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    # Eventos perdidos: o chamador revalida tudo
+                    changed.add(self.root)
+                    continue
+
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if path.name in RepoIndex.IGNORED_DIRS:
+                    continue
+                changed.add(path)
+                if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed |= self._add_tree(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_file_watcher(root: Path):
+    """Usa inotify quando disponível; caso contrário, polling"""
+    try:
+        return InotifyWatcher(root)
+    except (OSError, AttributeError):
+        return PollingWatcher(root)
+
+
+class WatchSession:
+    """Modo --watch: revalida incrementalmente a cada alteração salva
+
+    Mantém JSONValidator, MarkdownFormatter e MarkdownValidator vivos entre
+    alterações, e com eles o PyMarkdownApi, o mdformat in-process, o RepoIndex
+    e os manifestos já parseados. Cada alteração revalida apenas o arquivo
+    afetado e as verificações de consistência que dependem dele.
+    """
+
+    DEBOUNCE = 0.05
+
+    def __init__(self, root: Path, index: RepoIndex, verbose: bool = False,
+                 check_json: bool = True, check_only: bool = False,
+                 engine: str = "inprocess", lint: bool = False, strict: bool = False,
+                 sink: Optional[FindingSink] = None):
+        self.root = root
+        self.index = index
+        self.check_json = check_json
+        self.lint = lint
+        self.manifests = ManifestStore()
+        self.json_validator = JSONValidator(
+            verbose=verbose, index=index, manifests=self.manifests, root=root, sink=sink
+        )
+        self.formatter = MarkdownFormatter(
+            verbose=verbose, check_only=check_only, engine=engine, index=index, root=root, sink=sink
+        )
+        self.md_validator = MarkdownValidator(
+            verbose=verbose, strict=strict, index=index, root=root, sink=sink
+        ) if lint else None
+        self.reporters: List[Reporter] = [self.json_validator, self.formatter]
+        if self.md_validator is not None:
+            self.reporters.append(self.md_validator)
+
+    def run(self):
+        """Validação completa inicial seguida do laço de observação"""
+        start = time.perf_counter()
+        if self.check_json:
+            self.json_validator.validate_marketplace_json()
+            self.json_validator.validate_all_plugins()
+            self.json_validator.check_marketplace_plugin_consistency()
+        self.formatter.format_all_markdown()
+        if self.md_validator is not None:
+            self.md_validator.validate_all_markdown()
+        self.report("validação inicial", time.perf_counter() - start)
+
+        watcher = create_file_watcher(self.root)
+        print(f"{Colors.CYAN}👀 Observando {self.root} ({type(watcher).__name__}). "
+              f"Ctrl+C para sair{Colors.RESET}")
+        try:
+            while True:
+                changed = watcher.wait()
+                # Editores costumam gerar vários eventos por salvamento
+                while True:
+                    more = watcher.wait(self.DEBOUNCE)
+                    if not more:
+                        break
+                    changed |= more
+                self.revalidate(changed)
+        except KeyboardInterrupt:
+            print()
+        finally:
+            watcher.close()
+
+    def revalidate(self, changed: Set[Path]):
+        """Revalida os arquivos alterados e as verificações dependentes"""
+        start = time.perf_counter()
+        for reporter in self.reporters:
+            reporter.reset()
+
+        if self.root in changed:
+            # Fila de eventos estourou: recomeça do zero
+            self.index = RepoIndex.scan(self.root)
+            for reporter in self.reporters:
+                reporter.index = self.index
+            self.manifests.invalidate()
+            changed = {plugin.path for plugin in self.index.plugins.values()}
+            changed.add(self.root / ChangeSet.MARKETPLACE)
+            changed.update(self.index.markdown_files)
+
+        marketplace_changed = False
+        plugins: Set[str] = set()
+        markdown: Set[Path] = set()
+
+        for path in changed:
+            if self.index.is_ignored(path):
+                continue
+            try:
+                rel = path.relative_to(self.root)
+            except ValueError:
+                continue
+
+            if str(rel) == ChangeSet.MARKETPLACE:
+                self.manifests.invalidate(path)
+                marketplace_changed = True
+            elif len(rel.parts) >= 2 and rel.parts[0] == "plugins":
+                name = rel.parts[1]
+                plugin_dir = self.index.plugins_dir / name
+                # Diretório do plugin, entrada na raiz ou .claude-plugin/plugin.json
+                if len(rel.parts) <= 3 or rel.parts[2] == ".claude-plugin":
+                    self.manifests.invalidate(path)
+                    if plugin_dir.is_dir():
+                        self.index.plugins[name] = PluginInfo.from_dir(plugin_dir)
+                    else:
+                        self.index.plugins.pop(name, None)
+                    plugins.add(name)
+
+            if path.suffix == ".md":
+                if path.is_file():
+                    if path not in self.index.markdown_files:
+                        self.index.markdown_files.append(path)
+                        self.index.markdown_files.sort()
+                    markdown.add(path)
+                elif path in self.index.markdown_files:
+                    self.index.markdown_files.remove(path)
+
+        if not (marketplace_changed or plugins or markdown):
+            return
+
+        if self.check_json:
+            if marketplace_changed:
+                self.json_validator.validate_marketplace_json()
+            for name in sorted(plugins):
+                if name in self.index.plugins:
+                    print(f"\n{Colors.CYAN}→ {name}{Colors.RESET}")
+                    self.json_validator.validate_plugin_json(self.index.plugins[name].path)
+            if marketplace_changed or plugins:
+                self.json_validator.check_marketplace_plugin_consistency(
+                    None if marketplace_changed else plugins
+                )
+
+        for md_file in sorted(markdown):
+            self.formatter.format_markdown_file(md_file)
+            if self.md_validator is not None:
+                self.md_validator.validate_markdown_file(md_file)
+
+        labels = sorted(str(path.relative_to(self.root)) for path in markdown)
+        labels += sorted(f"plugins/{name}" for name in plugins)
+        if marketplace_changed:
+            labels.insert(0, ChangeSet.MARKETPLACE)
+        self.report(", ".join(labels), time.perf_counter() - start)
+
+    def report(self, label: str, elapsed: float):
+        """Imprime uma linha de resultado para o ciclo de validação"""
+        errors = sum(len(reporter.errors) for reporter in self.reporters)
+        warnings = sum(len(reporter.warnings) for reporter in self.reporters)
+        stamp = time.strftime("%H:%M:%S")
+        if errors:
+            status = f"{Colors.RED}❌ {errors} erro(s), {warnings} aviso(s)"
+        elif warnings:
+            status = f"{Colors.YELLOW}⚠️  {warnings} aviso(s)"
+        else:
+            status = f"{Colors.GREEN}✅ OK"
+        print(f"{Colors.BOLD}[{stamp}]{Colors.RESET} {status}{Colors.RESET} "
+              f"{Colors.CYAN}({elapsed * 1000:.1f} ms) {label}{Colors.RESET}")
+
+
 def main():
     """Função principal"""
     parser = argparse.ArgumentParser(
@@ -763,8 +2170,127 @@ Exit codes:
         help='Apenas verifica formatação sem modificar arquivos'
     )
 
+    parser.add_argument(
+        '--mdformat-engine',
+        choices=MarkdownFormatter.ENGINES,
+        default='subprocess',
+        help='Como executar o mdformat: um processo por arquivo (subprocess) '
+             'ou API Python carregada uma única vez (inprocess)'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Número de processos para formatar/validar Markdown em paralelo '
+             '(0 = número de CPUs, padrão: 1)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Não usa o cache de resultados em .ci-cache/'
+    )
+
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='Apaga o cache de resultados antes de validar'
+    )
+
+    parser.add_argument(
+        '--changed-since',
+        metavar='REF',
+        help='Valida apenas o que mudou desde a referência git REF '
+             '(plugins afetados, suas entradas no marketplace e Markdown alterado)'
+    )
+
+    parser.add_argument(
+        '-w', '--watch',
+        action='store_true',
+        help='Fica observando o repositório (inotify ou polling) e revalida '
+             'apenas os arquivos alterados a cada salvamento'
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=('text', 'jsonl', 'sarif'),
+        default='text',
+        help='Formato de saída dos findings: texto colorido (padrão), JSON Lines '
+             '(streaming, um finding por linha) ou SARIF 2.1.0. Nos formatos de '
+             'máquina o texto colorido vai para stderr'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Mede o tempo de cada fase e de cada arquivo e conta subprocessos'
+    )
+
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=10,
+        metavar='N',
+        help='Quantidade de arquivos mais lentos exibidos pelo --profile (padrão: 10)'
+    )
+
+    parser.add_argument(
+        '--profile-trace',
+        metavar='PATH',
+        help='Grava os tempos do --profile em JSON no formato Chrome Trace'
+    )
+
     args = parser.parse_args()
 
+    profiler = Profiler() if args.profile or args.profile_trace else None
+
+    sink: Optional[FindingSink] = None
+    if args.format != 'text':
+        # stdout fica reservado para a saída estruturada
+        machine_stream, sys.stdout = sys.stdout, sys.stderr
+        sink = (JsonLinesSink if args.format == 'jsonl' else SarifSink)(machine_stream)
+
+    root = Path(__file__).parent
+    index = RepoIndex.scan(root)
+
+    if args.watch:
+        # Motores mantidos em memória: mdformat in-process quando disponível
+        session = WatchSession(
+            root,
+            index,
+            verbose=args.verbose,
+            check_json=not args.only_markdown,
+            check_only=args.check_format,
+            engine="inprocess" if mdformat is not None else args.mdformat_engine,
+            lint=(args.only_markdown or args.markdown_strict) and not args.skip_markdown,
+            strict=args.markdown_strict,
+            sink=sink
+        )
+        session.run()
+        if sink is not None:
+            sink.close()
+        sys.exit(0)
+
+    changes = None
+    if args.changed_since:
+        try:
+            changes = ChangeSet.from_git(root, args.changed_since)
+        except RuntimeError as e:
+            print(f"{Colors.RED}❌ --changed-since: {e}{Colors.RESET}")
+            sys.exit(1)
+        if args.verbose:
+            print(f"{Colors.CYAN}ℹ️  {len(changes.paths)} arquivo(s) alterado(s) desde "
+                  f"{args.changed_since}; plugins afetados: "
+                  f"{', '.join(sorted(changes.plugins)) or 'nenhum'}{Colors.RESET}")
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(root)
+        if args.clear_cache:
+            cache.clear()
+
     # Executar validações baseado nos flags
     json_success = True
     markdown_format_success = True
@@ -772,12 +2298,30 @@ Exit codes:
 
     if not args.only_markdown:
         # Validação JSON
-        validator_json = JSONValidator(verbose=args.verbose, fix=args.fix)
-        json_success = validator_json.run()
+        validator_json = JSONValidator(
+            verbose=args.verbose,
+            fix=args.fix,
+            cache=cache,
+            index=index,
+            sink=sink
+        )
+        validator_json.profiler = profiler
+        json_success = validator_json.run(changes)
 
     # Formatação Markdown (sempre executada, não lint)
-    formatter_md = MarkdownFormatter(verbose=args.verbose, check_only=args.check_format)
-    markdown_format_success = formatter_md.format_all_markdown()
+    formatter_md = MarkdownFormatter(
+        verbose=args.verbose,
+        check_only=args.check_format,
+        engine=args.mdformat_engine,
+        jobs=args.jobs,
+        cache=cache,
+        index=index,
+        sink=sink
+    )
+    formatter_md.profiler = profiler
+    changed_markdown = changes.markdown_files(index) if changes is not None else None
+    with formatter_md.phase("format"):
+        markdown_format_success = formatter_md.format_all_markdown(changed_markdown)
     format_summary = formatter_md.print_summary()
     markdown_format_success = markdown_format_success and format_summary
 
@@ -785,11 +2329,35 @@ Exit codes:
     if args.only_markdown or args.markdown_strict:
         if not args.skip_markdown:
             # Validação Markdown
-            validator_md = MarkdownValidator(verbose=args.verbose, strict=args.markdown_strict)
-            markdown_success = validator_md.validate_all_markdown()
+            validator_md = MarkdownValidator(
+                verbose=args.verbose,
+                strict=args.markdown_strict,
+                jobs=args.jobs,
+                cache=cache,
+                index=index,
+                sink=sink
+            )
+            validator_md.profiler = profiler
+            with validator_md.phase("lint"):
+                markdown_success = validator_md.validate_all_markdown(changed_markdown)
             markdown_summary = validator_md.print_summary()
             markdown_success = markdown_success and markdown_summary
 
+    if cache is not None:
+        cache.save()
+        if args.verbose:
+            print(f"{Colors.CYAN}ℹ️  Cache: {cache.hits} acertos, "
+                  f"{cache.misses} falhas{Colors.RESET}")
+
+    if profiler is not None:
+        profiler.print_report(args.profile_top)
+        if args.profile_trace:
+            profiler.write_chrome_trace(Path(args.profile_trace))
+            print(f"{Colors.CYAN}ℹ️  Chrome trace gravado em {args.profile_trace}{Colors.RESET}")
+
+    if sink is not None:
+        sink.close()
+
     # Resultado final
     success = json_success and markdown_format_success and markdown_success
 
@@ -0,0 +1,320 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.9"
+# dependencies = [
+#     "pymarkdownlnt>=0.9.33",
+#     "mdformat>=0.7.17",
+#     "mdformat-frontmatter>=0.4.1",
+# ]
+# ///
+"""
+bench_ci.py - Benchmark de escalabilidade do CI.py
+
+Gera marketplaces sintéticos (N plugins com plugin.json, README, commands,
+agents e skills em Markdown) e mede as fases do CI.py em cada tamanho:
+- scan: RepoIndex.scan
+- json: JSONValidator.run
+- format: MarkdownFormatter.format_all_markdown (modo --check-format)
+- lint: MarkdownValidator.validate_all_markdown
+
+O resultado pode ser salvo como baseline e comparado em execuções
+posteriores; variações acima do limite são reportadas como regressão.
+
+Uso:
+    ./benchmarks/bench_ci.py                                  # 10, 100 e 1000 plugins
+    ./benchmarks/bench_ci.py --sizes 10,500,5000 --repeat 5   # Tamanhos e repetições
+    ./benchmarks/bench_ci.py --phases json,lint               # Apenas algumas fases
+    ./benchmarks/bench_ci.py --jobs 0 --engine inprocess      # Opções repassadas ao CI.py
+    ./benchmarks/bench_ci.py --save-baseline                  # Grava benchmarks/baseline.json
+    ./benchmarks/bench_ci.py --baseline main.json --threshold 15
+
+Exit codes:
+    0 - Sem regressões em relação ao baseline (ou nenhum baseline)
+    1 - Alguma fase ficou mais lenta que o limite permitido
+"""
+
+import argparse
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import CI  # noqa: E402
+
+PHASES = ("scan", "json", "format", "lint")
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+WORDS = (
+    "agent plugin command skill workflow validation marketplace manifest "
+    "markdown format lint cache index worker process review deploy cluster "
+    "kubernetes terraform python test coverage prompt model tool context"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def markdown_document(rng: random.Random, title: str, frontmatter: Dict[str, str]) -> str:
+    """Documento Markdown no estilo dos plugins reais (frontmatter, listas, código)"""
+    lines = ["---"]
+    lines.extend(f"{key}: {value}" for key, value in frontmatter.items())
+    lines.extend(["---", "", f"# {title}", "", sentence(rng, 20), ""])
+    for section in range(rng.randint(2, 5)):
+        lines.extend([f"## Seção {section + 1}", "", sentence(rng, 25), ""])
+        lines.extend(f"- {sentence(rng, 8)}" for _ in range(rng.randint(2, 6)))
+        lines.append("")
+        if rng.random() < 0.5:
+            lines.extend(["```bash", f"uv run {rng.choice(WORDS)} --{rng.choice(WORDS)}", "```", ""])
+    return "\n".join(lines)
+
+
+def generate_marketplace(root: Path, plugins: int, seed: int = 0):
+    """Gera um marketplace sintético com `plugins` plugins em `root`"""
+    rng = random.Random(seed)
+    for config in (".markdownlintrc.json", ".mdformat.toml"):
+        if (REPO_ROOT / config).exists():
+            shutil.copy(REPO_ROOT / config, root / config)
+
+    entries = []
+    for number in range(plugins):
+        name = f"plugin-{number:04d}"
+        plugin_dir = root / "plugins" / name
+        version = f"1.{number % 10}.0"
+        description = sentence(rng)
+
+        (plugin_dir / ".claude-plugin").mkdir(parents=True)
+        (plugin_dir / ".claude-plugin" / "plugin.json").write_text(json.dumps({
+            "name": name,
+            "version": version,
+            "description": description,
+            "author": {"name": "Benchmark", "email": "bench@example.com"},
+            "keywords": rng.sample(WORDS, 4),
+            "license": "MIT",
+        }, indent=2) + "\n", encoding="utf-8")
+        (plugin_dir / "README.md").write_text(
+            markdown_document(rng, name, {"name": name}), encoding="utf-8"
+        )
+
+        commands = plugin_dir / "commands"
+        commands.mkdir()
+        for command in range(rng.randint(1, 3)):
+            (commands / f"command-{command}.md").write_text(markdown_document(
+                rng, f"Command {command}",
+                {"description": sentence(rng, 6), "argument-hint": '"<alvo>"'},
+            ), encoding="utf-8")
+
+        if rng.random() < 0.6:
+            agents = plugin_dir / "agents"
+            agents.mkdir()
+            (agents / f"{name}-agent.md").write_text(markdown_document(
+                rng, "Agent", {"name": f"{name}-agent", "description": sentence(rng, 6)},
+            ), encoding="utf-8")
+
+        if rng.random() < 0.5:
+            skill = plugin_dir / "skills" / f"{name}-skill"
+            skill.mkdir(parents=True)
+            (skill / "SKILL.md").write_text(markdown_document(
+                rng, "Skill", {"name": f"{name}-skill", "description": sentence(rng, 6)},
+            ), encoding="utf-8")
+
+        entries.append({
+            "name": name,
+            "description": description,
+            "version": version,
+            "source": f"./plugins/{name}",
+        })
+
+    (root / ".claude-plugin").mkdir()
+    (root / ".claude-plugin" / "marketplace.json").write_text(json.dumps({
+        "name": "bench-marketplace",
+        "version": "1.0.0",
+        "description": "Marketplace sintético para benchmark",
+        "owner": {"name": "Benchmark", "email": "bench@example.com"},
+        "plugins": entries,
+    }, indent=2) + "\n", encoding="utf-8")
+
+
+def phase_available(phase: str, engine: str) -> bool:
+    """Verifica se as dependências da fase estão instaladas"""
+    if phase == "format":
+        if engine == "inprocess":
+            return CI.mdformat is not None
+        return shutil.which("mdformat") is not None
+    if phase == "lint":
+        return CI.PyMarkdownApi is not None
+    return True
+
+
+def measure(action: Callable[[], object], repeat: int) -> float:
+    """Mediana do tempo de parede de `repeat` execuções, com a saída suprimida"""
+    samples = []
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            action()
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_size(root: Path, phases: List[str], args) -> Dict[str, Optional[float]]:
+    """Mede cada fase sobre o marketplace em `root` (None = fase indisponível)"""
+    index = CI.RepoIndex.scan(root)
+    actions = {
+        "scan": lambda: CI.RepoIndex.scan(root),
+        "json": lambda: CI.JSONValidator(root=root, index=index).run(),
+        "format": lambda: CI.MarkdownFormatter(
+            check_only=True, engine=args.engine, jobs=args.jobs, root=root, index=index
+        ).format_all_markdown(),
+        "lint": lambda: CI.MarkdownValidator(
+            jobs=args.jobs, root=root, index=index
+        ).validate_all_markdown(),
+    }
+    return {
+        phase: measure(actions[phase], args.repeat) if phase_available(phase, args.engine) else None
+        for phase in phases
+    }
+
+
+def format_ms(value: Optional[float]) -> str:
+    return "n/d" if value is None else f"{value * 1000:.1f}"
+
+
+def print_table(results: Dict[str, Dict[str, Optional[float]]],
+                baseline: Optional[Dict[str, Dict[str, Optional[float]]]],
+                threshold: float) -> bool:
+    """Imprime a tabela de resultados. Retorna False se houve regressão"""
+    ok = True
+    header = f"{'plugins':>8}  {'fase':<8} {'atual (ms)':>12}"
+    if baseline is not None:
+        header += f" {'baseline (ms)':>14} {'variação':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for size, phases in results.items():
+        for phase, current in phases.items():
+            row = f"{size:>8}  {phase:<8} {format_ms(current):>12}"
+            previous = (baseline or {}).get(size, {}).get(phase)
+            if baseline is not None:
+                row += f" {format_ms(previous):>14}"
+                if current is not None and previous:
+                    change = (current - previous) / previous * 100
+                    row += f" {change:>+9.1f}%"
+                    if change > threshold:
+                        row += f"  {CI.Colors.RED}regressão{CI.Colors.RESET}"
+                        ok = False
+            print(row)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark do CI.py sobre marketplaces sintéticos',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--sizes',
+        default='10,100,1000',
+        help='Quantidades de plugins separadas por vírgula (padrão: 10,100,1000)'
+    )
+    parser.add_argument(
+        '--phases',
+        default=','.join(PHASES),
+        help=f'Fases medidas separadas por vírgula (padrão: {",".join(PHASES)})'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Execuções por fase; o resultado é a mediana (padrão: 3)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Processos paralelos para format/lint, como no CI.py (padrão: 1)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=CI.MarkdownFormatter.ENGINES,
+        default='subprocess',
+        help='Engine do mdformat (padrão: subprocess)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Semente do gerador de marketplaces (padrão: 0)'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help='Baseline usado na comparação (padrão: benchmarks/baseline.json)'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Grava os resultados desta execução como baseline'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=10.0,
+        help='Aumento percentual considerado regressão (padrão: 10)'
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    phases = [phase.strip() for phase in args.phases.split(',') if phase.strip()]
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        parser.error(f"fases desconhecidas: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Dict[str, Optional[float]]] = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"bench-ci-{size}-") as tmp:
+            root = Path(tmp)
+            start = time.perf_counter()
+            generate_marketplace(root, size, args.seed)
+            print(f"{CI.Colors.CYAN}ℹ️  {size} plugins gerados em "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms{CI.Colors.RESET}",
+                  file=sys.stderr)
+            results[str(size)] = bench_size(root, phases, args)
+
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))["results"]
+
+    print()
+    ok = print_table(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "jobs": args.jobs,
+            "engine": args.engine,
+            "repeat": args.repeat,
+            "results": results,
+        }, indent=2) + "\n", encoding='utf-8')
+        print(f"\n{CI.Colors.GREEN}✅ Baseline gravado em {args.baseline}{CI.Colors.RESET}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+bench_coverage.py - Benchmark dos cores de cobertura nos testes do Stop
+
+Roda uma suíte pytest sintética (módulos com laços e chamadas em src/, testes
+que os exercitam) como o run_tests_on_stop faz numa execução completa, com
+cada core do coverage.py selecionado por COVERAGE_CORE:
+- sem cobertura: referência do custo dos testes
+- ctrace: rastreamento em C, o core padrão até o Python 3.11
+- sysmon: sys.monitoring (Python 3.12+), o que TEST_COVERAGE_CORE=auto usa
+- pytrace: rastreamento em Python puro
+- contexts: ctrace com --cov-context=test, como as execuções completas que
+  reconstroem o mapa de impacto
+
+Cada linha mostra a mediana do tempo, o custo sobre a execução sem cobertura
+e a cobertura total do relatório JSON, que deve ser igual em todos os cores
+(o --cov-fail-under do hook depende dela).
+
+O Python usado precisa de pytest e pytest-cov instalados.
+
+Uso:
+    ./benchmarks/bench_coverage.py                          # 20 módulos, 3 execuções
+    ./benchmarks/bench_coverage.py --modules 50 --repeat 5 --branch
+    ./benchmarks/bench_coverage.py --python .venv/bin/python
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MODULE_TEMPLATE = '''"""Synthetic module {n} for the coverage benchmark."""
+
+
+def score(values: list[int]) -> int:
+    total = 0
+    for value in values:
+        if value % 3 == 0:
+            total += value * {n}
+        elif value % 3 == 1:
+            total -= value
+        else:
+            total += helper(value)
+    return total
+
+
+def helper(value: int) -> int:
+    return value // 2 + {n}
+
+
+def unused(value: int) -> int:
+    return value * value
+'''
+
+TEST_TEMPLATE = '''from benchpkg.mod_{n} import score
+
+
+def test_score_{n}():
+    for size in range({calls}):
+        assert isinstance(score(list(range(size))), int)
+'''
+
+
+def build_project(root: Path, modules: int, calls: int):
+    """Projeto sintético com src/benchpkg/mod_N.py e tests/test_mod_N.py"""
+    package = root / "src" / "benchpkg"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (root / "tests").mkdir()
+    for n in range(modules):
+        (package / f"mod_{n}.py").write_text(MODULE_TEMPLATE.format(n=n))
+        (root / "tests" / f"test_mod_{n}.py").write_text(TEST_TEMPLATE.format(n=n, calls=calls))
+
+
+def run_suite(python: str, root: Path, core: Optional[str], extra: List[str]) -> Optional[float]:
+    """Executa a suíte uma vez; devolve a cobertura total (None sem cobertura)"""
+    env = {**os.environ, "PYTHONPATH": str(root / "src")}
+    env.pop("COVERAGE_CORE", None)
+    command = [python, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests"]
+    report = root / "coverage.json"
+    if core is not None:
+        env["COVERAGE_CORE"] = core
+        command += ["--cov=benchpkg", f"--cov-report=json:{report}", *extra]
+    result = subprocess.run(command, cwd=root, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stdout[-2000:], result.stderr[-2000:], sep="\n", file=sys.stderr)
+        sys.exit(f"pytest falhou com o core {core}")
+    if core is None:
+        return None
+    with open(report, encoding="utf-8") as f:
+        return json.load(f)["totals"]["percent_covered"]
+
+
+def measure(python: str, root: Path, core: Optional[str], extra: List[str], repeat: int):
+    samples = []
+    coverage = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        coverage = run_suite(python, root, core, extra)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), coverage
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark dos cores de cobertura nos testes do Stop',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--python',
+        default=sys.executable,
+        help='Interpretador com pytest e pytest-cov (padrão: o atual)'
+    )
+    parser.add_argument(
+        '--modules',
+        type=int,
+        default=20,
+        help='Módulos (e arquivos de teste) da suíte sintética (padrão: 20)'
+    )
+    parser.add_argument(
+        '--calls',
+        type=int,
+        default=300,
+        help='Chamadas por teste; aumenta o tempo gasto no código medido (padrão: 300)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Execuções por medição; o resultado é a mediana (padrão: 3)'
+    )
+    parser.add_argument(
+        '--branch',
+        action='store_true',
+        help='Mede também cada core com --cov-branch'
+    )
+    args = parser.parse_args()
+
+    probe = subprocess.run(
+        [args.python, "-c", "import sys, pytest_cov; print(*sys.version_info[:2])"],
+        capture_output=True,
+        text=True
+    )
+    if probe.returncode != 0:
+        sys.exit(f"{args.python} não tem pytest-cov instalado")
+    version = tuple(int(part) for part in probe.stdout.split())
+
+    cases: Dict[str, tuple] = {"sem cobertura": (None, [])}
+    cases["ctrace"] = ("ctrace", [])
+    if version >= (3, 12):
+        cases["sysmon"] = ("sysmon", [])
+    cases["pytrace"] = ("pytrace", [])
+    cases["contexts (ctrace)"] = ("ctrace", ["--cov-context=test"])
+    if args.branch:
+        cases["ctrace + branch"] = ("ctrace", ["--cov-branch"])
+        if version >= (3, 12):
+            # Antes do Python 3.14 o coverage volta ao core padrão com branch
+            cases["sysmon + branch"] = ("sysmon", ["--cov-branch"])
+
+    print(f"Python {version[0]}.{version[1]}, {args.modules} módulos, {args.calls} chamadas por teste")
+    header = f"{'core':<18} {'tempo (s)':>10} {'custo':>8} {'cobertura':>10}"
+    print(header)
+    print("-" * len(header))
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        build_project(root, args.modules, args.calls)
+        baseline = None
+        for name, (core, extra) in cases.items():
+            elapsed, coverage = measure(args.python, root, core, extra, args.repeat)
+            if baseline is None:
+                baseline = elapsed
+            overhead = f"{(elapsed / baseline - 1) * 100:+.0f}%"
+            covered = "-" if coverage is None else f"{coverage:.1f}%"
+            print(f"{name:<18} {elapsed:>10.2f} {overhead:>8} {covered:>10}")
+
+
+if __name__ == '__main__':
+    main()
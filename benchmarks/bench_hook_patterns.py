@@ -0,0 +1,159 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+bench_hook_patterns.py - Benchmark dos padrões dos hooks de guardrail
+
+Compara a implementação anterior de validate_local_prompts e
+validate_functional_api (um re.search por padrão, com os padrões originais)
+com o PatternMatcher (padrões pré-compilados, com tempo de execução limitado)
+sobre arquivos Python sintéticos de milhares de linhas:
+- clean: código comum com docstrings, sem violações (caminho rápido)
+- prompt: código comum com um prompt hardcoded no final
+- docstrings: muitas docstrings e um trecho de prompt sem fechamento,
+  o caso que faz o padrão `[\\s\\S]*?` antigo retroceder sobre o arquivo
+
+Uso:
+    ./benchmarks/bench_hook_patterns.py                     # 1000, 2000 e 5000 linhas
+    ./benchmarks/bench_hook_patterns.py --lines 2000,8000 --repeat 10
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / "plugins" / "systemic-agent-orchestrator" / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+# Mede os padrões: sem isso os hooks usariam a análise por AST (python_analyzer)
+os.environ["GUARDRAIL_DETECTION"] = "regex"
+
+import validate_functional_api  # noqa: E402
+import validate_local_prompts  # noqa: E402
+
+# Padrões e laço anteriores ao PatternMatcher, mantidos como referência
+LEGACY_PROMPT_PATTERNS = [
+    r'ChatPromptTemplate\.from_template\s*\(\s*["\'](?:[^"\']{30,}|.*\\n.*)["\']',
+    r'ChatPromptTemplate\.from_messages\s*\(\s*\[\s*\(\s*["\'](?:system|user|assistant)["\'].*?["\'][^)]{50,}',
+    r'SystemMessage\s*\(\s*content\s*=\s*["\'][^"\']{50,}',
+    r'HumanMessage\s*\(\s*content\s*=\s*["\'][^"\']{50,}',
+    r'(?:SYSTEM_PROMPT|USER_PROMPT|PROMPT_TEMPLATE|ASSISTANT_PROMPT)\s*=\s*["\'\[]',
+    r'["\'][\'"]{2}[\s\S]*?(?:You are|Your task|Instructions:|Please respond|Answer the|As an AI)[\s\S]*?["\'][\'"]{2}',
+]
+
+
+def legacy_local_prompts(content: str) -> List[int]:
+    for allowed in validate_local_prompts.ALLOWED_PATTERNS:
+        if re.search(allowed, content, re.IGNORECASE):
+            return []
+    return [
+        index for index, pattern in enumerate(LEGACY_PROMPT_PATTERNS)
+        if re.search(pattern, content, re.DOTALL | re.MULTILINE)
+    ]
+
+
+def legacy_functional_api(content: str) -> List[int]:
+    return [
+        index for index, (pattern, _) in enumerate(validate_functional_api.BLOCKED_PATTERNS)
+        if re.search(pattern, content)
+    ]
+
+
+def current_local_prompts(content: str):
+    return validate_local_prompts.check("bench.py", content)
+
+
+def current_functional_api(content: str):
+    return validate_functional_api.check("bench.py", content)
+
+
+FUNCTION_TEMPLATE = '''
+
+def handler_{n}(state: dict) -> dict:
+    """Process step {n} of the workflow and return the partial state update."""
+    items = [value * {n} for value in state.get("values", [])]
+    if not items:
+        return {{"status": "empty", "step": {n}}}
+    return {{"status": "ok", "total": sum(items), "step": {n}}}
+'''
+
+PROMPT_TAIL = '''
+
+def build_prompt() -> str:
+    return """You are a helpful assistant.
+Answer the question using the retrieved context."""
+'''
+
+# Abre uma string com palavra-chave de prompt que nunca é fechada
+UNTERMINATED_TAIL = '''
+
+NOTES = """Your task is to summarize the data
+'''
+
+
+def python_file(lines: int, tail: str = "") -> str:
+    """Arquivo Python sintético com aproximadamente `lines` linhas"""
+    header = '"""Synthetic module for the hook benchmark."""\nfrom langgraph.graph import StateGraph\n'
+    block_lines = FUNCTION_TEMPLATE.count("\n")
+    body = "".join(FUNCTION_TEMPLATE.format(n=n) for n in range(max(1, lines // block_lines)))
+    return header + body + tail
+
+
+def measure(action: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark dos padrões dos hooks de guardrail',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--lines',
+        default='1000,2000,5000',
+        help='Tamanhos dos arquivos em linhas, separados por vírgula (padrão: 1000,2000,5000)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Execuções por medição; o resultado é a mediana (padrão: 3)'
+    )
+    args = parser.parse_args()
+
+    cases: Dict[str, str] = {"clean": "", "prompt": PROMPT_TAIL, "docstrings": UNTERMINATED_TAIL}
+    header = (f"{'linhas':>7}  {'caso':<11} {'hook':<15} {'anterior (ms)':>14} "
+              f"{'atual (ms)':>11} {'speedup':>8}")
+    print(header)
+    print("-" * len(header))
+
+    for lines in [int(value) for value in args.lines.split(',') if value.strip()]:
+        for case, tail in cases.items():
+            content = python_file(lines, tail)
+            for hook, legacy, current in (
+                ("local_prompts", legacy_local_prompts, current_local_prompts),
+                ("functional_api", legacy_functional_api, current_functional_api),
+            ):
+                if bool(legacy(content)) != bool(current(content)):
+                    print(f"Resultado divergente: {hook} em {case} ({lines} linhas)", file=sys.stderr)
+                    sys.exit(1)
+                before = measure(lambda: legacy(content), args.repeat)
+                after = measure(lambda: current(content), args.repeat)
+                print(f"{lines:>7}  {case:<11} {hook:<15} {before * 1000:>14.2f} "
+                      f"{after * 1000:>11.2f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
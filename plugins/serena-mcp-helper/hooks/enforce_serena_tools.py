@@ -55,15 +55,8 @@ def extract_file_from_bash(command: str) -> str | None:
     return None
 
 
-def main() -> None:
+def respond(input_data: dict) -> dict:
     """Block native tools for .py/.tf files, suggest Serena alternatives."""
-    try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        # Allow if we can't parse input
-        print(json.dumps({}))
-        return
-
     tool_name = input_data.get("tool_name", "")
     tool_input = input_data.get("tool_input", {})
 
@@ -79,14 +72,12 @@ def main() -> None:
     # Check file-based tools (currently all allowed)
     if tool_name in file_tools:
         if is_enforced_file(file_path):
-            block_with_message(
+            return deny(
                 f"Tool '{tool_name}' bloqueada para arquivos .py/.tf!",
                 f"Arquivo: {file_path}"
             )
-            return
         # Allow for non-.py/.tf files
-        print(json.dumps({}))
-        return
+        return {}
 
     # Check search tools - only block if pattern explicitly targets .py/.tf
     if tool_name in search_tools:
@@ -94,14 +85,12 @@ def main() -> None:
         pattern = tool_input.get("pattern", "")
         if pattern.endswith(".py") or pattern.endswith(".tf") or \
            "*.py" in pattern or "*.tf" in pattern:
-            block_with_message(
+            return deny(
                 f"Tool '{tool_name}' bloqueada para busca de arquivos .py/.tf!",
                 f"Pattern: {pattern}"
             )
-            return
         # Allow general searches
-        print(json.dumps({}))
-        return
+        return {}
 
     # Check Bash commands writing to .py/.tf files
     if tool_name == "Bash":
@@ -109,21 +98,31 @@ def main() -> None:
         if BASH_WRITE_REGEX.search(command):
             target_file = extract_file_from_bash(command)
             if target_file and is_enforced_file(target_file):
-                block_with_message(
+                return deny(
                     "Comando Bash de escrita bloqueado para arquivos .py/.tf!",
                     f"Comando: {command[:100]}..."
                 )
-                return
         # Allow other Bash commands
+        return {}
+
+    # Allow all other tools
+    return {}
+
+
+def main() -> None:
+    """Read the hook payload and print the decision."""
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        # Allow if we can't parse input
         print(json.dumps({}))
         return
 
-    # Allow all other tools
-    print(json.dumps({}))
+    print(json.dumps(respond(input_data)))
 
 
-def block_with_message(title: str, context: str) -> None:
-    """Print block message with proper hook format and exit."""
+def deny(title: str, context: str) -> dict:
+    """Build the block response with proper hook format."""
     serena_alternatives = """
 **Alternativas Serena MCP (para .py e .tf):**
 
@@ -150,15 +149,13 @@ def block_with_message(title: str, context: str) -> None:
 
     reason = f"{title}\n\n{context}\n{serena_alternatives}"
 
-    result = {
+    return {
         "hookSpecificOutput": {
             "hookEventName": "PreToolUse",
             "permissionDecision": "deny",
             "permissionDecisionReason": reason
         }
     }
-    print(json.dumps(result))
-    sys.exit(0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Hook client: forward a hook payload to the hook daemon (hook_daemon.py).
+
+When the daemon is not running (HOOK_DAEMON=0, idle shutdown), it is started
+again in the background and this event runs the hook on its own: in-process
+when the hook needs nothing beyond the standard library, otherwise with
+`uv run`, which provides the dependencies declared in the script header.
+
+Usage: hook_client.py <hook>   (hook payload on stdin)
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import os
+import re
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+
+# hook_client.py and hook_daemon.py are copied into every plugin that uses the
+# daemon, since plugins are installed independently and cannot import each
+# other. Only DAEMON_NAME, HOOKS and the daemon's script header differ between
+# the copies; tests/test_hook_client.py keeps them in sync.
+DAEMON_NAME = "serena-mcp-helper"
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Hook name -> (module exposing respond(input_data) -> dict, daemon response timeout)
+HOOKS = {
+    "enforce_serena_tools": ("enforce_serena_tools", 5.0),
+}
+
+CONNECT_TIMEOUT = 0.2
+DAEMON_ENABLED = os.environ.get("HOOK_DAEMON", "1") != "0"
+
+# `dependencies = [...]` in the PEP 723 `# /// script` header
+SCRIPT_DEPENDENCIES = re.compile(r"^# dependencies = \[\s*\S", re.MULTILINE)
+
+
+def owned_privately(path: str) -> bool:
+    """Whether `path` belongs to this user, is not a symlink and is closed to group and others."""
+    if not hasattr(os, "getuid"):
+        return True  # Windows: the temp dir is already per-user
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return info.st_uid == os.getuid() and not stat.S_ISLNK(info.st_mode) and not info.st_mode & 0o077
+
+
+def private_dir(name: str) -> str | None:
+    """Directory `name` in the runtime (or temp) dir, created 0700 for this user.
+
+    None if it cannot be created or is not private: in a shared temp dir
+    another user could create the path first and answer in the daemon's place.
+    """
+    if hasattr(os, "getuid"):
+        name = f"{name}-{os.getuid()}"
+    path = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), name)
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        try:
+            info = os.lstat(path)
+            if hasattr(os, "getuid") and info.st_uid == os.getuid() and stat.S_ISDIR(info.st_mode):
+                os.chmod(path, 0o700)  # Ours, but created with the default mode by an older version
+        except OSError:
+            return None
+    except OSError:
+        return None
+    return path if owned_privately(path) else None
+
+
+def socket_path() -> str | None:
+    """Socket of the daemon serving this plugin installation (None without a private dir)."""
+    directory = private_dir(DAEMON_NAME)
+    if directory is None:
+        return None
+    digest = hashlib.sha1(HOOKS_DIR.encode()).hexdigest()[:8]
+    return os.path.join(directory, f"hooks-{digest}.sock")
+
+
+def request(hook: str, payload: dict, timeout: float) -> dict | None:
+    """Send a request to the daemon. Returns None if the daemon is unreachable."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = socket_path()
+    if path is None or not owned_privately(path):
+        return None  # Never trust a socket another user could have created
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps({"hook": hook, "payload": payload}).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+
+
+def needs_uv(module_name: str) -> bool:
+    """Whether the hook script declares third-party dependencies (PyYAML, ...)."""
+    try:
+        with open(os.path.join(HOOKS_DIR, f"{module_name}.py"), encoding="utf-8") as f:
+            header = f.read(1024)
+    except OSError:
+        return False
+    return SCRIPT_DEPENDENCIES.search(header.split("# ///\n", 1)[0]) is not None
+
+
+def start_daemon():
+    """Spawn the daemon again, as SessionStart does (it exits on its own when idle)."""
+    if not DAEMON_ENABLED:
+        return
+    daemon = os.path.join(HOOKS_DIR, "hook_daemon.py")
+    command = ["uv", "run", daemon, "start"] if needs_uv("hook_daemon") else [sys.executable, daemon, "start"]
+    try:
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    except OSError:
+        pass
+
+
+def run_in_process(hook: str, payload: dict) -> dict:
+    """Run the hook module directly, as if it had been invoked on its own."""
+    module_name, _ = HOOKS[hook]
+    if sys.version_info < (3, 10) or needs_uv(module_name):
+        # Python 3.10+ and the script's dependencies: let uv provide them
+        try:
+            result = subprocess.run(
+                ["uv", "run", os.path.join(HOOKS_DIR, f"{module_name}.py")],
+                input=json.dumps(payload),
+                capture_output=True,
+                text=True
+            )
+            return json.loads(result.stdout or "{}")
+        except FileNotFoundError:
+            if sys.version_info < (3, 10):
+                raise
+            # No uv: the checks that do not need the dependencies still run
+
+    if HOOKS_DIR not in sys.path:
+        sys.path.insert(0, HOOKS_DIR)
+    return importlib.import_module(module_name).respond(payload)
+
+
+def main():
+    hook = sys.argv[1] if len(sys.argv) > 1 else ""
+    if hook not in HOOKS:
+        print(json.dumps({}))
+        return
+
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        print(json.dumps({}))
+        return
+
+    response = request(hook, input_data, HOOKS[hook][1])
+    if response is None:
+        start_daemon()
+        try:
+            response = run_in_process(hook, input_data)
+        except Exception:
+            # Non-blocking on error - allow operation to proceed
+            response = {}
+
+    print(json.dumps(response))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,24 @@ import shutil
 import subprocess
 import sys
 
+# Pyright version once found (kept across SessionStart events by the hook daemon)
+_PYRIGHT_VERSION: str | None = None
+
 
 def check_pyright_installed() -> tuple[bool, str]:
     """Check if Pyright is installed and get version."""
+    global _PYRIGHT_VERSION
+    if _PYRIGHT_VERSION is not None:
+        return True, _PYRIGHT_VERSION
+
+    is_installed, version = find_pyright()
+    if is_installed:
+        _PYRIGHT_VERSION = version
+    return is_installed, version
+
+
+def find_pyright() -> tuple[bool, str]:
+    """Look up Pyright on PATH or through npx."""
     # Check if pyright command exists
     pyright_path = shutil.which("pyright")
     if pyright_path:
@@ -50,19 +65,12 @@ def check_pyright_installed() -> tuple[bool, str]:
     return False, ""
 
 
-def main() -> None:
-    """Validate Pyright LSP on SessionStart."""
-    try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        print(json.dumps({}))
-        return
-
+def respond(input_data: dict) -> dict:
+    """Build the hook response for a SessionStart payload."""
     # Only run on SessionStart event
     hook_event = input_data.get("hook_event_name", "")
     if hook_event != "SessionStart":
-        print(json.dumps({}))
-        return
+        return {}
 
     is_installed, version = check_pyright_installed()
 
@@ -96,15 +104,24 @@ After installation, restart Claude Code to enable LSP features.
 
 Run /systemic-agent-orchestrator:setup to auto-install."""
 
-        result = {
+        return {
             "decision": "block",
             "reason": reason
         }
-        print(json.dumps(result))
-        return
 
     # Pyright installed - pass silently
-    print(json.dumps({}))
+    return {}
+
+
+def main() -> None:
+    """Validate Pyright LSP on SessionStart."""
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        print(json.dumps({}))
+        return
+
+    print(json.dumps(respond(input_data)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Effective content of a Write/Edit/MultiEdit call: the file as it will be
+after the tool runs, so the guardrails validate the whole result instead of
+the `new_string` fragment.
+
+The on-disk file is read once and the replacements are applied in memory.
+The line count is derived from the original count plus the line delta of
+each replacement instead of recounting the merged buffer. The original count
+is kept too, so an edit that shrinks an oversized file can be told apart
+from one that grows it.
+
+Only files some guardrail validates (GUARDED_SUFFIXES) are read from disk.
+"""
+import os
+from dataclasses import dataclass
+
+# Python files and models.yaml; the validators ignore every other file
+GUARDED_SUFFIXES = ('.py', 'models.yaml')
+
+
+@dataclass
+class EffectiveContent:
+    """Resulting file content and its line count (same as len(content.split('\\n'))).
+
+    `original_line_count` is the line count of the file on disk before the
+    tool runs, None when it does not exist or was not read.
+    """
+    file_path: str
+    content: str
+    line_count: int
+    original_line_count: int | None = None
+
+
+def _count_lines(text: str) -> int:
+    return text.count('\n') + 1
+
+
+def _from_fragment(file_path: str, fragment: str) -> EffectiveContent:
+    """Fallback when the edit cannot be replayed: validate the fragment alone."""
+    return EffectiveContent(file_path, fragment, _count_lines(fragment))
+
+
+def _apply_edits(file_path: str, original: str, edits: list[dict]) -> EffectiveContent | None:
+    """Apply Edit-style replacements in order. None if one of them does not apply."""
+    content = original
+    original_line_count = line_count = _count_lines(original)
+    for edit in edits:
+        old_string = edit.get('old_string', '')
+        new_string = edit.get('new_string', '')
+        occurrences = content.count(old_string) if old_string else 0
+        if occurrences == 0:
+            return None
+        if not edit.get('replace_all', False):
+            occurrences = 1
+        content = content.replace(old_string, new_string, occurrences)
+        line_count += occurrences * (new_string.count('\n') - old_string.count('\n'))
+    return EffectiveContent(file_path, content, line_count, original_line_count)
+
+
+def _read(file_path: str, cwd: str | None) -> str | None:
+    """The file on disk, relative paths resolved against the payload's cwd. None if unreadable."""
+    if cwd and not os.path.isabs(file_path):
+        file_path = os.path.join(cwd, file_path)
+    try:
+        with open(file_path, encoding='utf-8', errors='replace', newline='') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def build_effective_content(input_data: dict) -> EffectiveContent:
+    """Build the content the validators should see for a PreToolUse payload."""
+    tool_name = input_data.get('tool_name', '')
+    tool_input = input_data.get('tool_input', {})
+    file_path = tool_input.get('file_path', '') or tool_input.get('path', '')
+
+    if tool_name == 'MultiEdit':
+        edits = tool_input.get('edits', [])
+    elif tool_name == 'Edit':
+        edits = [tool_input]
+    else:
+        content = tool_input.get('content', '') or tool_input.get('new_string', '')
+        effective = EffectiveContent(file_path, content, _count_lines(content))
+        if tool_name == 'Write' and file_path.endswith('.py'):
+            original = _read(file_path, input_data.get('cwd'))
+            if original is not None:
+                effective.original_line_count = _count_lines(original)
+        return effective
+
+    fragment = '\n'.join(edit.get('new_string', '') for edit in edits)
+    if not file_path.endswith(GUARDED_SUFFIXES):
+        return _from_fragment(file_path, fragment)
+
+    original = _read(file_path, input_data.get('cwd'))
+    if original is None:
+        return _from_fragment(file_path, fragment)
+
+    # An edit that does not apply makes the tool call fail: fall back to the fragment
+    return _apply_edits(file_path, original, edits) or _from_fragment(file_path, fragment)
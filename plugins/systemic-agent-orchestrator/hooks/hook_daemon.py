@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# dependencies = ["pyyaml"]
+# ///
+"""
+Hook daemon: serve hook requests from hook_client.py over a Unix socket.
+Keeps the hook modules loaded (compiled regexes, YAML parser, ruff/pyright
+discovery) so each hook event costs a socket round-trip instead of a new
+interpreter. Exits after HOOK_DAEMON_IDLE seconds without requests.
+
+Usage:
+    hook_daemon.py start   # SessionStart hook: spawn the daemon unless running
+    hook_daemon.py serve   # Run in the foreground
+    hook_daemon.py stop    # Ask a running daemon to exit
+
+Environment:
+    HOOK_DAEMON=0          # Never spawn the daemon (each hook runs on its own)
+    HOOK_DAEMON_IDLE=1800  # Idle shutdown, in seconds
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import hook_client  # Copied with this file into each plugin (see hook_client.py)
+
+IDLE_TIMEOUT = float(os.environ.get("HOOK_DAEMON_IDLE", "1800"))
+ENABLED = os.environ.get("HOOK_DAEMON", "1") != "0"
+PING_TIMEOUT = 1.0
+
+
+def handle(connection: socket.socket, modules: dict, stop: threading.Event):
+    """Answer a single request: one JSON object in, one JSON object out."""
+    with connection:
+        connection.settimeout(5)
+        chunks = []
+        try:
+            while chunk := connection.recv(65536):
+                chunks.append(chunk)
+        except OSError:
+            return
+
+        try:
+            request = json.loads(b"".join(chunks))
+            hook = request.get("hook")
+            if hook == "ping":
+                response = {"pid": os.getpid()}
+            elif hook == "stop":
+                stop.set()
+                response = {}
+            else:
+                response = modules[hook].respond(request.get("payload", {}))
+        except Exception:
+            # Non-blocking on error - allow operation to proceed
+            response = {}
+
+        try:
+            connection.sendall(json.dumps(response).encode() + b"\n")
+        except OSError:
+            pass
+
+
+def _notify(modules: dict, event: str):
+    """Call the optional `on_daemon_start`/`on_daemon_stop` of each hook module."""
+    for module in set(modules.values()):
+        callback = getattr(module, event, None)
+        if callback is not None:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+def serve():
+    """Listen on the plugin socket until idle or stopped."""
+    if hook_client.request("ping", {}, PING_TIMEOUT) is not None:
+        return  # Already running
+
+    modules = {
+        hook: importlib.import_module(module_name)
+        for hook, (module_name, _) in hook_client.HOOKS.items()
+    }
+    _notify(modules, "on_daemon_start")
+
+    path = hook_client.socket_path()
+    if path is None:
+        return  # No private directory for the socket: hooks run on their own
+    try:
+        os.unlink(path)  # Stale socket from a daemon that did not exit cleanly
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        return  # Not ours to replace
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(previous_umask)
+    server.listen(16)
+    server.settimeout(1.0)
+    inode = os.stat(path).st_ino
+
+    stop = threading.Event()
+    workers: list[threading.Thread] = []
+    last_request = time.monotonic()
+    try:
+        while not stop.is_set() and time.monotonic() - last_request < IDLE_TIMEOUT:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                continue
+            last_request = time.monotonic()
+            worker = threading.Thread(target=handle, args=(connection, modules, stop), daemon=True)
+            worker.start()
+            workers = [w for w in workers if w.is_alive()] + [worker]
+    finally:
+        server.close()
+        for worker in workers:
+            worker.join(timeout=30)
+        _notify(modules, "on_daemon_stop")
+        try:
+            # Only remove the socket if another daemon has not replaced it
+            if os.stat(path).st_ino == inode:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def start():
+    """Spawn the daemon in the background if it is not already running."""
+    if ENABLED and hasattr(socket, "AF_UNIX") and \
+            hook_client.request("ping", {}, PING_TIMEOUT) is None:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "serve"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    print(json.dumps({}))
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "start"
+    if command == "serve":
+        serve()
+    elif command == "stop":
+        hook_client.request("stop", {}, PING_TIMEOUT)
+    else:
+        try:
+            start()
+        except Exception:
+            print(json.dumps({}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Test impact analysis for run_tests_on_stop.py.
+
+A full run that refreshes the map records coverage per test
+(`--cov-context=test`) and keeps a map from each source file to the tests that
+execute it, together with a snapshot of every file in src/ and tests/ and of
+the configuration files at the last green run. On the next Stop only the tests
+covering the files changed since that snapshot are run. Anything the map
+cannot answer for (new or removed modules, conftest.py, fixtures and data
+files, ...) triggers a full run, as does a change no mapped test covers. The
+map is refreshed on the first run, every TEST_FULL_RUN_EVERY-th selective run,
+and when a module is added to src/ or removed or a stale test id shows up; the
+other full runs only evaluate the coverage gate and record no contexts, so
+they can use the cheaper sys.monitoring core. The coverage gate is only
+evaluated on full runs, so after a red full run every Stop runs the full suite
+until one passes.
+
+State lives in <project>/.claude/hooks-cache/.
+
+Environment:
+    TEST_SELECTION=impact     # `full` always runs the whole suite
+    TEST_FULL_RUN_EVERY=10    # Selective runs between two full runs
+"""
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from workspace_fingerprint import CACHE_DIR, cache_dir, file_hashes, iter_files
+
+SELECTION = os.environ.get("TEST_SELECTION", "impact")
+FULL_RUN_EVERY = int(os.environ.get("TEST_FULL_RUN_EVERY", "10"))
+
+STATE_VERSION = 2
+
+# Above this many node ids, whole test files are selected instead
+MAX_NODE_IDS = 200
+
+# Root files that change how tests run; a change forces a full run
+CONFIG_FILES = ("pyproject.toml", "setup.cfg", "pytest.ini", "tox.ini", ".coveragerc", "uv.lock")
+
+
+@dataclass
+class Selection:
+    """Which tests to run on this Stop."""
+    full: bool
+    reason: str
+    tests: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    # Full run recording per-test contexts to rebuild the map
+    refresh: bool = False
+
+
+def _is_test_module(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    if not (path.startswith("tests/") and path.endswith(".py")):
+        return False
+    return name.startswith("test_") or name.endswith("_test.py")
+
+
+class ImpactMap:
+    """Persistent source-to-tests map and last green snapshot of a project."""
+
+    def __init__(self, project_root: Path):
+        self.project_root = project_root
+        self.enabled = SELECTION != "full"
+        self.state_file = project_root / CACHE_DIR / "test_impact.json"
+        self.coverage_file = project_root / CACHE_DIR / "coverage.sqlite"
+        self.state = self._load()
+        self._current: dict | None = None
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"version": STATE_VERSION, "sources": {}, "snapshot": None, "runs_since_full": 0,
+                "full_run_failed": False}
+
+    def _save(self):
+        cache_dir(self.project_root)
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def _tracked_files(self) -> list[Path]:
+        return iter_files(
+            self.project_root,
+            [self.project_root / name for name in CONFIG_FILES],
+        ) + iter_files(
+            self.project_root,
+            [self.project_root / "src", self.project_root / "tests"],
+        )
+
+    def snapshot(self) -> dict[str, list]:
+        """{relative path: [mtime_ns, size, sha1]}; unchanged stats reuse the old hash."""
+        if self._current is None:
+            self._current = file_hashes(self.project_root, self._tracked_files(), self.state.get("snapshot") or {})
+        return self._current
+
+    def changed_files(self) -> list[str]:
+        """Files added, removed or modified since the last green run."""
+        previous = self.state["snapshot"] or {}
+        current = self.snapshot()
+        return sorted(
+            path for path in previous.keys() | current.keys()
+            if (previous.get(path) or [None] * 3)[2] != (current.get(path) or [None] * 3)[2]
+        )
+
+    def select(self) -> Selection:
+        """Decide between a full run and the tests impacted by the changes."""
+        if not self.enabled:
+            return Selection(True, "TEST_SELECTION=full")
+        self.snapshot()  # The state being tested, recorded if the run is green
+        if not self.state["sources"] or self.state["snapshot"] is None:
+            return Selection(True, "no test impact map yet", refresh=True)
+        if self.state.get("full_run_failed"):
+            # A selective run skips the coverage gate: it must not lift the block
+            return Selection(True, "last full run failed")
+        if self.state["runs_since_full"] >= FULL_RUN_EVERY:
+            return Selection(True, f"periodic full run (every {FULL_RUN_EVERY})", refresh=True)
+
+        changed = self.changed_files()
+        test_files: set[str] = set()
+        node_ids: set[str] = set()
+        for path in changed:
+            exists = (self.project_root / path).exists()
+            if not exists and (_is_test_module(path) or path in self.state["sources"]):
+                # The map still points at the removed module
+                return Selection(True, f"{path} removed", changed=changed, refresh=True)
+            if _is_test_module(path):
+                test_files.add(path)
+            elif path.startswith("src/") and path in self.state["sources"]:
+                node_ids.update(self.state["sources"][path])
+            else:
+                # Fixtures and data files are not in the map. Only a source module
+                # missing from the map needs new contexts
+                refresh = path.startswith("src/") and path.endswith(".py")
+                return Selection(True, f"{path} changed", changed=changed, refresh=refresh)
+
+        node_ids = {node for node in node_ids if node.split("::", 1)[0] not in test_files}
+        if len(node_ids) > MAX_NODE_IDS:
+            test_files.update(node.split("::", 1)[0] for node in node_ids)
+            node_ids = set()
+        tests = sorted(test_files) + sorted(node_ids)
+        if changed and not tests:
+            # Changes no test is known to run must not pass without running anything
+            return Selection(True, "no test mapped to the changes", changed=changed, refresh=True)
+        if not changed:
+            reason = "no changes since last green run"
+        else:
+            reason = f"{len(tests)} test target(s) for {len(changed)} changed file(s)"
+        return Selection(False, reason, tests, changed)
+
+    def _read_contexts(self) -> dict[str, list[str]] | None:
+        """Source file -> test node ids, from the coverage data of a full run."""
+        if not self.coverage_file.exists():
+            return None
+        sources: dict[str, set[str]] = {}
+        try:
+            connection = sqlite3.connect(f"file:{self.coverage_file}?mode=ro", uri=True)
+            try:
+                rows = []
+                for table in ("line_bits", "arc"):
+                    rows += connection.execute(
+                        f"SELECT DISTINCT file.path, context.context FROM {table} "
+                        f"JOIN file ON file.id = {table}.file_id "
+                        f"JOIN context ON context.id = {table}.context_id"
+                    ).fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return None
+
+        for path, context in rows:
+            node_id = context.rsplit("|", 1)[0]  # pytest-cov: "<node id>|setup|run|teardown"
+            if not node_id:
+                continue  # Code run at import time, outside any test
+            try:
+                relative = Path(path).resolve().relative_to(self.project_root.resolve()).as_posix()
+            except ValueError:
+                continue
+            sources.setdefault(relative, set()).add(node_id)
+        return {path: sorted(node_ids) for path, node_ids in sources.items()}
+
+    def record(self, selection: Selection, passed: bool):
+        """Update the map after a run; only green runs move the snapshot."""
+        if not self.enabled:
+            return
+        if selection.full:
+            if selection.refresh:
+                sources = self._read_contexts()
+                if sources:
+                    self.state["sources"] = sources
+                if passed:
+                    self.state["runs_since_full"] = 0
+            self.state["full_run_failed"] = not passed
+        elif passed and selection.tests:
+            self.state["runs_since_full"] += 1
+        if passed:
+            self.state["snapshot"] = self.snapshot()
+        self._save()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Precompiled matcher shared by the regex-based guardrail hooks.
+Patterns are compiled once at import and stay compiled in the hook daemon.
+Each one keeps its literal prefix, which lets `re` skip ahead to candidate
+positions instead of trying every alternative at every offset.
+"""
+import re
+
+
+def atomic(name: str, pattern: str) -> str:
+    """Atomic group for Python 3.10: match `pattern` once, never backtrack into it.
+
+    A lookahead is not re-entered on failure, so capturing inside it and
+    consuming the capture with a backreference gives the semantics of
+    `(?>pattern)`, which `re` only supports from 3.11. `name` must be unique
+    within the final regex.
+    """
+    return f"(?=(?P<{name}>{pattern}))(?P={name})"
+
+
+class PatternMatcher:
+    """Match content against a list of (pattern, description) pairs.
+
+    With `ignore_case`, the content is lower-cased once per call instead of
+    compiling with re.IGNORECASE, which disables the literal-prefix search.
+    The patterns must then be written in lower case.
+    """
+
+    def __init__(self, patterns: list[tuple[str, str]], flags: int = 0, ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.patterns = [(re.compile(pattern, flags), description) for pattern, description in patterns]
+
+    def search(self, content: str) -> str | None:
+        """Return the description of the first pattern that matches, or None."""
+        if self.ignore_case:
+            content = content.lower()
+        for pattern, description in self.patterns:
+            if pattern.search(content):
+                return description
+        return None
+
+    def violations(self, content: str) -> list[str]:
+        """Return the description of every pattern that matches, in list order."""
+        if self.ignore_case:
+            content = content.lower()
+        return [description for pattern, description in self.patterns if pattern.search(content)]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# dependencies = ["pyyaml"]
+# ///
+"""
+Hook: Run all PreToolUse guardrail validators in a single process.
+Reads the hook payload once, builds the resulting file content (Edit/MultiEdit
+replacements applied to the file on disk), runs every registered validator
+in-process on it and merges their deny reasons into a single response.
+"""
+import json
+import sys
+
+import validate_file_size
+import validate_functional_api
+import validate_local_prompts
+import validate_models_yaml
+from effective_content import EffectiveContent, build_effective_content
+
+# Each validator receives the effective content and returns a deny reason or None
+VALIDATORS = [
+    lambda effective: validate_functional_api.check(effective.file_path, effective.content),
+    lambda effective: validate_local_prompts.check(effective.file_path, effective.content),
+    lambda effective: validate_file_size.check(
+        effective.file_path, effective.content, effective.line_count, effective.original_line_count
+    ),
+    lambda effective: validate_models_yaml.check(effective.file_path, effective.content),
+]
+
+REASON_SEPARATOR = "\n\n" + "=" * 60 + "\n\n"
+
+
+def check_all(effective: EffectiveContent) -> list[str]:
+    """Run every validator and return the deny reasons found."""
+    reasons = []
+    for validator in VALIDATORS:
+        try:
+            reason = validator(effective)
+        except Exception:
+            # Non-blocking on error, same as running the validator on its own
+            continue
+        if reason:
+            reasons.append(reason)
+    return reasons
+
+
+def respond(input_data: dict) -> dict:
+    """Build the hook response for a PreToolUse payload."""
+    reasons = check_all(build_effective_content(input_data))
+    if reasons:
+        return {
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "deny",
+                "permissionDecisionReason": REASON_SEPARATOR.join(reasons)
+            }
+        }
+    return {}
+
+
+def main():
+    try:
+        input_data = json.load(sys.stdin)
+        print(json.dumps(respond(input_data)))
+
+    except Exception as e:
+        print(json.dumps({}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Structured pytest results for run_tests_on_stop.py.
+
+pytest writes its raw output to a rotating log in .claude/hooks-cache/, a
+JUnit XML report and, on full runs, a coverage JSON report. The hook reads
+those files instead of scraping captured stdout. The XML is streamed and
+only the first failures and the slowest tests are kept, so memory does not
+grow with the size of the suite.
+"""
+import heapq
+import json
+import os
+import xml.etree.ElementTree as ElementTree
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+MAX_FAILURES = 10
+LOWEST_COVERAGE = 5
+LOG_BACKUPS = 3
+
+
+@dataclass
+class PytestResults:
+    """What the block reason needs from a pytest run."""
+    total: int = 0
+    failures: int = 0
+    failed: list[str] = field(default_factory=list)
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    coverage: float | None = None
+    lowest_coverage: list[tuple[float, str]] = field(default_factory=list)
+
+
+def rotate_log(log_file: Path, backups: int = LOG_BACKUPS):
+    """Shift pytest.log to pytest.log.1 ... keeping `backups` previous runs."""
+    for index in range(backups - 1, 0, -1):
+        older = log_file.with_name(f"{log_file.name}.{index}")
+        if older.exists():
+            os.replace(older, log_file.with_name(f"{log_file.name}.{index + 1}"))
+    if log_file.exists():
+        os.replace(log_file, log_file.with_name(f"{log_file.name}.1"))
+
+
+def tail(log_file: Path, lines: int = 20) -> str:
+    """Last lines of the log, read without loading the whole file."""
+    try:
+        with open(log_file, encoding="utf-8", errors="replace") as f:
+            return "".join(deque(f, maxlen=lines)).rstrip()
+    except OSError:
+        return ""
+
+
+def _node_id(testcase: ElementTree.Element) -> str:
+    """pytest node id from a junit_family=xunit1 testcase (which has a `file` attribute)."""
+    name = testcase.get("name", "")
+    classname = testcase.get("classname", "")
+    file = testcase.get("file")
+    if not file:
+        return f"{classname}::{name}" if classname else name
+    module = file[:-3].replace("/", ".") if file.endswith(".py") else file
+    if name == module:
+        return file  # Collection error of the whole module
+    test_class = classname[len(module) + 1:] if classname.startswith(module + ".") else ""
+    return "::".join(part for part in (file, test_class, name) if part)
+
+
+def read_junit(junit_file: Path, results: PytestResults, slowest: int):
+    """Stream the JUnit report: count tests, keep the first failures and the slowest tests."""
+    durations: list[tuple[float, str]] = []
+    parents: list[ElementTree.Element] = []
+    try:
+        for event, element in ElementTree.iterparse(junit_file, events=("start", "end")):
+            if event == "start":
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag != "testcase":
+                continue
+            results.total += 1
+            node_id = _node_id(element)
+            problem = element.find("failure")
+            if problem is None:
+                problem = element.find("error")
+            if problem is not None:
+                results.failures += 1
+                if len(results.failed) < MAX_FAILURES:
+                    message = (problem.get("message") or "").strip().splitlines()
+                    results.failed.append(f"{node_id} - {message[0][:150]}" if message else node_id)
+            try:
+                entry = (float(element.get("time", "0")), node_id)
+            except ValueError:
+                entry = (0.0, node_id)
+            if len(durations) < slowest:
+                heapq.heappush(durations, entry)
+            elif slowest:
+                heapq.heappushpop(durations, entry)
+            # Detach the case from its testsuite too, or the tree keeps every emptied element
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+    except (OSError, ElementTree.ParseError):
+        return
+    # Like pytest --durations, near-instant tests are not worth listing
+    results.slowest = [entry for entry in sorted(durations, reverse=True) if entry[0] >= 0.005]
+
+
+def read_coverage(coverage_file: Path, results: PytestResults, project_root: Path, below: float):
+    """Total coverage and the least covered files (under `below` percent) from a coverage JSON report."""
+    try:
+        with open(coverage_file, encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return
+    totals = report.get("totals", {})
+    # --cov-fail-under compares the total rounded to the report precision: so must the hook
+    try:
+        results.coverage = float(totals["percent_covered_display"])
+    except (KeyError, TypeError, ValueError):
+        results.coverage = totals.get("percent_covered")
+    files = (
+        (data.get("summary", {}).get("percent_covered", 100.0), path)
+        for path, data in report.get("files", {}).items()
+    )
+    results.lowest_coverage = [
+        (percent, os.path.relpath(os.path.join(project_root, path), project_root))
+        for percent, path in heapq.nsmallest(LOWEST_COVERAGE, files)
+        if percent < below
+    ]
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Warm pytest server for run_tests_on_stop.py (TEST_SERVER=1).
+
+Runs inside the project's environment (`uv run python pytest_server.py serve
+<project>`), imports pytest, its plugins and the third-party packages that
+src/ and tests/ import (LangChain, LangGraph, boto3, ...) once, then forks a
+child per test run. The child starts from the preloaded interpreter and only
+imports the project's own modules, so a run costs test time instead of
+interpreter startup and import overhead.
+
+The server exits when pyproject.toml or uv.lock change (the preloaded
+packages may be stale), after TEST_SERVER_IDLE seconds without runs, or on
+`pytest_server.py stop <project>`. The Stop hook falls back to the cold
+`uv run pytest` whenever the server is not available.
+"""
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from hook_client import owned_privately, private_dir
+
+IDLE_TIMEOUT = float(os.environ.get("TEST_SERVER_IDLE", "1800"))
+CONNECT_TIMEOUT = 1.0
+
+# A change to these means the preloaded packages may be outdated
+DEPENDENCY_FILES = ("pyproject.toml", "uv.lock")
+
+
+def available() -> bool:
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+
+def socket_path(project_root: Path) -> str | None:
+    """Per-project socket in the user's private directory (None without one)."""
+    directory = private_dir("systemic-agent-orchestrator")
+    if directory is None:
+        return None
+    digest = hashlib.sha1(str(project_root.resolve()).encode()).hexdigest()[:8]
+    return os.path.join(directory, f"pytest-{digest}.sock")
+
+
+def _dependency_stamp(project_root: Path) -> list:
+    stamp = []
+    for name in DEPENDENCY_FILES:
+        try:
+            stat = (project_root / name).stat()
+            stamp.append([name, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            stamp.append([name, None, None])
+    return stamp
+
+
+def _third_party_imports(project_root: Path) -> list[str]:
+    """Top-level modules imported by src/ and tests/ that are not part of the project."""
+    local = {"src", "tests", "conftest"}
+    for directory in (project_root, project_root / "src"):
+        if directory.is_dir():
+            local.update(path.stem for path in directory.iterdir() if path.is_dir() or path.suffix == ".py")
+
+    modules = set()
+    for directory in ("src", "tests"):
+        for path in (project_root / directory).rglob("*.py"):
+            try:
+                tree = ast.parse(path.read_text(encoding="utf-8", errors="replace"))
+            except (SyntaxError, ValueError):
+                continue
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    modules.update(alias.name.split(".")[0] for alias in node.names)
+                elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                    modules.add(node.module.split(".")[0])
+    return sorted(modules - local)
+
+
+def _installed(module: str, project_root: Path) -> bool:
+    """Whether `module` comes from the environment rather than the project's own files.
+
+    Project code imported here would be inherited, stale and unmeasured by
+    coverage, by every child; the project's virtualenv does not count.
+    """
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return False
+    if spec is None:
+        return False
+    locations = [spec.origin] if spec.has_location else list(spec.submodule_search_locations or [])
+    environment = [Path(prefix).resolve() for prefix in (sys.prefix, sys.base_prefix)]
+    for location in locations:
+        path = Path(location).resolve()
+        if path.is_relative_to(project_root.resolve()) \
+                and not any(path.is_relative_to(prefix) for prefix in environment):
+            return False
+    return True
+
+
+def preload(project_root: Path) -> list[str]:
+    """Import pytest, its plugins and the project's third-party dependencies."""
+    from importlib.metadata import entry_points
+
+    import pytest  # noqa: F401
+
+    loaded = []
+    for entry_point in entry_points(group="pytest11"):
+        try:
+            entry_point.load()
+            loaded.append(entry_point.module)
+        except Exception:
+            pass
+    for module in _third_party_imports(project_root):
+        if not _installed(module, project_root):
+            continue
+        try:
+            importlib.import_module(module)
+            loaded.append(module)
+        except BaseException:
+            pass  # Optional or broken imports are left to the test run
+    return loaded
+
+
+def _run_child(project_root: Path, request: dict) -> tuple[int, str]:
+    """Fork, run pytest.main in the child with its output in the log (or a temp file), wait for it."""
+    log = request.get("log")
+    with open(log, "ab") if log else tempfile.TemporaryFile() as output:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.dup2(output.fileno(), 1)
+                os.dup2(output.fileno(), 2)
+                os.chdir(project_root)
+                os.environ.update(request.get("env", {}))
+                sys.argv = ["pytest", *request["args"]]
+                import pytest
+                code = int(pytest.main(request["args"]))
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 3
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+        deadline = time.monotonic() + request.get("timeout", 120)
+        while True:
+            finished, status = os.waitpid(pid, os.WNOHANG)
+            if finished:
+                break
+            if time.monotonic() > deadline:
+                os.kill(pid, 9)
+                os.waitpid(pid, 0)
+                return -9, ""
+            time.sleep(0.02)
+
+        text = ""
+        if not log:
+            output.seek(0)
+            text = output.read().decode("utf-8", errors="replace")
+    return os.waitstatus_to_exitcode(status), text
+
+
+def _receive(connection: socket.socket) -> dict:
+    chunks = []
+    while chunk := connection.recv(65536):
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def serve(project_root: Path):
+    """Preload, then answer run requests one at a time until idle or stale."""
+    path = socket_path(project_root)
+    if path is None or request(project_root, {"command": "ping"}, CONNECT_TIMEOUT) is not None:
+        return  # No private directory for the socket, or already running
+
+    stamp = _dependency_stamp(project_root)
+    # The children must not see this hooks directory ahead of the project
+    hooks_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [entry for entry in sys.path if os.path.abspath(entry or ".") != hooks_dir]
+    preload(project_root)
+
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        return  # Not ours to replace
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(previous_umask)
+    server.listen(4)
+    server.settimeout(1.0)
+    inode = os.stat(path).st_ino
+
+    last_request = time.monotonic()
+    try:
+        while time.monotonic() - last_request < IDLE_TIMEOUT:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                continue
+            last_request = time.monotonic()
+            with connection:
+                connection.settimeout(5)
+                try:
+                    message = _receive(connection)
+                except (OSError, ValueError):
+                    continue
+                command = message.get("command")
+                stale = _dependency_stamp(project_root) != stamp
+                if command == "run" and not stale:
+                    returncode, output = _run_child(project_root, message)
+                    response = {"returncode": returncode, "output": output}
+                else:
+                    response = {"pid": os.getpid(), "stale": stale}
+                try:
+                    connection.sendall(json.dumps(response).encode())
+                except OSError:
+                    pass
+                if command == "stop" or stale:
+                    break
+    finally:
+        server.close()
+        try:
+            if os.stat(path).st_ino == inode:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def request(project_root: Path, message: dict, timeout: float) -> dict | None:
+    """Send one message to the project's server. None if it is not running."""
+    if not available():
+        return None
+    path = socket_path(project_root)
+    if path is None or not owned_privately(path):
+        return None  # A server another user could have started must not pass the Stop gate
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CONNECT_TIMEOUT)
+            client.connect(path)
+            client.settimeout(timeout)
+            client.sendall(json.dumps(message).encode())
+            client.shutdown(socket.SHUT_WR)
+            return _receive(client)
+    except (OSError, ValueError):
+        return None
+
+
+def start(project_root: Path):
+    """Spawn the server in the project's environment, in the background."""
+    if not available():
+        return
+    try:
+        subprocess.Popen(
+            ["uv", "run", "python", os.path.abspath(__file__), "serve", str(project_root)],
+            cwd=project_root,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    except FileNotFoundError:
+        pass
+
+
+def run(project_root: Path, args: list[str], env: dict[str, str], timeout: float,
+        log_file: Path | None = None) -> subprocess.CompletedProcess | None:
+    """Run pytest with `args` in a warm child. None if no server answered (use the cold path).
+
+    With `log_file`, the output is appended to it instead of being returned.
+    Raises subprocess.TimeoutExpired like subprocess.run when the run is killed.
+    """
+    message = {"command": "run", "args": args, "env": env, "timeout": timeout}
+    if log_file is not None:
+        message["log"] = str(log_file)
+    response = request(project_root, message, timeout + 10)
+    if response is None or "returncode" not in response:
+        start(project_root)  # Not running, or stopped because dependencies changed
+        return None
+    if response["returncode"] == -9:
+        raise subprocess.TimeoutExpired(["pytest", *args], timeout)
+    return subprocess.CompletedProcess(["pytest", *args], response["returncode"], response["output"], "")
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    project_root = Path(sys.argv[2] if len(sys.argv) > 2 else os.getcwd()).resolve()
+    if command == "serve":
+        serve(project_root)
+    elif command == "stop":
+        request(project_root, {"command": "stop"}, CONNECT_TIMEOUT)
+    else:
+        print(f"usage: {os.path.basename(__file__)} serve|stop [project]", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+AST analyzer shared by the Python guardrail hooks.
+Parses the written content once and extracts, in a single tree walk, the
+imports, decorators, attribute references, calls and long string constants
+the validators need (f-strings and `+` of literals as their joined text). Names are resolved through import aliases, so
+`from langgraph.func import entrypoint as ep` is reported as
+`langgraph.func.entrypoint`. Comments and docstrings are never matched.
+
+Results are cached by content hash, so the validators run by the PreToolUse
+dispatcher (or the hook daemon) share one parse per Edit. The cache is shared
+by the daemon's request threads and guarded by a lock.
+
+Set GUARDRAIL_DETECTION=regex to disable the analyzer; the validators then
+fall back to their regex patterns, as they do when the content does not parse.
+"""
+import ast
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+AST_ENABLED = os.environ.get("GUARDRAIL_DETECTION", "ast") != "regex"
+
+# String constants shorter than this are not kept
+LONG_STRING = 30
+
+CACHE_SIZE = 16
+
+
+@dataclass
+class Call:
+    """A call site: resolved callee name plus its arguments."""
+    name: str
+    args: list[ast.expr]
+    keywords: dict[str, ast.expr]
+
+
+@dataclass
+class PythonFacts:
+    """What the guardrail hooks need to know about a Python source."""
+    imports: list[str] = field(default_factory=list)
+    decorators: list[str] = field(default_factory=list)
+    references: list[str] = field(default_factory=list)
+    calls: list[Call] = field(default_factory=list)
+    assignments: dict[str, ast.expr] = field(default_factory=dict)
+    strings: list[str] = field(default_factory=list)
+
+
+_cache: "OrderedDict[str, PythonFacts | None]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def dotted_name(node: ast.expr) -> str | None:
+    """Return 'a.b.c' for a Name/Attribute chain, None for anything else."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _docstring_nodes(tree: ast.Module) -> set[int]:
+    """ids of the string constants that are module/class/function docstrings."""
+    docstrings = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                docstrings.add(id(body[0].value))
+    return docstrings
+
+
+def _extract(tree: ast.Module) -> PythonFacts:
+    facts = PythonFacts()
+    aliases: dict[str, str] = {}
+    raw_decorators: list[str] = []
+    raw_references: list[str] = []
+    raw_calls: list[tuple[str, ast.Call]] = []
+    docstrings = _docstring_nodes(tree)
+    folded: set[int] = set()  # Operands of a `+` chain already kept as a whole
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                facts.imports.append(alias.name)
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            facts.imports.append(module)
+            for alias in node.names:
+                qualified = f"{module}.{alias.name}"
+                facts.imports.append(qualified)
+                aliases[alias.asname or alias.name] = qualified
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for decorator in node.decorator_list:
+                target = decorator.func if isinstance(decorator, ast.Call) else decorator
+                name = dotted_name(target)
+                if name:
+                    raw_decorators.append(name)
+        elif isinstance(node, ast.Call):
+            name = dotted_name(node.func)
+            if name:
+                raw_calls.append((name, node))
+        elif isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load):
+            name = dotted_name(node)
+            if name:
+                raw_references.append(name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                name = dotted_name(target)  # `PROMPT = ...` and `self.PROMPT = ...`
+                if name:
+                    facts.assignments[name] = node.value
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if len(node.value) >= LONG_STRING and id(node) not in docstrings:
+                facts.strings.append(node.value)
+        elif isinstance(node, (ast.JoinedStr, ast.BinOp)) and id(node) not in folded:
+            text = string_value(node)
+            if text is not None and len(text) >= LONG_STRING:
+                facts.strings.append(text)
+            if text is not None and isinstance(node, ast.BinOp):
+                folded.update(id(child) for child in ast.walk(node))
+
+    def resolve(name: str) -> str:
+        head, _, rest = name.partition(".")
+        if head in aliases:
+            return f"{aliases[head]}.{rest}" if rest else aliases[head]
+        return name
+
+    facts.decorators = [resolve(name) for name in raw_decorators]
+    facts.references = [resolve(name) for name in raw_references]
+    facts.calls = [
+        Call(
+            resolve(name),
+            list(call.args),
+            {keyword.arg: keyword.value for keyword in call.keywords if keyword.arg}
+        )
+        for name, call in raw_calls
+    ]
+    return facts
+
+
+def analyze(content: str) -> PythonFacts | None:
+    """Parse `content` and return its facts, or None if it is not valid Python."""
+    if not AST_ENABLED:
+        return None
+
+    key = hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    # Parsed outside the lock: two threads may parse the same content once each
+    try:
+        facts = _extract(ast.parse(content))
+    except (SyntaxError, ValueError, RecursionError):
+        facts = None
+
+    with _cache_lock:
+        _cache[key] = facts
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return facts
+
+
+def string_value(node: ast.expr | None) -> str | None:
+    """Literal text of a string constant, f-string or `+` of those, None for anything else."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            part.value for part in node.values
+            if isinstance(part, ast.Constant) and isinstance(part.value, str)
+        )
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left = string_value(node.left)
+        right = string_value(node.right) if left is not None else None
+        return left + right if right is not None else None
+    return None
@@ -5,96 +5,571 @@
 """
 Hook: Run ruff linting after Python file writes.
 Non-blocking - reports issues but doesn't prevent writes.
+
+The ruff executable is discovered once per session (project virtualenv, PATH,
+then `uv run ruff`) and cached on disk, in a directory only the user can
+open. Inside the hook daemon, a persistent `ruff server` is used (LSP pull
+diagnostics over stdio); if it is unavailable, files whose hooks reach the
+daemon concurrently within RUFF_BATCH_WINDOW seconds are checked by a single
+`ruff check` call. Run on its own, the hook checks its one file without
+waiting.
+
+With RUFF_QUEUE=1 the hook does not lint synchronously: it appends the path
+to an on-disk queue and returns. A single background worker waits until no
+path has been queued for RUFF_QUEUE_DEBOUNCE seconds, lints the deduplicated
+set with one `ruff check`, and stores the issues, which are attached to the
+next run_ruff response of the session. The queue needs fcntl (POSIX);
+elsewhere the hook lints synchronously.
 """
+import hashlib
 import json
 import os
+import re
+import select
 import shutil
 import subprocess
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
 
+from hook_client import private_dir
 
-def main():
-    try:
-        input_data = json.load(sys.stdin)
-        tool_input = input_data.get('tool_input', {})
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so no lint queue
+    fcntl = None
 
-        file_path = tool_input.get('file_path', '') or tool_input.get('path', '')
+BATCH_WINDOW = float(os.environ.get("RUFF_BATCH_WINDOW", "0.05"))
+QUEUE_ENABLED = os.environ.get("RUFF_QUEUE", "0") == "1"
+QUEUE_DEBOUNCE = float(os.environ.get("RUFF_QUEUE_DEBOUNCE", "1.0"))
+CHECK_TIMEOUT = 30
+LSP_TIMEOUT = 10
+# Session caches live in this plugin's private 0700 directory (see hook_client.private_dir):
+# the cached ruff command is executed later, so nobody else may be able to write it
+SESSION_CACHE_NAME = "systemic-agent-orchestrator"
 
-        if not file_path.endswith('.py'):
-            print(json.dumps({}))
-            return
+# `path:row:col: CODE message` lines of --output-format=concise
+ISSUE_LINE = re.compile(r'^(.+?):(\d+):(\d+): (.*)$')
 
-        # Check if file exists (it should after PostToolUse)
-        if not os.path.exists(file_path):
-            print(json.dumps({}))
-            return
+# (session_id, cwd) -> ruff command, or None when ruff is not available
+_commands: dict[tuple[str, str], list[str] | None] = {}
+
+# Set by the hook daemon: keep `ruff server` processes alive between requests
+_persistent = False
+_servers: dict[tuple[tuple[str, ...], str], "RuffServer | None"] = {}
+_servers_lock = threading.Lock()
+
+
+class LspError(Exception):
+    """ruff server did not answer as expected."""
 
-        # Check if ruff is available
-        ruff_path = shutil.which("ruff")
-        if not ruff_path:
-            # Try with uv run
-            try:
-                result = subprocess.run(
-                    ["uv", "run", "ruff", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if result.returncode != 0:
-                    print(json.dumps({
-                        "systemMessage": "Note: ruff not installed. Run 'uv add ruff --dev' for linting support."
-                    }))
-                    return
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                print(json.dumps({
-                    "systemMessage": "Note: ruff not available. Run 'uv add ruff --dev' for linting."
-                }))
-                return
 
-        # Run ruff check
+def discover_ruff(cwd: str, use_uv: bool = True) -> list[str] | None:
+    """Find ruff for the project: its virtualenv, PATH, then `uv run ruff`."""
+    for candidate in (os.path.join(cwd, ".venv", "bin", "ruff"),
+                      os.path.join(cwd, ".venv", "Scripts", "ruff.exe")):
+        if os.access(candidate, os.X_OK):
+            return [candidate]
+
+    ruff_path = shutil.which("ruff")
+    if ruff_path:
+        return [ruff_path]
+
+    if use_uv:
         try:
             result = subprocess.run(
-                ["uv", "run", "ruff", "check", file_path, "--output-format=concise"],
+                ["uv", "run", "ruff", "--version"],
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=10,
+                cwd=cwd
             )
+            if result.returncode == 0:
+                return ["uv", "run", "ruff"]
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            pass
+    return None
+
+
+def ruff_command(session_id: str, cwd: str) -> list[str] | None:
+    """Ruff command for this session and project, discovered once per session."""
+    key = (session_id, cwd)
+    if key in _commands:
+        return _commands[key]
+
+    cache_dir = private_dir(SESSION_CACHE_NAME) if session_id else None
+    cache_file = os.path.join(cache_dir, f"ruff-{session_id}.json") if cache_dir else None
+    cached: dict = {}
+    if cache_file:
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+
+    if cwd in cached and (cached[cwd] is None or cached[cwd][0] == "uv" or os.path.exists(cached[cwd][0])):
+        command = cached[cwd]
+        if command is None:
+            # Cheap re-check so that `uv add ruff --dev` is picked up mid-session
+            command = discover_ruff(cwd, use_uv=False)
+    else:
+        command = discover_ruff(cwd)
+
+    if cache_file and cached.get(cwd, False) != command:
+        cached[cwd] = command
+        try:
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(cached, f)
+        except OSError:
+            pass
+
+    _commands[key] = command
+    return command
+
+
+def run_ruff_check(command: list[str], cwd: str, files: list[str]) -> dict[str, list[str]]:
+    """Run one `ruff check` over `files` and split the issues per file."""
+    result = subprocess.run(
+        [*command, "check", *files, "--output-format=concise"],
+        capture_output=True,
+        text=True,
+        timeout=CHECK_TIMEOUT,
+        cwd=cwd
+    )
+    issues: dict[str, list[str]] = {path: [] for path in files}
+    if result.returncode == 0:
+        return issues
+    for line in result.stdout.splitlines():
+        match = ISSUE_LINE.match(line)
+        if match:
+            path = os.path.normpath(os.path.join(cwd, match.group(1)))
+            if path in issues:
+                issues[path].append(line)
+    return issues
+
+
+@dataclass
+class _Batch:
+    """Files submitted to one `ruff check` and, once it ran, their issues."""
+    files: set[str] = field(default_factory=set)
+    results: dict[str, list[str] | Exception] | None = None
+
+
+class RuffBatcher:
+    """Group files submitted within BATCH_WINDOW into a single `ruff check`.
+
+    The first caller for a (command, cwd) pair waits for the window to close
+    and runs ruff for everything submitted meanwhile; the others wait for the
+    results of that same batch. Only concurrent callers (hook daemon threads
+    serving parallel tool calls or subagents) share a batch: saves that reach
+    the hook one after another are checked one by one. RUFF_QUEUE=1 covers
+    those bursts.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending: dict[tuple, _Batch] = {}
+
+    def lint(self, command: list[str], cwd: str, file_path: str) -> list[str]:
+        key = (tuple(command), cwd)
+        with self._condition:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch()
+            batch.files.add(file_path)
+
+        if leader:
+            time.sleep(BATCH_WINDOW)
+            with self._condition:
+                del self._pending[key]  # Later callers start a new batch
+                files = sorted(batch.files)
+            try:
+                issues: dict = run_ruff_check(command, cwd, files)
+            except Exception as e:
+                issues = {path: e for path in files}
+            with self._condition:
+                batch.results = {path: issues.get(path, []) for path in files}
+                self._condition.notify_all()
+
+        with self._condition:
+            self._condition.wait_for(lambda: batch.results is not None, timeout=CHECK_TIMEOUT + 5)
+            result = (batch.results or {}).get(file_path, [])
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+BATCHER = RuffBatcher()
+
+
+class RuffServer:
+    """Minimal LSP client for `ruff server`, using pull diagnostics over stdio."""
+
+    def __init__(self, command: list[str], cwd: str):
+        self.cwd = cwd
+        self.process = subprocess.Popen(
+            [*command, "server"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd
+        )
+        self._buffer = b""
+        self._next_id = 0
+        self.lock = threading.Lock()
+        root = Path(cwd).as_uri()
+        try:
+            self.request("initialize", {
+                "processId": os.getpid(),
+                "rootUri": root,
+                "workspaceFolders": [{"uri": root, "name": os.path.basename(cwd)}],
+                "capabilities": {"textDocument": {"diagnostic": {"dynamicRegistration": False}}},
+            })
+            self.notify("initialized", {})
+        except Exception:
+            self.process.kill()
+            raise
+
+    def _send(self, message: dict):
+        body = json.dumps(message).encode()
+        self.process.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        self.process.stdin.flush()
+
+    def _read_bytes(self, size: int, deadline: float) -> bytes:
+        fd = self.process.stdout.fileno()
+        while len(self._buffer) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise LspError("ruff server timed out")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise LspError("ruff server exited")
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _read_message(self, deadline: float) -> dict:
+        headers = b""
+        while not headers.endswith(b"\r\n\r\n"):
+            headers += self._read_bytes(1, deadline)
+        length = re.search(rb"Content-Length: *(\d+)", headers, re.IGNORECASE)
+        if not length:
+            raise LspError("malformed LSP header")
+        return json.loads(self._read_bytes(int(length.group(1)), deadline))
+
+    def notify(self, method: str, params: dict):
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def request(self, method: str, params: dict | None) -> dict | None:
+        self._next_id += 1
+        request_id = self._next_id
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        deadline = time.monotonic() + LSP_TIMEOUT
+        while True:
+            message = self._read_message(deadline)
+            if "method" in message and "id" in message:
+                # Server-to-client request (e.g. window/workDoneProgress/create)
+                self._send({"jsonrpc": "2.0", "id": message["id"], "result": None})
+            elif message.get("id") == request_id:
+                if "error" in message:
+                    raise LspError(message["error"].get("message", "LSP error"))
+                return message.get("result")
+
+    def diagnostics(self, file_path: str) -> list[str]:
+        """Lint the file's current content; issues in concise format."""
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        uri = Path(file_path).as_uri()
+        display = os.path.relpath(file_path, self.cwd)
+
+        with self.lock:
+            self.notify("textDocument/didOpen", {
+                "textDocument": {"uri": uri, "languageId": "python", "version": 1, "text": text}
+            })
+            try:
+                report = self.request("textDocument/diagnostic", {"textDocument": {"uri": uri}}) or {}
+            finally:
+                self.notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+        issues = []
+        for item in report.get("items", []):
+            start = item["range"]["start"]
+            code = f"{item['code']} " if item.get("code") else ""
+            issues.append(f"{display}:{start['line'] + 1}:{start['character'] + 1}: {code}{item['message']}")
+        return issues
+
+    def close(self):
+        try:
+            with self.lock:
+                self.request("shutdown", None)
+                self.notify("exit", None)
+        except Exception:
+            pass
+        try:
+            self.process.terminate()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+
+def lint_with_server(command: list[str], cwd: str, file_path: str) -> list[str] | None:
+    """Lint through a persistent `ruff server`. None if no server can be used."""
+    key = (tuple(command), cwd)
+    with _servers_lock:
+        if key not in _servers:
+            try:
+                _servers[key] = RuffServer(command, cwd)
+            except (OSError, LspError, ValueError):
+                _servers[key] = None  # ruff without a working `server`: use `ruff check`
+        server = _servers[key]
+    if server is None:
+        return None
+
+    try:
+        return server.diagnostics(file_path)
+    except (OSError, LspError, ValueError):
+        with _servers_lock:
+            _servers.pop(key, None)
+        server.close()
+        return None
+
+
+def lint(command: list[str], cwd: str, file_path: str) -> list[str]:
+    """Issues found by ruff in `file_path`."""
+    if not _persistent:
+        # One file per process: nothing to batch with
+        return run_ruff_check(command, cwd, [file_path]).get(file_path, [])
+    issues = lint_with_server(command, cwd, file_path)
+    if issues is not None:
+        return issues
+    return BATCHER.lint(command, cwd, file_path)
+
+
+def on_daemon_start():
+    """Called by the hook daemon: keep ruff servers between requests."""
+    global _persistent
+    _persistent = True
+
+
+def on_daemon_stop():
+    """Called by the hook daemon on shutdown."""
+    with _servers_lock:
+        servers = [server for server in _servers.values() if server is not None]
+        _servers.clear()
+    for server in servers:
+        server.close()
+
+
+class LintQueue:
+    """On-disk lint queue and results of one session and project.
+
+    `queue` holds one path per line, `results.json` the issues of the last
+    run per file. Both are guarded by `state.lock`; `worker.lock` is held by
+    the single worker draining the queue.
+    """
+
+    def __init__(self, cache_dir: str, session_id: str, cwd: str):
+        self.session_id = session_id
+        self.cwd = cwd
+        digest = hashlib.sha1(f"{session_id}\0{cwd}".encode()).hexdigest()[:12]
+        self.directory = os.path.join(cache_dir, f"ruff-queue-{digest}")
+        self.queue_file = os.path.join(self.directory, "queue")
+        self.results_file = os.path.join(self.directory, "results.json")
+
+    @contextmanager
+    def _locked(self, name: str, blocking: bool = True):
+        """Hold an flock on `name`; yields False if non-blocking and busy."""
+        with open(os.path.join(self.directory, name), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_queue(self) -> set[str]:
+        try:
+            with open(self.queue_file, encoding="utf-8") as f:
+                return {line.strip() for line in f if line.strip()}
         except FileNotFoundError:
-            # Fallback to direct ruff call
-            result = subprocess.run(
-                ["ruff", "check", file_path, "--output-format=concise"],
-                capture_output=True,
-                text=True,
-                timeout=30
+            return set()
+
+    def _read_results(self) -> dict[str, list[str]]:
+        try:
+            with open(self.results_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def enqueue(self, file_path: str):
+        """Queue a file and make sure a worker will pick it up."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._locked("state.lock"):
+            with open(self.queue_file, "a", encoding="utf-8") as f:
+                f.write(file_path + "\n")
+        with self._locked("worker.lock", blocking=False) as idle:
+            pass
+        if idle:
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--lint-queue", self.session_id, self.cwd],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
             )
 
-        if result.returncode != 0 and result.stdout.strip():
-            issues = result.stdout.strip()
-            issue_count = len(issues.split('\n'))
+    def take_results(self) -> dict[str, list[str]]:
+        """Issues found since the last call, except for files queued again."""
+        with self._locked("state.lock"):
+            results = self._read_results()
+            pending = self._read_queue()
+            try:
+                os.unlink(self.results_file)
+            except FileNotFoundError:
+                pass
+        return {path: issues for path, issues in results.items() if path not in pending}
 
-            output = {
-                "systemMessage": f"""Ruff found {issue_count} issue(s) in {os.path.basename(file_path)}:
+    def _wait_quiet(self):
+        """Wait until nothing has been queued for QUEUE_DEBOUNCE seconds."""
+        while True:
+            try:
+                age = time.time() - os.path.getmtime(self.queue_file)
+            except FileNotFoundError:
+                return
+            if age >= QUEUE_DEBOUNCE:
+                return
+            time.sleep(QUEUE_DEBOUNCE - age)
 
-{issues}
+    def _drain(self) -> list[str]:
+        with self._locked("state.lock"):
+            files = self._read_queue()
+            try:
+                os.unlink(self.queue_file)
+            except FileNotFoundError:
+                pass
+        return sorted(path for path in files if os.path.exists(path))
+
+    def _store(self, issues: dict[str, list[str]]):
+        with self._locked("state.lock"):
+            results = self._read_results()
+            for path, items in issues.items():
+                if items:
+                    results[path] = items
+                else:
+                    results.pop(path, None)
+            with open(self.results_file, "w", encoding="utf-8") as f:
+                json.dump(results, f)
+
+    def work(self):
+        """Worker loop: lint queued files in debounced batches until empty."""
+        while True:
+            with self._locked("worker.lock", blocking=False) as acquired:
+                if not acquired:
+                    return  # Another worker owns the queue
+                while True:
+                    self._wait_quiet()
+                    files = self._drain()
+                    if not files:
+                        break
+                    command = ruff_command(self.session_id, self.cwd)
+                    if command is None:
+                        break
+                    try:
+                        self._store(run_ruff_check(command, self.cwd, files))
+                    except subprocess.TimeoutExpired:
+                        pass
+            # A path queued while the lock was being released found it busy
+            if not self._read_queue():
+                return
+
+
+def report(issues: dict[str, list[str]]) -> dict:
+    """Hook response listing the ruff issues of one or more files."""
+    issues = {path: items for path, items in issues.items() if items}
+    if not issues:
+        return {}
+    count = sum(len(items) for items in issues.values())
+    names = ", ".join(os.path.basename(path) for path in issues)
+    issue_list = '\n'.join(line for items in issues.values() for line in items)
+    return {
+        "systemMessage": f"""Ruff found {count} issue(s) in {names}:
+
+{issue_list}
 
 Quick fixes:
-  uv run ruff check --fix {file_path}
+  uv run ruff check --fix {' '.join(issues)}
 
 Or to fix all:
   uv run ruff check --fix ."""
+    }
+
+
+def respond(input_data: dict) -> dict:
+    """Build the hook response for a PostToolUse payload."""
+    try:
+        tool_input = input_data.get('tool_input', {})
+        cwd = input_data.get('cwd') or os.getcwd()
+
+        file_path = tool_input.get('file_path', '') or tool_input.get('path', '')
+
+        if not file_path.endswith('.py'):
+            return {}
+
+        file_path = os.path.normpath(os.path.join(cwd, file_path))
+
+        # Check if file exists (it should after PostToolUse)
+        if not os.path.exists(file_path):
+            return {}
+
+        # Check if ruff is available
+        command = ruff_command(input_data.get('session_id', ''), cwd)
+        if command is None:
+            return {
+                "systemMessage": "Note: ruff not installed. Run 'uv add ruff --dev' for linting support."
             }
-            print(json.dumps(output))
-        else:
-            print(json.dumps({}))
+
+        cache_dir = private_dir(SESSION_CACHE_NAME) if QUEUE_ENABLED and fcntl is not None else None
+        if cache_dir is not None:
+            queue = LintQueue(cache_dir, input_data.get('session_id', ''), cwd)
+            queue.enqueue(file_path)
+            return report(queue.take_results())
+
+        return report({file_path: lint(command, cwd, file_path)})
 
     except subprocess.TimeoutExpired:
-        print(json.dumps({
+        return {
             "systemMessage": "Warning: ruff check timed out."
-        }))
+        }
+    except Exception as e:
+        return {
+            "systemMessage": f"Warning: ruff check skipped: {str(e)}"
+        }
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--lint-queue":
+        cache_dir = private_dir(SESSION_CACHE_NAME)
+        if cache_dir is not None:
+            LintQueue(cache_dir, sys.argv[2], sys.argv[3]).work()
+        return
+
+    try:
+        input_data = json.load(sys.stdin)
     except Exception as e:
         print(json.dumps({
             "systemMessage": f"Warning: ruff check skipped: {str(e)}"
         }))
+        return
+
+    print(json.dumps(respond(input_data)))
 
 
 if __name__ == "__main__":
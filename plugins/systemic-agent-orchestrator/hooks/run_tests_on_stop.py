@@ -5,14 +5,56 @@
 """
 Hook: Run tests and validate coverage when Claude stops responding.
 Blocks if tests fail or coverage < 70%.
+
+Between full runs only the tests impacted by the files changed since the last
+green run are executed (see impact_analysis.py); coverage is gated on full runs.
+
+When pytest-xdist is installed in the project, tests are spread over one
+worker per available core (TEST_WORKERS overrides, 0 runs serially);
+pytest-cov combines the workers' coverage before --cov-fail-under is checked.
+
+TEST_COVERAGE_CORE selects coverage.py's measurement core for full runs.
+`auto` uses sys.monitoring on Python 3.12+ for every full run that only
+checks the coverage gate; the full runs that refresh the impact map record
+per-test contexts and keep coverage's default core.
+
+pytest's raw output goes to a rotating log in .claude/hooks-cache/; the block
+reason is built from its JUnit XML and coverage JSON reports (see
+pytest_results.py): failing test ids, least covered files, slowest tests.
+
+With TEST_SERVER=1 the tests run in a child forked from a warm server that
+has pytest and the project's third-party imports preloaded (see
+pytest_server.py); the first Stop starts it and runs cold.
+
+The verdict is cached with a fingerprint of src/, tests/, infra/ and the
+project configuration (see workspace_fingerprint.py): a Stop with nothing
+changed returns the previous pass/fail without running anything. Verdicts
+that depend on the environment (timeouts, missing tools, errors running
+them) are not cached.
 """
 import json
 import os
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import pytest_server
+from impact_analysis import CONFIG_FILES, ImpactMap, Selection
+from pytest_results import MAX_FAILURES, PytestResults, read_coverage, read_junit, rotate_log, tail
+from terraform_cache import TerraformCache
+from workspace_fingerprint import CACHE_DIR, WorkspaceFingerprint, cache_dir
+
 MIN_COVERAGE = 70
+TEST_TIMEOUT = int(os.environ.get("TEST_TIMEOUT", "120"))
+TEST_WORKERS = os.environ.get("TEST_WORKERS", "auto")
+TEST_SERVER = os.environ.get("TEST_SERVER", "0") == "1"
+TEST_COVERAGE_CORE = os.environ.get("TEST_COVERAGE_CORE", "auto")
+SLOWEST_TESTS = 5
+
+# Terraform tools whose verdict depends on a successful `terraform init`
+INIT_DEPENDENT = ("validate", "tflint")
 
 
 def find_project_root() -> Path | None:
@@ -29,70 +71,221 @@ def find_project_root() -> Path | None:
     return None
 
 
-def run_python_tests(project_root: Path) -> tuple[bool, str, float | None]:
-    """Run pytest with coverage. Returns (passed, output, coverage_percent)."""
-    tests_dir = project_root / "tests"
-    src_dir = project_root / "src"
-
-    if not tests_dir.exists():
-        return True, "No tests/ directory found, skipping Python tests", None
-
-    if not src_dir.exists():
-        return True, "No src/ directory found, skipping coverage", None
-
+def probe_environment(project_root: Path, timeout: float = 30) -> tuple[tuple[int, int] | None, bool]:
+    """Python version of the project's environment and whether pytest-xdist is installed."""
     try:
         result = subprocess.run(
-            [
-                "uv", "run", "pytest",
-                "--cov=src",
-                f"--cov-fail-under={MIN_COVERAGE}",
-                "--cov-report=term-missing:skip-covered",
-                "tests/",
-                "-q",
-                "--tb=short"
-            ],
+            ["uv", "run", "python", "-c",
+             "import importlib.util, sys; "
+             "print(*sys.version_info[:2], importlib.util.find_spec('xdist') is not None)"],
             cwd=project_root,
             capture_output=True,
             text=True,
-            timeout=120
+            timeout=timeout
         )
+        major, minor, has_xdist = result.stdout.split()
+        return (int(major), int(minor)), has_xdist == "True"
+    except (FileNotFoundError, subprocess.TimeoutExpired, ValueError):
+        return None, False
 
-        output = result.stdout + result.stderr
 
-        # Extract coverage percentage
-        coverage = None
-        for line in output.split("\n"):
-            if "TOTAL" in line and "%" in line:
-                parts = line.split()
-                for part in parts:
-                    if part.endswith("%"):
-                        try:
-                            coverage = float(part.rstrip("%"))
-                        except ValueError:
-                            pass
+def requested_workers() -> int:
+    """xdist workers asked for: TEST_WORKERS, or the available cores; 0 for a serial run."""
+    if TEST_WORKERS == "auto":
+        workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    else:
+        try:
+            workers = int(TEST_WORKERS)
+        except ValueError:
+            workers = 1
+    return workers if workers > 1 else 0
+
+
+def coverage_core(python_version: tuple[int, int] | None, contexts: bool) -> str | None:
+    """COVERAGE_CORE for a full run, None for coverage's default.
+
+    `auto` picks sys.monitoring on Python 3.12+, except when the run records
+    per-test contexts for the impact map: sysmon stops reporting a line after
+    its first hit, so it cannot attribute lines to every test that runs them.
+    """
+    if TEST_COVERAGE_CORE != "auto":
+        return TEST_COVERAGE_CORE
+    if contexts or python_version is None or python_version < (3, 12):
+        return None
+    return "sysmon"
+
+
+def pytest_command(selection: Selection, workers: int) -> list[str]:
+    """pytest invocation for a full run (with the coverage gate) or a selection."""
+    if not selection.full:
+        command = ["uv", "run", "pytest", "--no-cov", *selection.tests, "-q", "--tb=short"]
+    else:
+        command = [
+            "uv", "run", "pytest",
+            "--cov=src",
+            f"--cov-fail-under={MIN_COVERAGE}",
+            "--cov-report=term-missing:skip-covered",
+            "tests/",
+            "-q",
+            "--tb=short"
+        ]
+        if selection.refresh:
+            command.insert(4, "--cov-context=test")
+
+    # A handful of selected tests does not pay for starting the workers
+    if workers and (selection.full or len(selection.tests) > workers):
+        command += ["-n", str(workers)]
+    return command
+
+
+def report_args(selection: Selection, reports: Path) -> list[str]:
+    """Arguments writing the JUnit (and, on full runs, coverage JSON) reports."""
+    args = [f"--junitxml={reports / 'junit.xml'}", "-o", "junit_family=xunit1"]
+    if selection.full:
+        args.append(f"--cov-report=json:{reports / 'coverage.json'}")
+    return args
+
+
+def summarize(results: PytestResults, returncode: int, log_file: Path) -> str:
+    """Compact failure report: failing ids, least covered files, slowest tests."""
+    lines = []
+    if results.failures:
+        lines.append(f"{results.failures} of {results.total} tests failed:")
+        lines.extend(f"  {failed}" for failed in results.failed)
+        if results.failures > MAX_FAILURES:
+            lines.append(f"  ... and {results.failures - MAX_FAILURES} more")
+    elif returncode != 0 and (results.coverage is None or results.coverage >= MIN_COVERAGE):
+        # No failing test to point at (collection error, crash): show the end of the log
+        lines.append(f"pytest exited with code {returncode}:")
+        lines.append(tail(log_file))
+
+    if results.coverage is not None and results.coverage < MIN_COVERAGE and results.lowest_coverage:
+        lines.append("Lowest coverage:")
+        lines.extend(f"  {percent:5.1f}% {path}" for percent, path in results.lowest_coverage)
+
+    if results.slowest:
+        lines.append("Slowest tests:")
+        lines.extend(f"  {seconds:.2f}s {node_id}" for seconds, node_id in results.slowest)
+
+    lines.append(f"Full output: {log_file}")
+    return "\n".join(lines)
+
+
+def run_python_tests(project_root: Path) -> tuple[bool, str, float | None, str | None, bool]:
+    """Run pytest with coverage. Returns (passed, summary, coverage_percent, scope, finished).
+
+    `finished` is False when pytest could not run to completion (timeout,
+    missing tools, errors), so the verdict must not be cached.
+    """
+    tests_dir = project_root / "tests"
+    src_dir = project_root / "src"
 
-        passed = result.returncode == 0
-        return passed, output, coverage
+    if not tests_dir.exists():
+        return True, "No tests/ directory found, skipping Python tests", None, None, True
 
-    except FileNotFoundError:
-        return True, "pytest not found, skipping tests", None
-    except subprocess.TimeoutExpired:
-        return False, "Tests timed out after 120 seconds", None
-    except Exception as e:
-        return True, f"Error running tests: {e}", None
+    if not src_dir.exists():
+        return True, "No src/ directory found, skipping coverage", None, None, True
 
+    reports = project_root / CACHE_DIR
+    log_file = reports / "pytest.log"
 
-def run_terraform_tests(project_root: Path) -> tuple[bool, str]:
-    """Run Terraform validation. Returns (passed, output)."""
-    infra_dir = project_root / "infra"
+    try:
+        impact = ImpactMap(project_root)
+        selection = impact.select()
+        if not selection.full and not selection.tests:
+            return True, "No test impacted by the changes", None, selection.reason, True
+
+        cache_dir(project_root)
+        overrides = {}
+        if impact.enabled:
+            overrides["COVERAGE_FILE"] = str(impact.coverage_file)
+        environment = None
+        workers = None
+        core = None
+        # One budget for the probe, the run and a fallback full run: hooks.json kills the hook at 180s
+        deadline = time.monotonic() + TEST_TIMEOUT
+
+        def remaining() -> float:
+            seconds = deadline - time.monotonic()
+            if seconds <= 0:
+                raise subprocess.TimeoutExpired("pytest", TEST_TIMEOUT)
+            return seconds
+
+        def run(selection: Selection) -> int:
+            nonlocal environment, workers, core
+            for stale_report in ("junit.xml", "coverage.json"):
+                (reports / stale_report).unlink(missing_ok=True)
+            rotate_log(log_file)
+
+            run_env = dict(overrides)
+            if selection.full:
+                # The Python version only matters to `auto` when sysmon is an option
+                if environment is None and TEST_COVERAGE_CORE == "auto" and not selection.refresh:
+                    environment = probe_environment(project_root, min(30, remaining()))
+                core = coverage_core(environment[0] if environment else None, selection.refresh)
+                if core:
+                    run_env["COVERAGE_CORE"] = core
+
+            if TEST_SERVER:
+                # Serial in the warm child: xdist workers would start cold
+                command = pytest_command(selection, 0) + report_args(selection, reports)
+                result = pytest_server.run(project_root, command[3:], run_env, remaining(), log_file)
+                if result is not None:
+                    return result.returncode
+            workers = requested_workers()
+            if workers:
+                if environment is None:
+                    environment = probe_environment(project_root, min(30, remaining()))
+                if not environment[1]:
+                    workers = 0  # pytest-xdist is not installed
+            with open(log_file, "ab") as log:
+                return subprocess.run(
+                    pytest_command(selection, workers) + report_args(selection, reports),
+                    cwd=project_root,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    timeout=remaining(),
+                    env={**os.environ, **run_env}
+                ).returncode
+
+        returncode = run(selection)
+
+        # Stale node ids (renamed or removed tests): fall back to a full run
+        if not selection.full and returncode in (4, 5):
+            selection = Selection(True, "selected tests not found", changed=selection.changed, refresh=True)
+            returncode = run(selection)
+
+        results = PytestResults()
+        read_junit(reports / "junit.xml", results, SLOWEST_TESTS)
+        if selection.full:
+            read_coverage(reports / "coverage.json", results, project_root, MIN_COVERAGE)
+
+        impact.record(selection, returncode == 0)
+        # --cov-fail-under alone also exits with 1: that is reported as a coverage failure
+        coverage_only = (returncode == 1 and results.total and not results.failures
+                         and results.coverage is not None and results.coverage < MIN_COVERAGE)
+        passed = returncode == 0 or bool(coverage_only)
+        scope = "full run" if selection.full else f"impacted tests: {selection.reason}"
+        if workers is None:
+            scope += ", warm server"
+        elif workers:
+            scope += f", {workers} workers"
+        if core:
+            scope += f", coverage core {core}"
+        summary = summarize(results, returncode, log_file)
+        scope = scope if impact.enabled or workers != 0 or core else None
+        return passed, summary, results.coverage, scope, True
 
-    if not infra_dir.exists():
-        return True, "No infra/ directory found, skipping Terraform tests"
+    except FileNotFoundError:
+        return True, "pytest not found, skipping tests", None, None, False
+    except subprocess.TimeoutExpired:
+        return False, f"Tests timed out after {TEST_TIMEOUT} seconds:\n{tail(log_file)}", None, None, False
+    except Exception as e:
+        return True, f"Error running tests: {e}", None, None, False
 
-    outputs = []
-    all_passed = True
 
-    # terraform fmt check
+def terraform_fmt(infra_dir: Path) -> tuple[bool, str]:
+    """terraform fmt check. Returns (passed, report line)."""
     try:
         result = subprocess.run(
             ["terraform", "fmt", "-check", "-recursive"],
@@ -102,25 +295,37 @@ def run_terraform_tests(project_root: Path) -> tuple[bool, str]:
             timeout=30
         )
         if result.returncode != 0:
-            all_passed = False
-            outputs.append(f"[FAIL] terraform fmt: Files not formatted\n{result.stdout}")
-        else:
-            outputs.append("[PASS] terraform fmt")
+            return False, f"[FAIL] terraform fmt: Files not formatted\n{result.stdout}"
+        return True, "[PASS] terraform fmt"
     except FileNotFoundError:
-        outputs.append("[SKIP] terraform not found")
+        return True, "[SKIP] terraform not found"
     except Exception as e:
-        outputs.append(f"[WARN] terraform fmt error: {e}")
+        return True, f"[WARN] terraform fmt error: {e}"
+
 
-    # terraform validate
+def terraform_init(infra_dir: Path, env: dict[str, str] | None = None) -> tuple[bool, str]:
+    """Init without backend. Returns (succeeded, report line standing in for validate if not)."""
     try:
-        # Init first (without backend)
-        subprocess.run(
+        result = subprocess.run(
             ["terraform", "init", "-backend=false"],
             cwd=infra_dir,
             capture_output=True,
-            timeout=60
+            text=True,
+            timeout=60,
+            env=env
         )
+    except FileNotFoundError:
+        return False, "[SKIP] terraform not found"
+    except Exception as e:
+        return False, f"[WARN] terraform init error: {e}"
+    if result.returncode != 0:
+        return False, f"[FAIL] terraform init:\n{result.stderr}"
+    return True, ""
 
+
+def terraform_validate(infra_dir: Path) -> tuple[bool, str]:
+    """terraform validate, after init. Returns (passed, report line)."""
+    try:
         result = subprocess.run(
             ["terraform", "validate"],
             cwd=infra_dir,
@@ -129,14 +334,14 @@ def run_terraform_tests(project_root: Path) -> tuple[bool, str]:
             timeout=30
         )
         if result.returncode != 0:
-            all_passed = False
-            outputs.append(f"[FAIL] terraform validate:\n{result.stderr}")
-        else:
-            outputs.append("[PASS] terraform validate")
+            return False, f"[FAIL] terraform validate:\n{result.stderr}"
+        return True, "[PASS] terraform validate"
     except Exception as e:
-        outputs.append(f"[WARN] terraform validate error: {e}")
+        return True, f"[WARN] terraform validate error: {e}"
+
 
-    # tflint
+def run_tflint(infra_dir: Path) -> tuple[bool, str]:
+    """tflint. Returns (passed, report line)."""
     try:
         result = subprocess.run(
             ["tflint", "--recursive"],
@@ -146,16 +351,16 @@ def run_terraform_tests(project_root: Path) -> tuple[bool, str]:
             timeout=60
         )
         if result.returncode != 0:
-            all_passed = False
-            outputs.append(f"[FAIL] tflint:\n{result.stdout}")
-        else:
-            outputs.append("[PASS] tflint")
+            return False, f"[FAIL] tflint:\n{result.stdout}"
+        return True, "[PASS] tflint"
     except FileNotFoundError:
-        outputs.append("[SKIP] tflint not installed")
+        return True, "[SKIP] tflint not installed"
     except Exception as e:
-        outputs.append(f"[WARN] tflint error: {e}")
+        return True, f"[WARN] tflint error: {e}"
 
-    # tfsec
+
+def run_tfsec(infra_dir: Path) -> tuple[bool, str]:
+    """tfsec, HIGH and CRITICAL only. Returns (passed, report line)."""
     try:
         result = subprocess.run(
             ["tfsec", ".", "--minimum-severity", "HIGH", "--format", "text"],
@@ -165,16 +370,73 @@ def run_terraform_tests(project_root: Path) -> tuple[bool, str]:
             timeout=60
         )
         if result.returncode != 0 and "No problems detected" not in result.stdout:
-            all_passed = False
-            outputs.append(f"[FAIL] tfsec (HIGH/CRITICAL issues):\n{result.stdout[:500]}")
-        else:
-            outputs.append("[PASS] tfsec")
+            return False, f"[FAIL] tfsec (HIGH/CRITICAL issues):\n{result.stdout[:500]}"
+        return True, "[PASS] tfsec"
     except FileNotFoundError:
-        outputs.append("[SKIP] tfsec not installed")
+        return True, "[SKIP] tfsec not installed"
     except Exception as e:
-        outputs.append(f"[WARN] tfsec error: {e}")
+        return True, f"[WARN] tfsec error: {e}"
+
+
+def run_terraform_tests(project_root: Path) -> tuple[bool, str, bool]:
+    """Run Terraform validation. Returns (passed, output, finished).
+
+    fmt runs alongside init; validate, tflint and tfsec run concurrently
+    once init is done. Verdicts whose inputs did not change are reused and
+    init is skipped when providers and modules did not change (see
+    terraform_cache.py). When init fails, its error replaces validate, and
+    the validate and tflint verdicts of that run are not memoized: they may
+    only reflect the missing providers and modules. The report keeps the
+    fmt/validate/tflint/tfsec order.
+
+    `finished` is False when init failed or a tool was skipped or errored:
+    like those tool results, the overall verdict depends on the environment.
+    """
+    infra_dir = project_root / "infra"
 
-    return all_passed, "\n".join(outputs)
+    if not infra_dir.exists():
+        return True, "No infra/ directory found, skipping Terraform tests", True
+
+    cache = TerraformCache(project_root, infra_dir)
+    tools = {
+        "fmt": lambda: terraform_fmt(infra_dir),
+        "validate": lambda: terraform_validate(infra_dir),
+        "tflint": lambda: run_tflint(infra_dir),
+        "tfsec": lambda: run_tfsec(infra_dir),
+    }
+    cached = {tool: cache.cached(tool) for tool in tools}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pending = {}
+        if cached["fmt"] is None:
+            pending["fmt"] = pool.submit(tools["fmt"])
+
+        initialized, init_line = True, ""
+        if any(cached[tool] is None for tool in ("validate", "tflint", "tfsec")) and cache.needs_init():
+            initialized, init_line = terraform_init(infra_dir, cache.env())
+            if initialized:
+                cache.init_done()
+
+        for tool in ("validate", "tflint", "tfsec"):
+            if cached[tool] is None and (initialized or tool != "validate"):
+                pending[tool] = pool.submit(tools[tool])
+
+        results = []
+        for tool in tools:
+            if tool == "validate" and not initialized:
+                result = (not init_line.startswith("[FAIL]"), init_line)
+            elif tool in pending:
+                result = pending[tool].result()
+                if initialized or tool not in INIT_DEPENDENT:
+                    cache.remember(tool, result)
+            else:
+                result = cached[tool]
+            results.append(result)
+
+    cache.save()
+    all_passed = all(passed for passed, _ in results)
+    finished = initialized and all(line.startswith(("[PASS]", "[FAIL]")) for _, line in results)
+    return all_passed, "\n".join(line for _, line in results), finished
 
 
 def main() -> None:
@@ -204,12 +466,31 @@ def main() -> None:
         print(json.dumps({}))
         return
 
+    # Nothing the verdict depends on changed since the last Stop: reuse it
+    fingerprint = WorkspaceFingerprint(
+        project_root,
+        "run_tests_on_stop",
+        [project_root / name for name in ("src", "tests", "infra", *CONFIG_FILES)],
+        settings=f"min_coverage={MIN_COVERAGE}"
+    )
+    cached = fingerprint.cached_verdict()
+    if cached is not None:
+        print(json.dumps(cached))
+        return
+
     failures = []
+    finished = True
     report_lines = ["", "=== Stop Hook: Test Validation ===", ""]
 
+    # The Python suite and the Terraform pipeline are independent: run them together
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        python_run = pool.submit(run_python_tests, project_root) if has_python_tests else None
+        terraform_run = pool.submit(run_terraform_tests, project_root) if has_terraform else None
+
     # Run Python tests
-    if has_python_tests:
-        py_passed, py_output, coverage = run_python_tests(project_root)
+    if python_run:
+        py_passed, py_output, coverage, scope, py_finished = python_run.result()
+        finished = finished and py_finished
 
         if coverage is not None:
             if coverage >= MIN_COVERAGE:
@@ -219,14 +500,17 @@ def main() -> None:
                 failures.append(f"Coverage {coverage:.1f}% < {MIN_COVERAGE}% minimum")
 
         if not py_passed:
-            report_lines.append(f"[FAIL] Python Tests:\n{py_output[:800]}")
+            report_lines.append(f"[FAIL] Python Tests:\n{py_output}")
             failures.append("Python tests failed")
         elif coverage is None or coverage >= MIN_COVERAGE:
-            report_lines.append("[PASS] Python Tests")
+            report_lines.append(f"[PASS] Python Tests ({scope})" if scope else "[PASS] Python Tests")
+        else:
+            report_lines.append(py_output)
 
     # Run Terraform tests
-    if has_terraform:
-        tf_passed, tf_output = run_terraform_tests(project_root)
+    if terraform_run:
+        tf_passed, tf_output, tf_finished = terraform_run.result()
+        finished = finished and tf_finished
         report_lines.append("")
         report_lines.append("Terraform Validation:")
         report_lines.append(tf_output)
@@ -256,6 +540,9 @@ def main() -> None:
         report_lines.append("=== All Tests Passed ===")
         result = {}
 
+    # A timeout or a missing tool says nothing about the files: run again next Stop
+    if finished:
+        fingerprint.store(result)
     print(json.dumps(result))
 
 
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Terraform caching for run_tests_on_stop.py.
+
+- Providers are downloaded once into a shared plugin cache
+  (TF_PLUGIN_CACHE_DIR, default ~/.terraform.d/plugin-cache).
+- `terraform init` is skipped while .terraform.lock.hcl and the module
+  sources/versions declared in the .tf files are unchanged.
+- Each tool's PASS/FAIL verdict is memoized by the hash of its inputs, so an
+  infra change only re-runs the tools whose inputs changed (a .tfvars edit
+  re-runs fmt and tfsec, a .tflint.hcl edit only tflint).
+
+State lives in <project>/.claude/hooks-cache/terraform.json.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from workspace_fingerprint import CACHE_DIR, cache_dir, file_hashes, iter_files
+
+PLUGIN_CACHE_DIR = os.environ.get("TF_PLUGIN_CACHE_DIR") or str(Path.home() / ".terraform.d" / "plugin-cache")
+
+# `source = "..."` and `version = "..."` lines: module and provider requirements
+MODULE_SOURCE = re.compile(r'^\s*(?:source|version)\s*=\s*".*"', re.MULTILINE)
+
+# Files each tool reads, by suffix or by name relative to infra/
+TOOL_INPUTS = {
+    "fmt": (".tf", ".tfvars"),
+    "validate": (".tf", ".terraform.lock.hcl"),
+    "tflint": (".tf", ".tflint.hcl"),
+    "tfsec": (".tf", ".tfvars", ".tfsec/"),
+}
+
+
+def _matches(path: str, pattern: str) -> bool:
+    """`dir/` patterns match anything below such a directory, others the end of the path."""
+    if pattern.endswith("/"):
+        return f"/{pattern}" in f"/{path}"
+    return path.endswith(pattern)
+
+
+class TerraformCache:
+    """Init skipping and per-tool verdict memoization for one infra/ directory."""
+
+    def __init__(self, project_root: Path, infra_dir: Path):
+        self.project_root = project_root
+        self.infra_dir = infra_dir
+        self.state_file = project_root / CACHE_DIR / "terraform.json"
+        self.state = self._load()
+        self.hashes = self._hash_inputs()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _hash_inputs(self) -> dict[str, list]:
+        files = iter_files(self.project_root, [self.infra_dir])
+        hashes = file_hashes(self.project_root, files, self.state.get("files", {}))
+        return {path: hashes[path] for path in sorted(hashes)}
+
+    def env(self) -> dict[str, str]:
+        """Environment for terraform commands, with the shared plugin cache."""
+        os.makedirs(PLUGIN_CACHE_DIR, exist_ok=True)
+        return {**os.environ, "TF_PLUGIN_CACHE_DIR": PLUGIN_CACHE_DIR}
+
+    def _digest(self, paths: list[str], extra: str = "") -> str:
+        digest = hashlib.sha1(extra.encode())
+        for path in paths:
+            digest.update(f"\0{path}\0{self.hashes[path][2]}".encode())
+        return digest.hexdigest()
+
+    def _module_sources(self) -> str:
+        """Module and provider requirements of the .tf files, re-read only when a file changed."""
+        previous = self.state.get("module_sources", {})
+        sources = {}
+        for path, (_, _, sha1) in self.hashes.items():
+            if not path.endswith(".tf"):
+                continue
+            if path in previous and previous[path][0] == sha1:
+                sources[path] = previous[path]
+            else:
+                text = (self.project_root / path).read_text(encoding="utf-8", errors="replace")
+                sources[path] = [sha1, "\n".join(line.strip() for line in MODULE_SOURCE.findall(text))]
+        self.state["module_sources"] = sources
+        return "\n".join(f"{path}\n{lines}" for path, (_, lines) in sorted(sources.items()))
+
+    def init_key(self) -> str:
+        lock = (self.infra_dir / ".terraform.lock.hcl").relative_to(self.project_root).as_posix()
+        return self._digest([lock] if lock in self.hashes else [], self._module_sources())
+
+    def needs_init(self) -> bool:
+        return self.state.get("init") != self.init_key() or not (self.infra_dir / ".terraform").is_dir()
+
+    def init_done(self):
+        """Record a successful init (which may have rewritten the lock file)."""
+        self.hashes = self._hash_inputs()
+        self.state["init"] = self.init_key()
+
+    def tool_key(self, tool: str) -> str:
+        infra = self.infra_dir.relative_to(self.project_root).as_posix() + "/"
+        paths = [
+            path for path in self.hashes
+            if path.startswith(infra) and any(_matches(path, pattern) for pattern in TOOL_INPUTS[tool])
+        ]
+        return self._digest(paths, tool)
+
+    def cached(self, tool: str) -> tuple[bool, str] | None:
+        entry = self.state.get("tools", {}).get(tool)
+        if entry and entry["key"] == self.tool_key(tool):
+            passed, line = entry["result"]
+            first, newline, rest = line.partition("\n")
+            return passed, f"{first} (cached){newline}{rest}"
+        return None
+
+    def remember(self, tool: str, result: tuple[bool, str]):
+        """Memoize PASS/FAIL verdicts; SKIP and WARN depend on the environment."""
+        if result[1].startswith(("[PASS]", "[FAIL]")):
+            self.state.setdefault("tools", {})[tool] = {"key": self.tool_key(tool), "result": list(result)}
+
+    def save(self):
+        self.state["files"] = self.hashes
+        try:
+            cache_dir(self.project_root)
+            tmp_file = self.state_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.state, f)
+            os.replace(tmp_file, self.state_file)
+        except OSError:
+            pass
@@ -4,13 +4,16 @@
 # ///
 """Hook to validate CLAUDE.md file size on Stop event.
 
-Blocks if CLAUDE.md exceeds 200 lines.
+Blocks if CLAUDE.md exceeds 200 lines. The verdict is cached with the file's
+fingerprint (see workspace_fingerprint.py).
 """
 
 import json
 import sys
 from pathlib import Path
 
+from workspace_fingerprint import WorkspaceFingerprint
+
 MAX_LINES = 200
 WARNING_THRESHOLD = 180
 
@@ -51,6 +54,17 @@ def main() -> None:
         print(json.dumps({}))
         return
 
+    fingerprint = WorkspaceFingerprint(
+        claudemd_path.parent,
+        "validate_claudemd_size",
+        [claudemd_path],
+        settings=f"max_lines={MAX_LINES}"
+    )
+    cached = fingerprint.cached_verdict()
+    if cached is not None:
+        print(json.dumps(cached))
+        return
+
     try:
         content = claudemd_path.read_text(encoding="utf-8")
         line_count = len(content.splitlines())
@@ -96,9 +110,12 @@ Run /systemic-agent-orchestrator:micro-task to refactor CLAUDE.md"""
             "decision": "block",
             "reason": reason
         }
+        fingerprint.store(result)
         print(json.dumps(result))
         return
 
+    fingerprint.store({})
+
     if line_count > WARNING_THRESHOLD:
         # Warning but don't block
         print(json.dumps({}))
@@ -5,36 +5,42 @@
 """
 Hook: Enforce 500-line limit per Python file.
 Large files should be split into smaller, focused modules.
+
+A file already over the limit may still be edited as long as the edit does
+not make it longer, so it can be brought back under the limit step by step.
 """
 import json
 import sys
 
+from effective_content import build_effective_content
+
 MAX_LINES = 500
 WARNING_THRESHOLD = 400  # Warn when approaching limit
 
 
-def main():
-    try:
-        input_data = json.load(sys.stdin)
-        tool_input = input_data.get('tool_input', {})
-
-        content = tool_input.get('content', '') or tool_input.get('new_string', '')
-        file_path = tool_input.get('file_path', '') or tool_input.get('path', '')
+def check(file_path: str, content: str, line_count: int | None = None,
+          original_line_count: int | None = None) -> str | None:
+    """Return the deny reason if the file exceeds MAX_LINES, or None if allowed.
 
-        if not file_path.endswith('.py'):
-            print(json.dumps({}))
-            return
+    `line_count` may be passed when already known, and `original_line_count`
+    is the size of the file before the edit (see effective_content).
+    """
+    if not file_path.endswith('.py'):
+        return None
 
-        # Count lines
-        lines = content.split('\n')
-        line_count = len(lines)
+    # Count lines
+    if line_count is None:
+        line_count = len(content.split('\n'))
 
-        if line_count > MAX_LINES:
-            reason = f"""BLOCKED: File exceeds {MAX_LINES}-line limit.
+    # Shrinking (or not growing) an oversized file is allowed
+    grows = original_line_count is None or line_count > original_line_count
+    if line_count > MAX_LINES and grows:
+        before = f"Lines before this edit: {original_line_count}\n" if original_line_count is not None else ""
+        reason = f"""BLOCKED: File exceeds {MAX_LINES}-line limit.
 
 File: {file_path}
 Current lines: {line_count}
-Maximum allowed: {MAX_LINES}
+{before}Maximum allowed: {MAX_LINES}
 
 RECOMMENDATIONS - Split into smaller modules:
 
@@ -57,7 +63,19 @@ RECOMMENDATIONS - Split into smaller modules:
    - Helper functions if needed
 
 Smaller files = better maintainability, testing, and code review."""
+        return reason
+
+    return None
+
+
+def main():
+    try:
+        input_data = json.load(sys.stdin)
+        effective = build_effective_content(input_data)
 
+        reason = check(effective.file_path, effective.content, effective.line_count,
+                       effective.original_line_count)
+        if reason:
             result = {
                 "hookSpecificOutput": {
                     "hookEventName": "PreToolUse",
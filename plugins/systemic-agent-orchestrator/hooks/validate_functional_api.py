@@ -7,9 +7,12 @@ Hook: Block LangGraph Functional API usage.
 Only Graph API (StateGraph) is allowed in this project.
 """
 import json
-import re
 import sys
 
+from effective_content import build_effective_content
+from pattern_matcher import PatternMatcher
+from python_analyzer import analyze
+
 BLOCKED_PATTERNS = [
     (r'@entrypoint\b', 'Functional API @entrypoint decorator'),
     (r'@task\b', 'Functional API @task decorator'),
@@ -19,28 +22,47 @@ BLOCKED_PATTERNS = [
     (r'from\s+langgraph\.prebuilt\s+import\s+.*\bentrypoint\b', 'Functional API entrypoint import'),
 ]
 
+BLOCKED_MATCHER = PatternMatcher(BLOCKED_PATTERNS)
+
+# Names resolved through import aliases; bare names are the unresolved decorators
+ENTRYPOINT_NAMES = {'entrypoint', 'langgraph.func.entrypoint'}
+TASK_NAMES = {'task', 'langgraph.func.task'}
+
+# Same checks as BLOCKED_PATTERNS, evaluated on the parsed source
+AST_CHECKS = [
+    ('Functional API @entrypoint decorator',
+     lambda facts: any(name in ENTRYPOINT_NAMES for name in facts.decorators)),
+    ('Functional API @task decorator',
+     lambda facts: any(name in TASK_NAMES for name in facts.decorators)),
+    ('Functional API import',
+     lambda facts: any(name == 'langgraph.func' or name.startswith('langgraph.func.') for name in facts.imports)),
+    ('Functional API entrypoint reference',
+     lambda facts: 'langgraph.func.entrypoint' in facts.references),
+    ('Functional API task reference',
+     lambda facts: 'langgraph.func.task' in facts.references),
+    ('Functional API entrypoint import',
+     lambda facts: 'langgraph.prebuilt.entrypoint' in facts.imports),
+]
 
-def main():
-    try:
-        input_data = json.load(sys.stdin)
-        tool_input = input_data.get('tool_input', {})
 
-        # Get content being written
-        content = tool_input.get('content', '') or tool_input.get('new_string', '')
-        file_path = tool_input.get('file_path', '') or tool_input.get('path', '')
+def find_violations(content: str) -> list[str]:
+    """Functional API usages in content: AST-based, regex if it does not parse."""
+    facts = analyze(content)
+    if facts is None:
+        return BLOCKED_MATCHER.violations(content)
+    return [description for description, found in AST_CHECKS if found(facts)]
+
 
-        # Only check Python files
-        if not file_path.endswith('.py'):
-            print(json.dumps({}))
-            return
+def check(file_path: str, content: str) -> str | None:
+    """Return the deny reason for Functional API usage, or None if allowed."""
+    # Only check Python files
+    if not file_path.endswith('.py'):
+        return None
 
-        violations = []
-        for pattern, description in BLOCKED_PATTERNS:
-            if re.search(pattern, content):
-                violations.append(description)
+    violations = find_violations(content)
 
-        if violations:
-            reason = f"""BLOCKED: LangGraph Functional API usage detected.
+    if violations:
+        reason = f"""BLOCKED: LangGraph Functional API usage detected.
 
 Violations found:
 {chr(10).join(f'  - {v}' for v in violations)}
@@ -74,7 +96,18 @@ WHY Graph API instead of Functional API:
 - Better tooling and visualization support
 
 Please rewrite using StateGraph instead of @entrypoint/@task decorators."""
+        return reason
+
+    return None
+
+
+def main():
+    try:
+        input_data = json.load(sys.stdin)
+        effective = build_effective_content(input_data)
 
+        reason = check(effective.file_path, effective.content)
+        if reason:
             result = {
                 "hookSpecificOutput": {
                     "hookEventName": "PreToolUse",
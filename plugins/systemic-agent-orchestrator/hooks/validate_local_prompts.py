@@ -6,25 +6,51 @@
 Hook: Block local prompt definitions in Python code.
 All prompts must be stored in Langsmith, not in code.
 """
+import ast
 import json
 import re
 import sys
 
-# Patterns that indicate local prompt definitions
+from effective_content import build_effective_content
+from pattern_matcher import PatternMatcher, atomic
+from python_analyzer import PythonFacts, analyze, string_value
+
+PROMPT_KEYWORDS = ['You are', 'Your task', 'Instructions:', 'Please respond', 'Answer the', 'As an AI']
+
+
+def _triple_quoted_prompt(quote: str, name: str) -> str:
+    """Pattern for a triple-quoted string containing a prompt keyword.
+
+    The string body is scanned in unrolled-loop form (one way to consume each
+    character, never past the closing quotes) inside atomic groups, so a
+    docstring without a keyword is rejected in a single pass.
+    """
+    keywords = '(?:' + '|'.join(re.escape(keyword) for keyword in PROMPT_KEYWORDS) + ')'
+    initials = re.escape(''.join(sorted({keyword[0] for keyword in PROMPT_KEYWORDS})))
+    special = rf'\\[\s\S]|{quote}(?!{quote}{quote})'
+    head = rf'[^{quote}\\{initials}]*(?:(?:{special}|(?!{keywords})[{initials}])[^{quote}\\{initials}]*)*'
+    tail = rf'[^{quote}\\]*(?:(?:{special})[^{quote}\\]*)*'
+    return (quote * 3 + atomic(f'{name}_head', head) + keywords
+            + atomic(f'{name}_tail', tail) + quote * 3)
+
+# Patterns that indicate local prompt definitions. Each quantifier is bounded
+# by the string literal or argument list it scans, so large files cannot
+# trigger catastrophic backtracking.
 PROMPT_PATTERNS = [
     # ChatPromptTemplate with inline content (not just variable references)
-    (r'ChatPromptTemplate\.from_template\s*\(\s*["\'](?:[^"\']{30,}|.*\\n.*)["\']',
+    (r'ChatPromptTemplate\.from_template\s*\(\s*["\']'
+     r'(?:[^"\']{30,}|(?:[^"\'\\]|\\[^n])*\\n[^"\']*)["\']',
      'Inline prompt in ChatPromptTemplate.from_template()'),
 
     # Multi-line system/user prompts in from_messages
-    (r'ChatPromptTemplate\.from_messages\s*\(\s*\[\s*\(\s*["\'](?:system|user|assistant)["\'].*?["\'][^)]{50,}',
+    (r'ChatPromptTemplate\.from_messages\s*\(\s*\[\s*\(\s*["\'](?:system|user|assistant)["\'][^)]*?["\'][^)]{50}',
      'Inline messages in ChatPromptTemplate.from_messages()'),
 
     # Direct message content with substantial text
-    (r'SystemMessage\s*\(\s*content\s*=\s*["\'][^"\']{50,}',
+    (r'SystemMessage\s*\(\s*content\s*=\s*["\'][^"\']{50}',
      'Inline SystemMessage content (long hardcoded prompt)'),
 
-    (r'HumanMessage\s*\(\s*content\s*=\s*["\'][^"\']{50,}',
+    (r'HumanMessage\s*\(\s*content\s*=\s*["\'][^"\']{50}',
      'Inline HumanMessage content (long hardcoded prompt)'),
 
     # Prompt string constants
@@ -32,7 +58,7 @@ PROMPT_PATTERNS = [
      'Hardcoded prompt constant'),
 
     # Triple-quoted strings with prompt indicators
-    (r'["\'][\'"]{2}[\s\S]*?(?:You are|Your task|Instructions:|Please respond|Answer the|As an AI)[\s\S]*?["\'][\'"]{2}',
+    (_triple_quoted_prompt('"', 'double') + '|' + _triple_quoted_prompt("'", 'single'),
      'Multi-line prompt string with instruction keywords'),
 ]
 
@@ -46,32 +72,119 @@ ALLOWED_PATTERNS = [
     r'\.pull_prompt\(',            # Any pull_prompt call
 ]
 
+PROMPT_MATCHER = PatternMatcher(PROMPT_PATTERNS)
+ALLOWED_MATCHER = PatternMatcher([(pattern, pattern) for pattern in ALLOWED_PATTERNS], ignore_case=True)
+
+PROMPT_CONSTANTS = ('SYSTEM_PROMPT', 'USER_PROMPT', 'PROMPT_TEMPLATE', 'ASSISTANT_PROMPT')
+MESSAGE_ROLES = {'system', 'user', 'assistant'}
+
+
+def _callee(name: str) -> str:
+    """Last two components of a resolved call name ('ChatPromptTemplate.from_template')."""
+    return '.'.join(name.split('.')[-2:])
+
+
+def _is_text(node) -> bool:
+    """A string, f-string or list literal, or a `+` involving one (what `PROMPT = "...` matches)."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return _is_text(node.left) or _is_text(node.right)
+    return isinstance(node, ast.List) or string_value(node) is not None
+
+
+def _long_text(node, minimum: int) -> bool:
+    text = string_value(node)
+    return text is not None and len(text) >= minimum
+
+
+def _argument(call, position: int, keyword: str):
+    if keyword in call.keywords:
+        return call.keywords[keyword]
+    return call.args[position] if len(call.args) > position else None
+
+
+def _uses_langsmith(facts: PythonFacts) -> bool:
+    """AST version of ALLOWED_PATTERNS."""
+    if any(name == 'langsmith' or name.startswith('langsmith.') for name in facts.imports):
+        return True
+    return any(
+        call.name.endswith('hub.pull') or call.name.split('.')[-1] in ('pull_prompt', 'get_prompt_from_langsmith')
+        for call in facts.calls
+    )
+
+
+def _inline_template(facts: PythonFacts) -> bool:
+    for call in facts.calls:
+        if _callee(call.name) == 'ChatPromptTemplate.from_template':
+            text = string_value(_argument(call, 0, 'template'))
+            if text is not None and (len(text) >= 30 or '\n' in text):
+                return True
+    return False
+
+
+def _inline_messages(facts: PythonFacts) -> bool:
+    for call in facts.calls:
+        if _callee(call.name) != 'ChatPromptTemplate.from_messages':
+            continue
+        messages = _argument(call, 0, 'messages')
+        for message in getattr(messages, 'elts', []):
+            if isinstance(message, ast.Tuple) and len(message.elts) == 2 \
+                    and string_value(message.elts[0]) in MESSAGE_ROLES \
+                    and _long_text(message.elts[1], 50):
+                return True
+    return False
+
+
+def _inline_message_content(facts: PythonFacts, message_class: str) -> bool:
+    return any(
+        call.name.split('.')[-1] == message_class and _long_text(_argument(call, 0, 'content'), 50)
+        for call in facts.calls
+    )
+
+
+# Same checks as PROMPT_PATTERNS, evaluated on the parsed source
+AST_CHECKS = [
+    ('Inline prompt in ChatPromptTemplate.from_template()', _inline_template),
+    ('Inline messages in ChatPromptTemplate.from_messages()', _inline_messages),
+    ('Inline SystemMessage content (long hardcoded prompt)',
+     lambda facts: _inline_message_content(facts, 'SystemMessage')),
+    ('Inline HumanMessage content (long hardcoded prompt)',
+     lambda facts: _inline_message_content(facts, 'HumanMessage')),
+    ('Hardcoded prompt constant',
+     lambda facts: any(
+         name.endswith(PROMPT_CONSTANTS) and _is_text(value)
+         for name, value in facts.assignments.items()
+     )),
+    ('Multi-line prompt string with instruction keywords',
+     lambda facts: any(
+         '\n' in text and any(keyword in text for keyword in PROMPT_KEYWORDS)
+         for text in facts.strings
+     )),
+]
 
-def main():
-    try:
-        input_data = json.load(sys.stdin)
-        tool_input = input_data.get('tool_input', {})
 
-        content = tool_input.get('content', '') or tool_input.get('new_string', '')
-        file_path = tool_input.get('file_path', '') or tool_input.get('path', '')
+def find_violations(content: str) -> list[str]:
+    """Inline prompts in content: AST-based, regex if it does not parse."""
+    facts = analyze(content)
+    if facts is None:
+        # Check for Langsmith integration (allow if present)
+        if ALLOWED_MATCHER.search(content):
+            return []
+        return PROMPT_MATCHER.violations(content)
 
-        if not file_path.endswith('.py'):
-            print(json.dumps({}))
-            return
+    if _uses_langsmith(facts):
+        return []
+    return [description for description, found in AST_CHECKS if found(facts)]
 
-        # Check for Langsmith integration (allow if present)
-        for allowed in ALLOWED_PATTERNS:
-            if re.search(allowed, content, re.IGNORECASE):
-                print(json.dumps({}))
-                return
 
-        violations = []
-        for pattern, description in PROMPT_PATTERNS:
-            if re.search(pattern, content, re.DOTALL | re.MULTILINE):
-                violations.append(description)
+def check(file_path: str, content: str) -> str | None:
+    """Return the deny reason for local prompt definitions, or None if allowed."""
+    if not file_path.endswith('.py'):
+        return None
+
+    violations = find_violations(content)
 
-        if violations:
-            reason = f"""BLOCKED: Local prompt definitions detected.
+    if violations:
+        reason = f"""BLOCKED: Local prompt definitions detected.
 
 Violations found:
 {chr(10).join(f'  - {v}' for v in violations)}
@@ -108,7 +221,18 @@ BENEFITS of Langsmith Prompts:
 - Easy rollback to previous versions
 
 Please move your prompts to Langsmith and reference them by name."""
+        return reason
+
+    return None
+
+
+def main():
+    try:
+        input_data = json.load(sys.stdin)
+        effective = build_effective_content(input_data)
 
+        reason = check(effective.file_path, effective.content)
+        if reason:
             result = {
                 "hookSpecificOutput": {
                     "hookEventName": "PreToolUse",
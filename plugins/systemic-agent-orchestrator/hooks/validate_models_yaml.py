@@ -11,6 +11,8 @@ import json
 import re
 import sys
 
+from effective_content import build_effective_content
+
 VALID_PROVIDERS = ['anthropic', 'anthropic_bedrock', 'openai', 'google_genai', 'xai']
 
 
@@ -90,24 +92,17 @@ def validate_models_yaml(content: str) -> tuple[bool, list[str], list[str]]:
     return len(errors) == 0, errors, warnings
 
 
-def main():
-    try:
-        input_data = json.load(sys.stdin)
-        tool_input = input_data.get('tool_input', {})
-
-        content = tool_input.get('content', '') or tool_input.get('new_string', '')
-        file_path = tool_input.get('file_path', '') or tool_input.get('path', '')
-
-        # Only validate models.yaml files
-        if not file_path.endswith('models.yaml'):
-            print(json.dumps({}))
-            return
+def check(file_path: str, content: str) -> str | None:
+    """Return the deny reason for an invalid models.yaml, or None if allowed."""
+    # Only validate models.yaml files
+    if not file_path.endswith('models.yaml'):
+        return None
 
-        is_valid, errors, warnings = validate_models_yaml(content)
+    is_valid, errors, warnings = validate_models_yaml(content)
 
-        if not is_valid:
-            providers_list = ', '.join(VALID_PROVIDERS)
-            reason = f"""BLOCKED: Invalid models.yaml configuration.
+    if not is_valid:
+        providers_list = ', '.join(VALID_PROVIDERS)
+        reason = f"""BLOCKED: Invalid models.yaml configuration.
 
 Errors:
 {chr(10).join(f'  - {e}' for e in errors)}
@@ -139,7 +134,18 @@ OPTIONAL FIELDS:
   - max_tokens: positive integer
   - timeout: positive integer (seconds)
   - top_p: 0.0-1.0"""
+        return reason
+
+    return None
+
+
+def main():
+    try:
+        input_data = json.load(sys.stdin)
+        effective = build_effective_content(input_data)
 
+        reason = check(effective.file_path, effective.content)
+        if reason:
             result = {
                 "hookSpecificOutput": {
                     "hookEventName": "PreToolUse",
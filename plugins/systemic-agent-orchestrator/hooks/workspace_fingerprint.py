@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Workspace fingerprint and cached verdict for the Stop hooks.
+
+A Stop hook hashes the files its verdict depends on and stores the digest
+next to the response it produced, under <project>/.claude/hooks-cache/. When
+the digest is unchanged on the next Stop (the agent only answered a question,
+for instance), the stored response is returned without running anything.
+
+Hashing is incremental: each file's mtime, size and sha1 are kept, and a file
+is only re-read when its stat changed.
+
+Set STOP_VERDICT_CACHE=0 to always recompute.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+ENABLED = os.environ.get("STOP_VERDICT_CACHE", "1") != "0"
+
+CACHE_DIR = Path(".claude") / "hooks-cache"
+
+# Directories never part of a fingerprint (caches, tool state, VCS)
+SKIPPED_DIRS = {"__pycache__", ".terraform", ".pytest_cache", ".mypy_cache", ".ruff_cache", "node_modules"}
+
+# Hidden directories that hold tool configuration (tfsec's custom checks): always part of it
+CONFIG_DIRS = {".tfsec"}
+
+
+def cache_dir(project_root: Path) -> Path:
+    """<project>/.claude/hooks-cache, created with a .gitignore on first use."""
+    directory = project_root / CACHE_DIR
+    if not directory.is_dir():
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / ".gitignore").write_text("*\n")
+    return directory
+
+
+def iter_files(root: Path, paths: list[Path], suffix: str | None = None) -> list[Path]:
+    """Files under `paths` (files or directories), skipping caches and hidden directories other than CONFIG_DIRS."""
+    files = []
+    for path in paths:
+        if path.is_file():
+            files.append(path)
+            continue
+        if not path.is_dir():
+            continue
+        for directory, dirnames, filenames in os.walk(path):
+            dirnames[:] = [
+                name for name in dirnames
+                if name not in SKIPPED_DIRS and (not name.startswith(".") or name in CONFIG_DIRS)
+            ]
+            files.extend(
+                Path(directory, name) for name in filenames
+                if not name.endswith(".pyc") and (suffix is None or name.endswith(suffix))
+            )
+    return files
+
+
+def file_hashes(root: Path, files: list[Path], previous: dict[str, list]) -> dict[str, list]:
+    """{path relative to root: [mtime_ns, size, sha1]}, re-hashing only files whose stat changed."""
+    current = {}
+    for path in files:
+        relative = path.relative_to(root).as_posix()
+        try:
+            stat = path.stat()
+            old = previous.get(relative)
+            if old and old[0] == stat.st_mtime_ns and old[1] == stat.st_size:
+                current[relative] = old
+            else:
+                current[relative] = [stat.st_mtime_ns, stat.st_size, hashlib.sha1(path.read_bytes()).hexdigest()]
+        except OSError:
+            continue  # Removed while walking
+    return current
+
+
+class WorkspaceFingerprint:
+    """Digest of the files one Stop hook depends on, paired with its last response."""
+
+    def __init__(self, project_root: Path, hook: str, paths: list[Path], settings: str = ""):
+        self.project_root = project_root
+        self.paths = paths
+        self.settings = settings
+        self.state_file = project_root / CACHE_DIR / f"fingerprint-{hook}.json"
+        self.state = self._load()
+        self.files: dict[str, list] | None = None
+        self.digest: str | None = None
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def compute(self) -> str:
+        """Digest of the current workspace (file hashes plus the hook settings)."""
+        files = iter_files(self.project_root, self.paths)
+        self.files = file_hashes(self.project_root, files, self.state.get("files", {}))
+        digest = hashlib.sha1(self.settings.encode())
+        for relative in sorted(self.files):
+            digest.update(f"\0{relative}\0{self.files[relative][2]}".encode())
+        self.digest = digest.hexdigest()
+        return self.digest
+
+    def cached_verdict(self) -> dict | None:
+        """The stored response if nothing relevant changed since it was produced."""
+        if not ENABLED:
+            return None
+        digest = self.compute()
+        if self.state.get("digest") == digest and isinstance(self.state.get("verdict"), dict):
+            return self.state["verdict"]
+        return None
+
+    def store(self, verdict: dict):
+        """Remember `verdict` for the workspace as fingerprinted before the run."""
+        if not ENABLED:
+            return
+        if self.digest is None:
+            self.compute()
+        try:
+            cache_dir(self.project_root)
+            tmp_file = self.state_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"digest": self.digest, "files": self.files, "verdict": verdict}, f)
+            os.replace(tmp_file, self.state_file)
+        except OSError:
+            pass
@@ -0,0 +1,10 @@
+"""Put CI.py and the plugin hooks on sys.path, as `uv run` does for the scripts."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HOOKS_DIR = ROOT / "plugins" / "systemic-agent-orchestrator" / "hooks"
+
+for path in (ROOT, HOOKS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from CI import MarkdownFormatter, ResultCache
+
+UNFORMATTED = b"# Title\n\n* item\n"
+FORMATTED = b"# Title\n\n- item\n"
+
+
+@pytest.fixture
+def formatter(tmp_path: Path, monkeypatch) -> MarkdownFormatter:
+    formatter = MarkdownFormatter(cache=ResultCache(tmp_path), root=tmp_path)
+    formatter.runs = 0
+
+    def fake_mdformat(file_path: Path) -> bool:
+        formatter.runs += 1
+        file_path.write_bytes(file_path.read_bytes().replace(b"* ", b"- "))
+        return True
+
+    monkeypatch.setattr(formatter, "run_mdformat", fake_mdformat)
+    return formatter
+
+
+def test_write_mode_reformats_content_seen_before(formatter, tmp_path):
+    readme = tmp_path / "README.md"
+    readme.write_bytes(UNFORMATTED)
+    assert formatter.process_files([readme], "format_markdown_file")
+    assert readme.read_bytes() == FORMATTED
+
+    # Back to the unformatted content: it must not be replayed from the cache
+    readme.write_bytes(UNFORMATTED)
+    assert formatter.process_files([readme], "format_markdown_file")
+    assert readme.read_bytes() == FORMATTED
+    assert formatter.runs == 2
+
+
+def test_write_mode_caches_files_already_formatted(formatter, tmp_path):
+    readme = tmp_path / "README.md"
+    readme.write_bytes(FORMATTED)
+    formatter.process_files([readme], "format_markdown_file")
+    formatter.process_files([readme], "format_markdown_file")
+    assert formatter.runs == 1
+    assert formatter.cache.hits == 1
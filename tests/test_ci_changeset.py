@@ -0,0 +1,43 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from CI import ChangeSet, RepoIndex
+
+
+def git(repo: Path, *args: str):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    (tmp_path / "plugins" / "café").mkdir(parents=True)
+    (tmp_path / "plugins" / "café" / "README.md").write_text("# Café\n")
+    (tmp_path / "docs.md").write_text("# Docs\n")
+    (tmp_path / ".mdformat.toml").write_text("wrap = 'keep'\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_non_ascii_paths(repo):
+    (repo / "plugins" / "café" / "README.md").write_text("# Café!\n")
+    (repo / "notas ção.md").write_text("# Notas\n")
+
+    changes = ChangeSet.from_git(repo, "HEAD")
+    assert changes.paths == ["notas ção.md", "plugins/café/README.md"]
+    assert changes.plugins == {"café"}
+    assert changes.markdown_files(RepoIndex.scan(repo)) == [
+        repo / "notas ção.md", repo / "plugins" / "café" / "README.md"
+    ]
+
+
+@pytest.mark.parametrize("config", [".mdformat.toml", ".markdownlintrc.json"])
+def test_markdown_config_change_checks_every_file(repo, config):
+    (repo / config).write_text("{}\n")
+
+    changes = ChangeSet.from_git(repo, "HEAD")
+    assert changes.markdown_config_changed
+    assert changes.markdown_files(RepoIndex.scan(repo)) is None
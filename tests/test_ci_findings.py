@@ -0,0 +1,20 @@
+import io
+import json
+from pathlib import Path
+
+import CI
+from CI import JsonLinesSink, MarkdownValidator
+
+
+def test_missing_pymarkdown_reaches_the_sink(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(CI, "PyMarkdownApi", None)
+    stream = io.StringIO()
+    sink = JsonLinesSink(stream)
+
+    validator = MarkdownValidator(root=tmp_path, sink=sink)
+    sink.close()
+
+    assert not validator.available
+    finding, summary = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert (finding["severity"], finding["rule_id"]) == ("error", "pymarkdown-missing")
+    assert summary["errors"] == 1
@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from CI import PluginInfo, RepoIndex
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    files = [
+        "README.md",
+        "docs/guide.md",
+        "docs/notes.txt",
+        "plugins/alpha/.claude-plugin/plugin.json",
+        "plugins/alpha/README.md",
+        "plugins/alpha/commands/run.md",
+        "plugins/alpha/hooks/hooks.json",
+        "plugins/beta/plugin.json",
+        "plugins/beta/skills/tip/SKILL.md",
+        "plugins/beta/.mcp.json",
+        "node_modules/pkg/README.md",
+        ".git/info/exclude.md",
+        "plugins/alpha/.venv/lib/site.md",
+        "elsewhere/gamma/.claude-plugin/plugin.json",
+        "elsewhere/gamma/agents/reviewer.md",
+        "outside/linked.md",
+    ]
+    for name in files:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{}\n" if name.endswith(".json") else "# doc\n")
+    # Plugins may be symlinks; links below them are not followed
+    os.symlink(tmp_path / "elsewhere" / "gamma", tmp_path / "plugins" / "gamma")
+    os.symlink(tmp_path / "outside", tmp_path / "plugins" / "alpha" / "outside")
+    return tmp_path
+
+
+def test_scan_finds_plugins_and_their_components(repo):
+    index = RepoIndex.scan(repo)
+
+    assert index.has_plugins_dir
+    assert sorted(index.plugins) == ["alpha", "beta", "gamma"]
+    for name, plugin in index.plugins.items():
+        on_disk = PluginInfo.from_dir(repo / "plugins" / name)
+        assert (plugin.manifest, plugin.components, plugin.has_readme) == (
+            on_disk.manifest, on_disk.components, on_disk.has_readme
+        )
+    assert index.plugins["alpha"].manifest == repo / "plugins/alpha/.claude-plugin/plugin.json"
+    assert index.plugins["alpha"].components == ["commands", "hooks"]
+    assert index.plugins["beta"].manifest == repo / "plugins/beta/plugin.json"
+    assert index.plugins["beta"].components == ["skills", "mcp"]
+    assert index.plugins["gamma"].components == ["agents"]
+
+
+def test_scan_lists_markdown_outside_ignored_dirs(repo):
+    index = RepoIndex.scan(repo)
+
+    assert [path.relative_to(repo).as_posix() for path in index.markdown_files] == [
+        "README.md",
+        "docs/guide.md",
+        "elsewhere/gamma/agents/reviewer.md",
+        "outside/linked.md",
+        "plugins/alpha/README.md",
+        "plugins/alpha/commands/run.md",
+        "plugins/beta/skills/tip/SKILL.md",
+        "plugins/gamma/agents/reviewer.md",
+    ]
+    assert index.is_ignored(repo / "node_modules/pkg/README.md")
+    assert index.is_ignored(repo / "plugins/alpha/.venv/lib/site.md")
+    assert not index.is_ignored(repo / "docs/guide.md")
+
+
+def test_plugin_outside_the_index_is_read_from_disk(repo):
+    index = RepoIndex.scan(repo)
+    gamma = repo / "elsewhere" / "gamma"
+
+    assert index.plugin(repo / "plugins" / "alpha") is index.plugins["alpha"]
+    assert index.plugin(gamma).manifest == gamma / ".claude-plugin" / "plugin.json"
+
+
+def test_missing_plugins_dir(tmp_path):
+    (tmp_path / "README.md").write_text("# doc\n")
+    index = RepoIndex.scan(tmp_path)
+
+    assert not index.has_plugins_dir
+    assert index.plugins == {}
+    assert index.markdown_files == [tmp_path / "README.md"]
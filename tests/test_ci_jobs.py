@@ -0,0 +1,104 @@
+import os
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from CI import Finding, FindingSink, MarkdownFormatter, Reporter, ResultCache
+
+CONTENTS = ["ok", "warning", "error", "ok", "error", "ok", "warning", "ok", "ok", "error"]
+
+
+class ListSink(FindingSink):
+    def __init__(self):
+        super().__init__(None)
+        self.findings = []
+
+    def emit(self, finding: Finding):
+        self.findings.append((finding.severity, finding.message, finding.file, finding.rule_id))
+
+
+class ScriptedReporter(Reporter):
+    """Reports what each file asks for; picklable by reference for the workers."""
+
+    def worker_factory(self):
+        return partial(ScriptedReporter, root=self.root)
+
+    def cache_key(self, method_name, file_path):
+        return self.cache.key("scripted", file_path.name.encode(), file_path.read_bytes())
+
+    def check(self, file_path: Path) -> bool:
+        name = file_path.name
+        verdict = file_path.read_text()
+        if verdict == "error":
+            self.log_error(f"{name}: broken", file=name, line=1, rule_id="scripted-error")
+            return False
+        if verdict == "warning":
+            self.log_warning(f"{name}: dubious", file=name, rule_id="scripted-warning")
+        else:
+            self.log_success(f"{name}: fine")
+        return True
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> list[Path]:
+    paths = []
+    for number, content in enumerate(CONTENTS):
+        path = tmp_path / f"doc{number:02}.md"
+        path.write_text(content)
+        paths.append(path)
+    return paths
+
+
+def run(root: Path, files: list[Path], jobs: int, cache: ResultCache = None):
+    sink = ListSink()
+    reporter = ScriptedReporter(root=root, sink=sink)
+    reporter.cache = cache
+    ok = reporter.process_files(files, "check", jobs)
+    return reporter, sink, ok
+
+
+def outcome(reporter: ScriptedReporter, sink: ListSink, ok: bool):
+    return ok, reporter.errors, reporter.warnings, reporter.success, sink.findings, \
+        [timing.file for timing in reporter.timings]
+
+
+def test_jobs_report_what_a_serial_run_reports(tmp_path, files):
+    serial = run(tmp_path, files, jobs=1)
+    parallel = run(tmp_path, files, jobs=3)
+
+    assert outcome(*parallel) == outcome(*serial)
+    assert serial[2] is False
+    assert {timing.pid for timing in serial[0].timings} == {os.getpid()}
+    assert os.getpid() not in {timing.pid for timing in parallel[0].timings}
+
+
+def test_jobs_replay_results_cached_by_a_serial_run(tmp_path, files):
+    cache = ResultCache(tmp_path)
+    run(tmp_path, files, jobs=1, cache=cache)
+    # Two misses among the hits, so the pool still runs
+    files[1].write_text("ok")
+    files[2].write_text("warning")
+    cache.hits = 0
+    parallel = run(tmp_path, files, jobs=3, cache=cache)
+
+    assert outcome(*parallel)[:5] == outcome(*run(tmp_path, files, jobs=1))[:5]
+    assert cache.hits == len(files) - 2
+    assert len({timing.pid for timing in parallel[0].timings} - {os.getpid()}) >= 1
+
+
+def test_formatter_jobs_match_a_serial_check(tmp_path):
+    pytest.importorskip("mdformat")
+    documents = {"a.md": "# A\n\n* item\n", "b.md": "# B\n\n- item\n", "c.md": "C\n=\n", "d.md": "# D\n"}
+    for name, text in documents.items():
+        (tmp_path / name).write_text(text)
+    files = sorted(tmp_path.glob("*.md"))
+
+    results = []
+    for jobs in (1, 2):
+        formatter = MarkdownFormatter(check_only=True, engine="inprocess", root=tmp_path)
+        ok = formatter.process_files(files, "format_markdown_file", jobs)
+        results.append((ok, formatter.errors, formatter.success))
+
+    assert results[0] == results[1]
+    assert results[0][1] == ["Formatação incorreta: a.md", "Formatação incorreta: c.md"]
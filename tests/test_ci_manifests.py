@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from CI import JSONValidator, ManifestStore, RepoIndex, ResultCache
+
+
+@pytest.fixture
+def disk_reads(monkeypatch) -> list[Path]:
+    reads = []
+    read_bytes = Path.read_bytes
+
+    def counting_read_bytes(path: Path) -> bytes:
+        reads.append(path)
+        return read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_read_bytes)
+    return reads
+
+
+def test_load_parses_each_manifest_once(tmp_path, disk_reads):
+    manifest = tmp_path / "plugin.json"
+    manifest.write_text('{"name": "alpha", "version": "1.0.0"}')
+    store = ManifestStore()
+
+    assert store.load(manifest) == {"name": "alpha", "version": "1.0.0"}
+    assert store.load(manifest) is store.load(manifest)
+    assert store.read_bytes(manifest) == manifest.read_bytes()
+    assert disk_reads.count(manifest) == 2  # The store's read and the assertion's
+
+
+@pytest.mark.parametrize("text", ['{"name": "alpha",}', '{"name": "alpha"', "[1, 2]\n]", "\ufeff{}"])
+def test_invalid_manifest_raises_the_json_module_error(tmp_path, disk_reads, text):
+    manifest = tmp_path / "plugin.json"
+    manifest.write_text(text, encoding="utf-8")
+    store = ManifestStore()
+
+    with pytest.raises(json.JSONDecodeError) as first:
+        store.load(manifest)
+    with pytest.raises(json.JSONDecodeError) as second:
+        store.load(manifest)
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+
+    assert second.value is first.value
+    assert (first.value.msg, first.value.lineno, first.value.colno) == (
+        expected.value.msg, expected.value.lineno, expected.value.colno
+    )
+    assert disk_reads.count(manifest) == 1
+
+
+def test_missing_manifest_raises_on_every_load(tmp_path):
+    store = ManifestStore()
+    with pytest.raises(FileNotFoundError):
+        store.load(tmp_path / "plugin.json")
+    with pytest.raises(FileNotFoundError):
+        store.load(tmp_path / "plugin.json")
+
+
+def test_invalidate_rereads_the_manifest(tmp_path):
+    alpha, beta = tmp_path / "alpha.json", tmp_path / "beta.json"
+    alpha.write_text('{"version": "1"}')
+    beta.write_text('{"version": "1"}')
+    store = ManifestStore()
+    store.load(alpha), store.load(beta)
+
+    alpha.write_text('{"version": "2"}')
+    beta.write_text('{"version": "2"}')
+    store.invalidate(alpha)
+    assert (store.load(alpha), store.load(beta)) == ({"version": "2"}, {"version": "1"})
+
+    store.invalidate()
+    assert store.load(beta) == {"version": "2"}
+
+
+def test_validation_reads_each_manifest_once(tmp_path, disk_reads):
+    plugins = {"alpha": "1.0.0", "beta": "2.0.0"}
+    marketplace = {
+        "name": "market", "version": "1.0.0", "description": "Plugins",
+        "owner": {"name": "Owner"},
+        "plugins": [
+            {"name": name, "version": version, "source": f"./plugins/{name}", "description": name}
+            for name, version in plugins.items()
+        ],
+    }
+    (tmp_path / ".claude-plugin").mkdir()
+    (tmp_path / ".claude-plugin" / "marketplace.json").write_text(json.dumps(marketplace))
+    for name, version in plugins.items():
+        plugin_dir = tmp_path / "plugins" / name / ".claude-plugin"
+        plugin_dir.mkdir(parents=True)
+        (plugin_dir / "plugin.json").write_text(json.dumps(
+            {"name": name, "version": version, "description": name}
+        ))
+
+    validator = JSONValidator(cache=ResultCache(tmp_path), index=RepoIndex.scan(tmp_path), root=tmp_path)
+    validator.validate_marketplace_json()
+    validator.validate_all_plugins()
+    validator.check_marketplace_plugin_consistency()
+
+    assert "alpha: versão consistente (1.0.0)" in validator.success
+    assert "beta: versão consistente (2.0.0)" in validator.success
+
+    manifests = [path for path in disk_reads if path.suffix == ".json"]
+    assert len(manifests) == len(set(manifests)) == 3
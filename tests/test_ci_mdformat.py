@@ -0,0 +1,67 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+mdformat = pytest.importorskip("mdformat")
+
+import CI  # noqa: E402
+from CI import MarkdownFormatter, MdformatEngine  # noqa: E402
+
+DOCUMENTS = {
+    "list.md": "# Title\n\n* one\n* two\n\n1) a\n1) b\n",
+    "crlf.md": "Title\r\n=====\r\n\r\nSome *text* here\r\n",
+    "long.md": "A paragraph that is long enough to be wrapped by the configured width of the formatter.\n",
+}
+
+
+def cli(path: Path, check: bool = False) -> int:
+    command = [sys.executable, "-m", "mdformat", *(["--check"] if check else []), str(path)]
+    return subprocess.run(command, capture_output=True).returncode
+
+
+@pytest.mark.parametrize("config", ["", "wrap = 40\nend_of_line = \"keep\"\n", "number = true\nend_of_line = \"crlf\"\n"])
+def test_inprocess_engine_matches_the_cli(tmp_path, config):
+    for engine_name in ("cli", "inprocess"):
+        directory = tmp_path / engine_name
+        directory.mkdir()
+        if config:
+            (directory / ".mdformat.toml").write_text(config)
+        for name, text in DOCUMENTS.items():
+            (directory / name).write_bytes(text.encode())
+
+    engine = MdformatEngine()
+    for name in DOCUMENTS:
+        assert engine.format_file(tmp_path / "inprocess" / name, check_only=True) is (
+            cli(tmp_path / "cli" / name, check=True) == 0
+        )
+        assert cli(tmp_path / "cli" / name) == 0
+        assert engine.format_file(tmp_path / "inprocess" / name, check_only=False)
+        assert (tmp_path / "inprocess" / name).read_bytes() == (tmp_path / "cli" / name).read_bytes()
+
+
+def test_write_mode_refuses_output_that_renders_differently(tmp_path, monkeypatch):
+    readme = tmp_path / "README.md"
+    readme.write_bytes(b"* item\n")
+    engine = MdformatEngine()
+    monkeypatch.setattr(engine, "is_md_equal", lambda *args, **kwargs: False)
+
+    assert engine.format_file(readme, check_only=False) is False
+    assert readme.read_bytes() == b"* item\n"
+
+
+@pytest.mark.parametrize("config", ["wrap = \"sometimes\"\n", "extensions = [\"missing\"]\n"])
+def test_configuration_the_engine_cannot_reproduce_uses_the_cli(tmp_path, monkeypatch, config):
+    (tmp_path / ".mdformat.toml").write_text(config)
+    (tmp_path / "README.md").write_bytes(b"* item\n")
+    commands = []
+    monkeypatch.setattr(CI, "run_command", lambda command, **kwargs: commands.append(command)
+                        or subprocess.CompletedProcess(command, 1))
+
+    formatter = MarkdownFormatter(engine="inprocess", root=tmp_path)
+    assert formatter.mdformat_engine is not None
+    assert formatter.mdformat_engine.format_file(tmp_path / "README.md", check_only=False) is None
+    assert not formatter.run_mdformat(tmp_path / "README.md")
+    assert commands == [["mdformat", str(tmp_path / "README.md")]]
+    assert (tmp_path / "README.md").read_bytes() == b"* item\n"
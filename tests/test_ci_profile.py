@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+from functools import partial
+from pathlib import Path
+
+import CI
+from CI import FileTiming, Profiler, Reporter, run_command
+
+
+class SpawningReporter(Reporter):
+    """Starts one subprocess per file; picklable by reference for the workers."""
+
+    def worker_factory(self):
+        return partial(SpawningReporter, root=self.root)
+
+    def check(self, file_path: Path) -> bool:
+        run_command([sys.executable, "-c", ""], check=True)
+        return True
+
+
+def profiled_run(tmp_path: Path, jobs: int, count: int = 4) -> Profiler:
+    files = []
+    for number in range(count):
+        files.append(tmp_path / f"doc{number}.md")
+        files[-1].write_text("# doc\n")
+    reporter = SpawningReporter(root=tmp_path)
+    reporter.profiler = Profiler()
+    with reporter.phase("format"):
+        reporter.process_files(files, "check", jobs)
+    return reporter.profiler
+
+
+def test_phases_nest_and_tag_the_files_measured_inside_them():
+    profiler = Profiler()
+    timing = FileTiming("a.md", profiler.start, 0.01, os.getpid(), {})
+    with profiler.phase("plugins"):
+        with profiler.phase("consistency"):
+            profiler.add_files([timing])
+        profiler.add_files([timing])
+    profiler.add_files([timing])
+
+    assert [name for name, _, _ in profiler.phases] == ["consistency", "plugins"]
+    assert [phase for phase, _ in profiler.files] == ["consistency", "plugins", "-"]
+    assert profiler.current_phase == "-"
+
+
+def test_serial_run_counts_subprocesses_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(CI, "SPAWN_COUNTS", {})
+    profiler = profiled_run(tmp_path, jobs=1)
+
+    assert profiler.spawn_counts() == {sys.executable: 4}
+    assert [timing.spawns for _, timing in profiler.files] == [{sys.executable: 1}] * 4
+    assert [phase for phase, _ in profiler.files] == ["format"] * 4
+
+
+def test_worker_subprocesses_are_added_to_the_main_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(CI, "SPAWN_COUNTS", {})
+    profiler = profiled_run(tmp_path, jobs=2)
+
+    assert CI.SPAWN_COUNTS == {}
+    assert profiler.spawn_counts() == {sys.executable: 4}
+    assert os.getpid() not in {timing.pid for _, timing in profiler.files}
+
+
+def test_report_and_chrome_trace(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(CI, "SPAWN_COUNTS", {})
+    profiler = profiled_run(tmp_path, jobs=2)
+    profiler.print_report(top=2)
+    trace_path = tmp_path / "trace.json"
+    profiler.write_chrome_trace(trace_path)
+
+    report = capsys.readouterr().out
+    assert "format" in report
+    assert "Subprocessos:" in report and f"{sys.executable}: 4" in report
+    assert report.count("[format] doc") == 2
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    workers = {timing.pid for _, timing in profiler.files}
+    assert [event["name"] for event in events if event.get("cat") == "phase"] == ["format"]
+    assert sorted(event["name"] for event in events if event.get("cat") == "format") == [
+        f"doc{number}.md" for number in range(4)
+    ]
+    assert {event["tid"] for event in events if event.get("cat") == "format"} == workers
+    assert {event["args"]["name"] for event in events if event["ph"] == "M"} == {
+        "principal", *(f"worker {pid}" for pid in workers)
+    }
+    assert all(event["ts"] >= 0 for event in events if event["ph"] == "X")
+
+
+def test_profile_flag_writes_the_trace(tmp_path):
+    trace_path = tmp_path / "trace.json"
+    result = subprocess.run(
+        [sys.executable, str(Path(CI.__file__)), "--only-markdown", "--skip-markdown", "--check-format",
+         "--no-cache", "--profile", "--profile-trace", str(trace_path)],
+        capture_output=True, text=True, timeout=120,
+    )
+
+    assert "PERFIL DE EXECUÇÃO" in result.stdout, result.stdout + result.stderr
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert "format" in {event["name"] for event in events if event.get("cat") == "phase"}
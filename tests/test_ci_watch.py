@@ -0,0 +1,127 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from CI import InotifyWatcher, PollingWatcher, RepoIndex, WatchSession
+
+
+def write_plugin(root: Path, name: str, version: str):
+    manifest = root / "plugins" / name / ".claude-plugin" / "plugin.json"
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    manifest.write_text(json.dumps({"name": name, "version": version, "description": name}))
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    marketplace = {
+        "name": "market", "version": "1.0.0", "description": "Plugins",
+        "plugins": [{"name": "alpha", "version": "1.0.0", "source": "./plugins/alpha"}],
+    }
+    (tmp_path / ".claude-plugin").mkdir()
+    (tmp_path / ".claude-plugin" / "marketplace.json").write_text(json.dumps(marketplace))
+    write_plugin(tmp_path, "alpha", "1.0.0")
+    (tmp_path / "plugins" / "alpha" / "commands").mkdir()
+    (tmp_path / "plugins" / "alpha" / "commands" / "run.md").write_text("# Run\n")
+    (tmp_path / "README.md").write_text("# Market\n")
+    (tmp_path / "node_modules").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def session(repo, monkeypatch) -> WatchSession:
+    session = WatchSession(repo, RepoIndex.scan(repo), engine="subprocess")
+    session.formatted = []
+    session.labels = []
+
+    def fake_mdformat(file_path: Path) -> bool:
+        session.formatted.append(file_path.relative_to(repo).as_posix())
+        return True
+
+    monkeypatch.setattr(session.formatter, "run_mdformat", fake_mdformat)
+    monkeypatch.setattr(session, "report", lambda label, elapsed: session.labels.append(label))
+    return session
+
+
+def inotify_watcher(root: Path):
+    try:
+        return InotifyWatcher(root)
+    except (OSError, AttributeError):
+        pytest.skip("inotify not available")
+
+
+@pytest.mark.parametrize("create", [lambda root: PollingWatcher(root, interval=0.01), inotify_watcher],
+                         ids=["polling", "inotify"])
+def test_watcher_reports_changed_files(repo, create):
+    watcher = create(repo)
+    try:
+        (repo / "README.md").write_text("# Market, edited\n")
+        (repo / "docs").mkdir()
+        (repo / "docs" / "guide.md").write_text("# Guide\n")
+        (repo / "plugins" / "alpha" / "commands" / "run.md").unlink()
+        (repo / "node_modules" / "pkg.md").write_text("# Ignored\n")
+
+        expected = {repo / "README.md", repo / "docs" / "guide.md", repo / "plugins/alpha/commands/run.md"}
+        changed: set = set()
+        deadline = time.monotonic() + 5
+        while not expected <= changed and time.monotonic() < deadline:
+            changed |= watcher.wait(0.2)
+    finally:
+        watcher.close()
+
+    assert expected <= changed
+    assert not any("node_modules" in path.parts for path in changed)
+
+
+def test_revalidate_checks_only_the_saved_file(session, repo):
+    session.revalidate({repo / "README.md"})
+
+    assert session.formatted == ["README.md"]
+    assert session.labels == ["README.md"]
+    assert session.json_validator.success == []
+
+
+def test_revalidate_tracks_added_and_removed_markdown(session, repo):
+    guide = repo / "docs" / "guide.md"
+    guide.parent.mkdir()
+    guide.write_text("# Guide\n")
+    session.revalidate({guide})
+    assert guide in session.index.markdown_files
+    assert session.formatted == ["docs/guide.md"]
+
+    guide.unlink()
+    session.revalidate({guide})
+    assert guide not in session.index.markdown_files
+    assert session.formatted == ["docs/guide.md"]
+
+
+def test_revalidate_rereads_a_saved_plugin_manifest(session, repo):
+    session.json_validator.check_marketplace_plugin_consistency()
+    assert session.json_validator.errors == []
+
+    write_plugin(repo, "alpha", "2.0.0")
+    session.revalidate({repo / "plugins/alpha/.claude-plugin/plugin.json"})
+
+    assert session.labels == ["plugins/alpha"]
+    assert "alpha: versão inconsistente - marketplace.json=1.0.0, plugin.json=2.0.0" \
+        in session.json_validator.errors
+    assert session.formatted == []
+
+
+def test_revalidate_skips_ignored_directories(session, repo):
+    session.revalidate({repo / "node_modules" / "pkg.md"})
+
+    assert session.formatted == []
+    assert session.labels == []
+
+
+def test_event_queue_overflow_revalidates_everything(session, repo):
+    extra = repo / "docs" / "missed.md"
+    extra.parent.mkdir()
+    extra.write_text("# Missed\n")
+    session.revalidate({repo})
+
+    assert sorted(session.formatted) == ["README.md", "docs/missed.md", "plugins/alpha/commands/run.md"]
+    assert session.labels[0].startswith(".claude-plugin/marketplace.json, ")
+    assert "plugins/alpha" in session.labels[0]
@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import pytest
+
+import effective_content
+import validate_file_size
+from effective_content import build_effective_content
+from validate_file_size import MAX_LINES
+
+
+def lines(count: int) -> str:
+    return "".join(f"x_{n} = {n}\n" for n in range(count))
+
+
+def edit(path: Path, old: str, new: str, **extra) -> dict:
+    return {"tool_name": "Edit", "tool_input": {"file_path": str(path), "old_string": old, "new_string": new, **extra}}
+
+
+def test_edit_is_applied_to_the_file_on_disk(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("a = 1\nb = 2\n")
+    effective = build_effective_content(edit(path, "b = 2", "b = 2\nc = 3"))
+    assert effective.content == "a = 1\nb = 2\nc = 3\n"
+    assert effective.line_count == len(effective.content.split("\n"))
+    assert effective.original_line_count == 3
+
+
+def test_multiedit_applies_edits_in_order_with_replace_all(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("x = 1\nx = 1\ny = 2\n")
+    effective = build_effective_content({"tool_name": "MultiEdit", "tool_input": {
+        "file_path": str(path),
+        "edits": [
+            {"old_string": "x = 1", "new_string": "x = 1\n# x", "replace_all": True},
+            {"old_string": "y = 2\n", "new_string": ""},
+        ],
+    }})
+    assert effective.content == "x = 1\n# x\nx = 1\n# x\n"
+    assert effective.line_count == len(effective.content.split("\n"))
+
+
+def test_relative_path_is_resolved_against_cwd(tmp_path):
+    (tmp_path / "module.py").write_text("a = 1\n")
+    payload = edit(Path("module.py"), "a = 1", "a = 2")
+    payload["cwd"] = str(tmp_path)
+    assert build_effective_content(payload).content == "a = 2\n"
+
+
+@pytest.mark.parametrize("old", ["missing", ""])
+def test_edit_that_does_not_apply_falls_back_to_the_fragment(tmp_path, old):
+    path = tmp_path / "module.py"
+    path.write_text("a = 1\n")
+    effective = build_effective_content(edit(path, old, "b = 2"))
+    assert effective.content == "b = 2"
+    assert effective.original_line_count is None
+
+
+def test_unguarded_files_are_not_read(tmp_path, monkeypatch):
+    path = tmp_path / "notes.md"
+    path.write_text("# notes\n")
+    monkeypatch.setattr(effective_content, "_read", lambda *args: pytest.fail("file was read"))
+    assert build_effective_content(edit(path, "# notes", "# more notes")).content == "# more notes"
+
+
+def test_write_records_the_size_of_the_replaced_file(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text(lines(10))
+    payload = {"tool_name": "Write", "tool_input": {"file_path": str(path), "content": lines(3)}}
+    effective = build_effective_content(payload)
+    assert (effective.line_count, effective.original_line_count) == (4, 11)
+
+
+def deny(path: Path, payload: dict) -> bool:
+    effective = build_effective_content(payload)
+    return validate_file_size.check(
+        effective.file_path, effective.content, effective.line_count, effective.original_line_count
+    ) is not None
+
+
+def test_edit_growing_a_file_past_the_limit_is_denied(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text(lines(MAX_LINES - 1))
+    assert deny(path, edit(path, "x_0 = 0\n", lines(5)))
+
+
+def test_shrinking_an_oversized_file_is_allowed(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text(lines(MAX_LINES + 200))
+    assert not deny(path, edit(path, lines(100), ""))
+
+
+def test_growing_an_oversized_file_is_denied(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text(lines(MAX_LINES + 200))
+    assert deny(path, edit(path, "x_0 = 0\n", "x_0 = 0\ny = 1\n"))
+
+
+def test_new_oversized_file_is_denied(tmp_path):
+    path = tmp_path / "module.py"
+    assert deny(path, {"tool_name": "Write", "tool_input": {"file_path": str(path), "content": lines(MAX_LINES + 1)}})
@@ -0,0 +1,159 @@
+import io
+import json
+import os
+import re
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import hook_client
+
+
+@pytest.fixture
+def runtime_dir(monkeypatch):
+    # Short path: AF_UNIX socket paths are limited to about 100 bytes
+    directory = tempfile.mkdtemp(prefix="hc", dir="/tmp")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", directory)
+    yield directory
+    shutil.rmtree(directory)
+
+
+def fake_daemon(path: str, mode: int) -> socket.socket:
+    """A listener answering every request with an `allow` decision."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, mode)
+    server.listen(1)
+
+    def answer():
+        try:
+            connection, _ = server.accept()
+        except OSError:
+            return
+        with connection:
+            connection.recv(65536)
+            connection.sendall(json.dumps({"permissionDecision": "allow"}).encode())
+
+    threading.Thread(target=answer, daemon=True).start()
+    return server
+
+
+def test_private_dir_is_closed_to_other_users(runtime_dir):
+    os.mkdir(os.path.join(runtime_dir, f"{hook_client.DAEMON_NAME}-{os.getuid()}"), 0o755)
+    directory = hook_client.private_dir(hook_client.DAEMON_NAME)
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert hook_client.socket_path().startswith(directory + os.sep)
+
+
+def test_private_dir_must_not_be_a_symlink(runtime_dir, tmp_path):
+    os.symlink(tmp_path, os.path.join(runtime_dir, f"{hook_client.DAEMON_NAME}-{os.getuid()}"))
+    assert hook_client.private_dir(hook_client.DAEMON_NAME) is None
+    assert hook_client.request("ping", {}, 1.0) is None
+
+
+def test_daemon_on_a_private_socket_is_used(runtime_dir):
+    with fake_daemon(hook_client.socket_path(), 0o600):
+        assert hook_client.request("pre_tool_use", {}, 1.0) == {"permissionDecision": "allow"}
+
+
+def test_socket_open_to_others_is_ignored(runtime_dir):
+    with fake_daemon(hook_client.socket_path(), 0o666):
+        assert hook_client.request("pre_tool_use", {}, 1.0) is None
+
+
+def test_unreachable_daemon_falls_back_to_the_hook(runtime_dir, monkeypatch, capsys):
+    started = []
+    monkeypatch.setattr(hook_client, "start_daemon", lambda: started.append(True))
+    monkeypatch.setattr(hook_client, "run_in_process", lambda hook, payload: {"ran": hook})
+    monkeypatch.setattr(sys, "argv", ["hook_client.py", "run_ruff"])
+    monkeypatch.setattr(sys, "stdin", io.StringIO("{}"))
+
+    hook_client.main()
+    assert json.loads(capsys.readouterr().out) == {"ran": "run_ruff"}
+    assert started == [True]
+
+
+class EchoHook:
+    """Stands in for every hook module the daemon imports."""
+
+    def __init__(self):
+        self.events = []
+
+    def respond(self, payload):
+        if payload.get("fail"):
+            raise ValueError("hook failed")
+        return {"echo": payload}
+
+    def on_daemon_start(self):
+        self.events.append("start")
+
+    def on_daemon_stop(self):
+        self.events.append("stop")
+
+
+def test_daemon_serves_hooks_until_stopped(runtime_dir, monkeypatch, capsys):
+    import hook_daemon
+
+    hook = EchoHook()
+    monkeypatch.setattr(hook_daemon.importlib, "import_module", lambda name: hook)
+    daemon = threading.Thread(target=hook_daemon.serve, daemon=True)
+    daemon.start()
+    path = hook_client.socket_path()
+    for _ in range(100):
+        if hook_client.request("ping", {}, 1.0) is not None:
+            break
+        time.sleep(0.05)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert hook_client.request("ping", {}, 1.0) == {"pid": os.getpid()}
+    assert hook_client.request("run_ruff", {"file": "a.py"}, 1.0) == {"echo": {"file": "a.py"}}
+    # A failing hook answers "no decision" instead of breaking the daemon
+    assert hook_client.request("pre_tool_use", {"fail": True}, 1.0) == {}
+
+    started = []
+    monkeypatch.setattr(hook_client, "start_daemon", lambda: started.append(True))
+    monkeypatch.setattr(sys, "argv", ["hook_client.py", "pre_tool_use"])
+    monkeypatch.setattr(sys, "stdin", io.StringIO('{"tool_name": "Bash"}'))
+    hook_client.main()
+    assert json.loads(capsys.readouterr().out) == {"echo": {"tool_name": "Bash"}}
+    assert started == []
+
+    assert hook_client.request("stop", {}, 1.0) == {}
+    daemon.join(5)
+    assert not daemon.is_alive()
+    assert hook.events == ["start", "stop"]
+    assert not os.path.exists(path)
+    assert hook_client.request("ping", {}, 1.0) is None
+
+
+def test_daemon_does_not_replace_a_socket_it_cannot_remove(runtime_dir, monkeypatch):
+    import hook_daemon
+
+    def unlink(path):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(hook_daemon.os, "unlink", unlink)
+    monkeypatch.setattr(hook_daemon.importlib, "import_module", lambda name: object())
+    hook_daemon.serve()  # Returns instead of raising or binding
+    assert not os.path.exists(hook_client.socket_path())
+
+
+def _shared_code(path: Path) -> str:
+    """The code after the docstring, without the per-plugin settings."""
+    code = path.read_text().split('"""\n', 2)[2]
+    code = re.sub(r'^DAEMON_NAME = .*$', '', code, flags=re.MULTILINE)
+    return re.sub(r'^HOOKS = \{\n(?:    .*\n)*\}$', '', code, flags=re.MULTILINE)
+
+
+@pytest.mark.parametrize("name", ["hook_client.py", "hook_daemon.py"])
+def test_plugin_copies_stay_in_sync(name):
+    plugins = Path(hook_client.HOOKS_DIR).parent.parent
+    assert _shared_code(plugins / "systemic-agent-orchestrator" / "hooks" / name) == \
+        _shared_code(plugins / "serena-mcp-helper" / "hooks" / name)
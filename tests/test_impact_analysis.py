@@ -0,0 +1,203 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import impact_analysis
+import run_tests_on_stop
+from impact_analysis import ImpactMap, Selection
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'p'\n")
+    (tmp_path / "src" / "pkg" / "a.py").write_text("def f():\n    return 1\n")
+    (tmp_path / "src" / "pkg" / "b.py").write_text("def g():\n    return 2\n")
+    (tmp_path / "tests" / "test_a.py").write_text("def test_f():\n    pass\n")
+    (tmp_path / "tests" / "test_b.py").write_text("def test_g():\n    pass\n")
+    return tmp_path
+
+
+def write_contexts(impact: ImpactMap, contexts: dict[str, list[str]]):
+    """A coverage.py database with `src path -> test node ids` as dynamic contexts."""
+    impact.coverage_file.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(impact.coverage_file)
+    connection.executescript(
+        "CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT);"
+        "CREATE TABLE context (id INTEGER PRIMARY KEY, context TEXT);"
+        "CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER, numbits BLOB);"
+        "CREATE TABLE arc (file_id INTEGER, context_id INTEGER, fromno INTEGER, tono INTEGER);"
+    )
+    for file_id, (path, node_ids) in enumerate(contexts.items(), start=1):
+        connection.execute("INSERT INTO file VALUES (?, ?)", (file_id, str(impact.project_root / path)))
+        for node_id in node_ids:
+            context_id = connection.execute("INSERT INTO context (context) VALUES (?)", (f"{node_id}|run",)).lastrowid
+            connection.execute("INSERT INTO line_bits VALUES (?, ?, x'01')", (file_id, context_id))
+    connection.commit()
+    connection.close()
+
+
+def green_full_run(project: Path):
+    impact = ImpactMap(project)
+    selection = impact.select()
+    assert selection.full
+    write_contexts(impact, {
+        "src/pkg/a.py": ["tests/test_a.py::test_f"],
+        "src/pkg/b.py": ["tests/test_b.py::test_g"],
+    })
+    impact.record(selection, passed=True)
+
+
+def test_first_run_is_full(project):
+    selection = ImpactMap(project).select()
+    assert selection.full
+    assert selection.reason == "no test impact map yet"
+
+
+def test_full_selection_setting(project, monkeypatch):
+    monkeypatch.setattr(impact_analysis, "SELECTION", "full")
+    impact = ImpactMap(project)
+    assert not impact.enabled
+    assert impact.select() == Selection(True, "TEST_SELECTION=full")
+
+
+def test_source_change_selects_covering_tests(project):
+    green_full_run(project)
+    (project / "src" / "pkg" / "a.py").write_text("def f():\n    return 3\n")
+
+    selection = ImpactMap(project).select()
+    assert not selection.full
+    assert selection.tests == ["tests/test_a.py::test_f"]
+    assert selection.changed == ["src/pkg/a.py"]
+
+
+def test_no_change_selects_nothing(project):
+    green_full_run(project)
+    selection = ImpactMap(project).select()
+    assert not selection.full
+    assert selection.tests == []
+
+
+def test_changed_test_module_is_selected_whole(project):
+    green_full_run(project)
+    (project / "tests" / "test_b.py").write_text("def test_g():\n    assert True\n")
+    assert ImpactMap(project).select().tests == ["tests/test_b.py"]
+
+
+@pytest.mark.parametrize("path", [
+    "pyproject.toml", "src/pkg/new.py", "tests/conftest.py", "tests/test_data.json", "src/pkg/template.txt",
+])
+def test_unmapped_changes_force_a_full_run(project, path):
+    green_full_run(project)
+    (project / path).write_text("# changed\n")
+    selection = ImpactMap(project).select()
+    assert selection.full
+    assert selection.reason == f"{path} changed"
+
+
+@pytest.mark.parametrize("path", ["tests/test_b.py", "src/pkg/b.py"])
+def test_removed_modules_force_a_full_run(project, path):
+    green_full_run(project)
+    (project / path).unlink()
+    selection = ImpactMap(project).select()
+    assert selection.full and selection.refresh
+    assert selection.reason == f"{path} removed"
+
+
+def test_changes_without_mapped_tests_force_a_full_run(project):
+    green_full_run(project)
+    impact = ImpactMap(project)
+    impact.state["sources"]["src/pkg/a.py"] = []
+    (project / "src" / "pkg" / "a.py").write_text("def f():\n    return 3\n")
+    selection = impact.select()
+    assert selection.full
+    assert selection.reason == "no test mapped to the changes"
+
+
+@pytest.mark.parametrize("path, refresh", [
+    ("pyproject.toml", False), ("src/pkg/new.py", True), ("tests/fixtures/data.yaml", False),
+])
+def test_only_unmapped_sources_refresh_the_map(project, path, refresh):
+    green_full_run(project)
+    (project / path).parent.mkdir(parents=True, exist_ok=True)
+    (project / path).write_text("# changed\n")
+    assert ImpactMap(project).select().refresh is refresh
+
+
+def test_gate_only_full_run_keeps_the_map(project):
+    green_full_run(project)
+    (project / "pyproject.toml").write_text("[project]\nname = 'q'\n")
+    impact = ImpactMap(project)
+    selection = impact.select()
+    assert selection.full and not selection.refresh
+    impact.coverage_file.unlink()
+    write_contexts(impact, {})  # Coverage data without per-test contexts
+    impact.record(selection, passed=True)
+
+    (project / "src" / "pkg" / "a.py").write_text("def f():\n    return 3\n")
+    assert ImpactMap(project).select().tests == ["tests/test_a.py::test_f"]
+
+
+def test_periodic_full_run(project, monkeypatch):
+    monkeypatch.setattr(impact_analysis, "FULL_RUN_EVERY", 2)
+    green_full_run(project)
+    for value in (3, 4):
+        (project / "src" / "pkg" / "a.py").write_text(f"def f():\n    return {value}\n")
+        impact = ImpactMap(project)
+        selection = impact.select()
+        assert not selection.full
+        impact.record(selection, passed=True)
+    selection = ImpactMap(project).select()
+    assert selection.full and selection.refresh
+
+
+def test_red_selective_run_keeps_the_snapshot(project):
+    green_full_run(project)
+    (project / "src" / "pkg" / "a.py").write_text("def f():\n    return 3\n")
+    impact = ImpactMap(project)
+    impact.record(impact.select(), passed=False)
+
+    # The change is still tested on the next Stop
+    assert ImpactMap(project).select().changed == ["src/pkg/a.py"]
+
+
+def test_red_full_run_forces_full_runs_until_green(project):
+    green_full_run(project)
+    (project / "pyproject.toml").write_text("[project]\nname = 'q'\n")
+    impact = ImpactMap(project)
+    selection = impact.select()
+    assert selection.full
+    impact.record(selection, passed=False)  # --cov-fail-under failed
+
+    # A covered edit must not be checked by a selective run without coverage
+    (project / "src" / "pkg" / "a.py").write_text("def f():\n    return 3\n")
+    impact = ImpactMap(project)
+    selection = impact.select()
+    assert selection == Selection(True, "last full run failed")
+
+    impact.record(selection, passed=True)
+    (project / "src" / "pkg" / "a.py").write_text("def f():\n    return 4\n")
+    assert not ImpactMap(project).select().full
+
+
+def test_many_node_ids_select_test_files(project, monkeypatch):
+    monkeypatch.setattr(impact_analysis, "MAX_NODE_IDS", 1)
+    impact = ImpactMap(project)
+    selection = impact.select()
+    write_contexts(impact, {"src/pkg/a.py": ["tests/test_a.py::test_f", "tests/test_b.py::test_g"]})
+    impact.record(selection, passed=True)
+
+    (project / "src" / "pkg" / "a.py").write_text("def f():\n    return 3\n")
+    assert ImpactMap(project).select().tests == ["tests/test_a.py", "tests/test_b.py"]
+
+
+@pytest.mark.parametrize("refresh, core", [(False, "sysmon"), (True, None)])
+def test_sysmon_for_gate_only_full_runs(monkeypatch, refresh, core):
+    monkeypatch.setattr(run_tests_on_stop, "TEST_COVERAGE_CORE", "auto")
+    selection = Selection(True, "reason", refresh=refresh)
+    command = run_tests_on_stop.pytest_command(selection, 0)
+    assert ("--cov-context=test" in command) is refresh
+    assert run_tests_on_stop.coverage_core((3, 12), selection.refresh) == core
+    assert run_tests_on_stop.coverage_core((3, 11), selection.refresh) is None
@@ -0,0 +1,64 @@
+import json
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+import pytest_results
+from pytest_results import PytestResults, read_coverage, read_junit
+
+
+def write_report(path: Path, percent: float, display: str):
+    path.write_text(json.dumps({
+        "totals": {"percent_covered": percent, "percent_covered_display": display},
+        "files": {"src/a.py": {"summary": {"percent_covered": percent}}},
+    }))
+
+
+def test_coverage_is_rounded_like_cov_fail_under(tmp_path):
+    # pytest-cov's default precision shows 69.6% as 70%, which passes --cov-fail-under=70
+    write_report(tmp_path / "coverage.json", 69.6, "70")
+    results = PytestResults()
+    read_coverage(tmp_path / "coverage.json", results, tmp_path, 70)
+    assert results.coverage == 70.0
+
+
+def test_coverage_keeps_the_report_precision(tmp_path):
+    write_report(tmp_path / "coverage.json", 69.44, "69.4")
+    results = PytestResults()
+    read_coverage(tmp_path / "coverage.json", results, tmp_path, 70)
+    assert results.coverage == 69.4
+    assert results.lowest_coverage == [(69.44, "src/a.py")]
+
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="{total}">
+{cases}
+</testsuite></testsuites>
+"""
+
+
+def test_junit_is_streamed_without_keeping_the_cases(tmp_path, monkeypatch):
+    cases = "\n".join(
+        f'<testcase classname="tests.test_a" name="test_{n}" file="tests/test_a.py" time="{n / 100}">'
+        + ('<failure message="boom">trace</failure>' if n % 50 == 0 else "")
+        + "</testcase>"
+        for n in range(200)
+    )
+    junit = tmp_path / "junit.xml"
+    junit.write_text(JUNIT.format(total=200, cases=cases))
+
+    parsers = []
+    iterparse = ElementTree.iterparse
+
+    def recording_iterparse(*args, **kwargs):
+        parsers.append(iterparse(*args, **kwargs))
+        return parsers[-1]
+
+    monkeypatch.setattr(pytest_results.ElementTree, "iterparse", recording_iterparse)
+    results = PytestResults()
+    read_junit(junit, results, 3)
+
+    assert (results.total, results.failures) == (200, 4)
+    assert results.failed[0] == "tests/test_a.py::test_0 - boom"
+    assert results.slowest == [(1.99, "tests/test_a.py::test_199"), (1.98, "tests/test_a.py::test_198"),
+                               (1.97, "tests/test_a.py::test_197")]
+    assert [len(suite) for suite in parsers[0].root] == [0]  # No emptied testcase left on the testsuite
@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import pytest_server
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    root = tmp_path / "project"
+    (root / "src" / "graph").mkdir(parents=True)
+    (root / "tests").mkdir()
+    (root / "src" / "__init__.py").write_text("")
+    (root / "src" / "graph" / "__init__.py").write_text("import yaml\n")
+    (root / "helpers.py").write_text("")
+    (root / "tests" / "test_graph.py").write_text(
+        "import json\nimport helpers\nfrom src.graph import build\nfrom graph import node\n"
+    )
+    return root
+
+
+def test_project_modules_are_not_third_party(project):
+    assert pytest_server._third_party_imports(project) == ["json", "yaml"]
+
+
+def test_only_modules_outside_the_project_are_preloaded(project, tmp_path, monkeypatch):
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "installed_dep.py").write_text("")
+    (project / "shadow_dep.py").write_text("")
+    monkeypatch.syspath_prepend(str(site))
+    monkeypatch.syspath_prepend(str(project))
+
+    assert pytest_server._installed("json", project)
+    assert pytest_server._installed("installed_dep", project)
+    assert not pytest_server._installed("shadow_dep", project)
+    assert not pytest_server._installed("src", project)
+    assert not pytest_server._installed("missing_dep", project)
+    assert "shadow_dep" not in sys.modules
+
+
+def test_server_socket_open_to_others_is_ignored(project, monkeypatch):
+    monkeypatch.setattr(pytest_server, "start", lambda project_root: None)
+    runtime_dir = tempfile.mkdtemp(prefix="ps", dir="/tmp")  # Short enough for AF_UNIX
+    monkeypatch.setenv("XDG_RUNTIME_DIR", runtime_dir)
+    try:
+        path = pytest_server.socket_path(project)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+
+        def answer():
+            connection, _ = server.accept()
+            with connection:
+                connection.recv(65536)
+                connection.sendall(json.dumps({"returncode": 0, "output": ""}).encode())
+
+        threading.Thread(target=answer, daemon=True).start()
+        os.chmod(path, 0o666)
+        assert pytest_server.run(project, ["tests/"], {}, 5) is None
+        os.chmod(path, 0o600)
+        assert pytest_server.run(project, ["tests/"], {}, 5).returncode == 0
+        server.close()
+    finally:
+        shutil.rmtree(runtime_dir)
+
+
+def wait_for_server(project: Path, timeout: float = 30) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = pytest_server.request(project, {"command": "ping"}, 1.0)
+        if response is not None:
+            return response
+        time.sleep(0.1)
+    raise AssertionError("pytest server did not start")
+
+
+def test_server_restarts_when_dependencies_change(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    (project / "tests").mkdir(parents=True)
+    (project / "pyproject.toml").write_text('[project]\nname = "demo"\n')
+    (project / "tests" / "test_ok.py").write_text("def test_ok():\n    assert True\n")
+    runtime_dir = tempfile.mkdtemp(prefix="ps", dir="/tmp")  # Short enough for AF_UNIX
+    monkeypatch.setenv("XDG_RUNTIME_DIR", runtime_dir)
+
+    servers = []
+
+    def start(project_root):
+        servers.append(subprocess.Popen(
+            [sys.executable, pytest_server.__file__, "serve", str(project_root)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+
+    monkeypatch.setattr(pytest_server, "start", start)
+    args = ["-q", "-p", "no:cacheprovider", "-p", "no:cov", "tests"]
+    try:
+        assert pytest_server.run(project, args, {}, 60) is None  # Cold: starts the server
+        first = wait_for_server(project)
+        assert first == {"pid": servers[0].pid, "stale": False}
+        result = pytest_server.run(project, args, {}, 60)
+        assert result.returncode == 0 and "1 passed" in result.stdout
+
+        (project / "pyproject.toml").write_text('[project]\nname = "demo"\nversion = "2"\n')
+        assert pytest_server.run(project, args, {}, 60) is None
+        assert servers[0].wait(10) == 0  # The stale server exits...
+        assert len(servers) == 2  # ...and a new one is started with the new stamp
+
+        second = wait_for_server(project)
+        assert second == {"pid": servers[1].pid, "stale": False}
+        result = pytest_server.run(project, args, {}, 60)
+        assert result.returncode == 0 and "1 passed" in result.stdout
+    finally:
+        pytest_server.request(project, {"command": "stop"}, 1.0)
+        for server in servers:
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        shutil.rmtree(runtime_dir)
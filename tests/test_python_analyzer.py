@@ -0,0 +1,145 @@
+import textwrap
+
+import pytest
+
+import python_analyzer
+import validate_functional_api
+import validate_local_prompts
+from python_analyzer import analyze
+
+
+def both_modes(find_violations, source: str, monkeypatch) -> tuple[list[str], list[str]]:
+    """Violations found from the AST and from the regex patterns."""
+    source = textwrap.dedent(source)
+    with monkeypatch.context() as patch:
+        patch.setattr(python_analyzer, "AST_ENABLED", True)
+        assert analyze(source) is not None
+        from_ast = find_violations(source)
+        patch.setattr(python_analyzer, "AST_ENABLED", False)
+        from_regex = find_violations(source)
+    return from_ast, from_regex
+
+
+PROMPTS = {
+    "constant": '''
+        SYSTEM_PROMPT = "You are a helpful assistant."
+    ''',
+    "attribute target": '''
+        class Agent:
+            def __init__(self):
+                self.SYSTEM_PROMPT = "You are a helpful assistant."
+    ''',
+    "concatenated constant": '''
+        SYSTEM_PROMPT = "You are " + "a helpful assistant"
+    ''',
+    "concatenated with a variable": '''
+        USER_PROMPT = "Question: " + question
+    ''',
+    "multi-line f-string": '''
+        def build(role, topic):
+            return f"""You are {role}.
+        Answer the {topic} question."""
+    ''',
+    "multi-line string": '''
+        def build():
+            return """You are a helpful assistant.
+        Answer the question using the retrieved context."""
+    ''',
+    "system message": '''
+        from langchain_core.messages import SystemMessage
+        message = SystemMessage(content="You are a helpful assistant that answers every question.")
+    ''',
+    "from_template": '''
+        from langchain_core.prompts import ChatPromptTemplate
+        prompt = ChatPromptTemplate.from_template("Summarize the following document: {document}")
+    ''',
+}
+
+CLEAN = {
+    "langsmith": '''
+        from langsmith import Client
+        prompt = Client().pull_prompt("org/prompt")
+    ''',
+    "short strings": '''
+        GREETING = "hello"
+        NAME = f"{first} {last}"
+    ''',
+    "unrelated constant": '''
+        TIMEOUT = 30
+        SYSTEM_NAME = "orchestrator"
+    ''',
+}
+
+
+@pytest.mark.parametrize("source", PROMPTS.values(), ids=PROMPTS.keys())
+def test_prompts_are_found_by_both_modes(source, monkeypatch):
+    from_ast, from_regex = both_modes(validate_local_prompts.find_violations, source, monkeypatch)
+    assert from_ast
+    assert from_ast == from_regex
+
+
+@pytest.mark.parametrize("source", CLEAN.values(), ids=CLEAN.keys())
+def test_clean_sources_pass_in_both_modes(source, monkeypatch):
+    assert both_modes(validate_local_prompts.find_violations, source, monkeypatch) == ([], [])
+
+
+def test_docstrings_are_only_matched_by_the_regex(monkeypatch):
+    source = '''
+        def build():
+            """You are not a prompt.
+            Instructions: read the code."""
+    '''
+    from_ast, from_regex = both_modes(validate_local_prompts.find_violations, source, monkeypatch)
+    assert from_ast == []
+    assert from_regex
+
+
+FUNCTIONAL_API = {
+    "entrypoint": '''
+        from langgraph.func import entrypoint
+
+        @entrypoint()
+        def workflow(inputs):
+            return inputs
+    ''',
+    "task": '''
+        from langgraph.func import task
+
+        @task
+        def step(value):
+            return value
+    ''',
+}
+
+
+@pytest.mark.parametrize("source", FUNCTIONAL_API.values(), ids=FUNCTIONAL_API.keys())
+def test_functional_api_is_found_by_both_modes(source, monkeypatch):
+    from_ast, from_regex = both_modes(validate_functional_api.find_violations, source, monkeypatch)
+    assert from_ast
+    assert from_ast == from_regex
+
+
+def test_strings_are_folded_and_joined():
+    facts = analyze(textwrap.dedent('''
+        A = "You are " + "a helpful assistant " + "for the team"
+        B = f"Answer the {topic} question using the context"
+    '''))
+    assert "You are a helpful assistant for the team" in facts.strings
+    assert "Answer the  question using the context" in facts.strings
+    assert "You are a helpful assistant " not in facts.strings  # Kept once, as the whole chain
+
+
+def test_assignments_include_attribute_targets():
+    facts = analyze("self.config.PROMPT_TEMPLATE = 'x'\n")
+    assert list(facts.assignments) == ["self.config.PROMPT_TEMPLATE"]
+
+
+def test_cache_is_safe_across_threads(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(python_analyzer, "AST_ENABLED", True)
+    sources = [f"VALUE_{n} = {n}\n" for n in range(python_analyzer.CACHE_SIZE * 4)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(analyze, sources * 20))
+    assert all(facts is not None for facts in results)
+    assert len(python_analyzer._cache) <= python_analyzer.CACHE_SIZE
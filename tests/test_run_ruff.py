@@ -0,0 +1,118 @@
+import json
+import os
+import stat
+import time
+from pathlib import Path
+
+import pytest
+
+import run_ruff
+
+
+@pytest.fixture
+def checks(monkeypatch) -> list[list[str]]:
+    """Batches passed to `ruff check`; every file gets one issue."""
+    batches = []
+
+    def fake_check(command, cwd, files):
+        batches.append(sorted(files))
+        return {path: [f"{path}:1:1: F401 unused"] for path in files}
+
+    monkeypatch.setattr(run_ruff, "run_ruff_check", fake_check)
+    return batches
+
+
+def test_standalone_lint_does_not_wait_for_a_batch(checks, monkeypatch):
+    monkeypatch.setattr(run_ruff, "_persistent", False)
+    monkeypatch.setattr(run_ruff, "BATCH_WINDOW", 5.0)
+    started = time.monotonic()
+    assert run_ruff.lint(["ruff"], "/p", "/p/a.py") == ["/p/a.py:1:1: F401 unused"]
+    assert time.monotonic() - started < 1.0
+    assert checks == [["/p/a.py"]]
+
+
+def test_daemon_batches_concurrent_files(checks, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(run_ruff, "_persistent", True)
+    monkeypatch.setattr(run_ruff, "lint_with_server", lambda *args: None)  # No ruff server
+    monkeypatch.setattr(run_ruff, "BATCH_WINDOW", 0.2)
+    files = ["/p/a.py", "/p/b.py", "/p/c.py"]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda path: run_ruff.lint(["ruff"], "/p", path), files))
+    assert results == [[f"{path}:1:1: F401 unused"] for path in files]
+    assert checks == [files]
+
+
+def test_queue_needs_fcntl(checks, monkeypatch, tmp_path):
+    monkeypatch.setattr(run_ruff, "QUEUE_ENABLED", True)
+    monkeypatch.setattr(run_ruff, "fcntl", None)
+    monkeypatch.setattr(run_ruff, "ruff_command", lambda session_id, cwd: ["ruff"])
+    (tmp_path / "a.py").write_text("import os\n")
+    response = run_ruff.respond({"tool_input": {"file_path": "a.py"}, "cwd": str(tmp_path)})
+    assert "F401" in response["systemMessage"]
+    assert checks == [[str(tmp_path / "a.py")]]
+
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setattr(run_ruff, "_commands", {})
+    monkeypatch.setattr(run_ruff, "discover_ruff", lambda cwd, use_uv=True: ["/usr/bin/ruff"])
+    return tmp_path
+
+
+def test_ruff_command_is_cached_in_a_private_directory(runtime_dir):
+    assert run_ruff.ruff_command("s1", "/p") == ["/usr/bin/ruff"]
+    cache_dir = runtime_dir / f"{run_ruff.SESSION_CACHE_NAME}-{os.getuid()}"
+    assert stat.S_IMODE(cache_dir.stat().st_mode) == 0o700
+    assert json.loads((cache_dir / "ruff-s1.json").read_text()) == {"/p": ["/usr/bin/ruff"]}
+
+
+def test_cache_planted_by_someone_else_is_not_used(runtime_dir, tmp_path_factory):
+    planted = tmp_path_factory.mktemp("planted")
+    (planted / "ruff-s1.json").write_text(json.dumps({"/p": ["/bin/sh", "-c", "evil"]}))
+    (runtime_dir / f"{run_ruff.SESSION_CACHE_NAME}-{os.getuid()}").symlink_to(planted)
+
+    assert run_ruff.ruff_command("s1", "/p") == ["/usr/bin/ruff"]
+    assert json.loads((planted / "ruff-s1.json").read_text())["/p"][0] == "/bin/sh"
+
+
+def test_caller_arriving_during_a_check_gets_its_own_batch(monkeypatch):
+    import threading
+
+    first_running = threading.Event()
+    release_first = threading.Event()
+    runs = []
+
+    def fake_check(command, cwd, files):
+        runs.append(files)
+        run = len(runs)
+        if run == 1:
+            first_running.set()
+            release_first.wait(5)
+        return {path: [f"run {run}"] for path in files}
+
+    monkeypatch.setattr(run_ruff, "run_ruff_check", fake_check)
+    monkeypatch.setattr(run_ruff, "BATCH_WINDOW", 0.2)
+    batcher = run_ruff.RuffBatcher()
+    results = {}
+
+    def lint(name):
+        results[name] = batcher.lint(["ruff"], "/p", "/p/a.py")
+
+    threads = [threading.Thread(target=lint, args=("first",))]
+    threads[0].start()
+    first_running.wait(5)
+    # The file is saved twice more while the first check runs: both saves
+    # join a second batch and must not read what the first check found
+    for name in ("second", "third"):
+        threads.append(threading.Thread(target=lint, args=(name,)))
+        threads[-1].start()
+    time.sleep(0.05)
+    release_first.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == {"first": ["run 1"], "second": ["run 2"], "third": ["run 2"]}
+    assert len(runs) == 2
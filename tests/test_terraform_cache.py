@@ -0,0 +1,120 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import run_tests_on_stop
+import terraform_cache
+
+FAKE_TERRAFORM = """#!/bin/sh
+echo "terraform $*" >> "$FAKE_TOOLS_LOG"
+case "$1" in
+    init)
+        [ -e "$FAKE_TOOLS_DIR/init_fails" ] && { echo "Failed to install provider" >&2; exit 1; }
+        mkdir -p .terraform ;;
+    validate)
+        [ -d .terraform ] || { echo "Missing required provider" >&2; exit 1; } ;;
+esac
+exit 0
+"""
+
+FAKE_TOOL = """#!/bin/sh
+echo "$(basename "$0") $*" >> "$FAKE_TOOLS_LOG"
+echo "No problems detected"
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch) -> Path:
+    tools = tmp_path / "bin"
+    tools.mkdir()
+    for name, script in (("terraform", FAKE_TERRAFORM), ("tflint", FAKE_TOOL), ("tfsec", FAKE_TOOL)):
+        (tools / name).write_text(script)
+        (tools / name).chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tools}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_TOOLS_DIR", str(tools))
+    monkeypatch.setenv("FAKE_TOOLS_LOG", str(tmp_path / "calls.log"))
+    monkeypatch.setattr(terraform_cache, "PLUGIN_CACHE_DIR", str(tmp_path / "plugin-cache"))
+
+    root = tmp_path / "project"
+    (root / "infra").mkdir(parents=True)
+    (root / "infra" / "main.tf").write_text(
+        'module "vpc" {\n  source  = "terraform-aws-modules/vpc/aws"\n  version = "5.0.0"\n}\n'
+    )
+    (root / "infra" / "prod.tfvars").write_text('region = "us-east-1"\n')
+    return root
+
+
+def stop(project: Path) -> tuple[bool, str, list[str]]:
+    """One Terraform pass of the Stop hook, with the tools it invoked."""
+    log = Path(os.environ["FAKE_TOOLS_LOG"])
+    log.unlink(missing_ok=True)
+    passed, output, _ = run_tests_on_stop.run_terraform_tests(project)
+    calls = [line.split() for line in log.read_text().splitlines()] if log.exists() else []
+    # `terraform init` -> "init", `tflint --recursive` -> "tflint"
+    return passed, output, sorted(call[1] if call[0] == "terraform" else call[0] for call in calls)
+
+
+def test_first_run_inits_and_runs_every_tool(project):
+    passed, output, calls = stop(project)
+    assert passed
+    assert calls == ["fmt", "init", "tflint", "tfsec", "validate"]
+    assert "(cached)" not in output
+
+
+def test_unchanged_inputs_reuse_every_verdict(project):
+    stop(project)
+    passed, output, calls = stop(project)
+    assert passed
+    assert calls == []
+    assert output.count("(cached)") == 4
+
+
+def test_tfvars_change_reruns_only_the_tools_reading_it(project):
+    stop(project)
+    (project / "infra" / "prod.tfvars").write_text('region = "eu-west-1"\n')
+    assert stop(project)[2] == ["fmt", "tfsec"]
+
+
+def test_tf_change_without_new_modules_skips_init(project):
+    stop(project)
+    with open(project / "infra" / "main.tf", "a") as f:
+        f.write('\noutput "id" {\n  value = module.vpc.vpc_id\n}\n')
+    assert stop(project)[2] == ["fmt", "tflint", "tfsec", "validate"]
+
+
+def test_module_version_change_reinits(project):
+    stop(project)
+    main_tf = project / "infra" / "main.tf"
+    main_tf.write_text(main_tf.read_text().replace("5.0.0", "5.1.0"))
+    assert "init" in stop(project)[2]
+
+
+def test_failed_init_is_reported_and_not_memoized(project):
+    marker = Path(os.environ["FAKE_TOOLS_DIR"]) / "init_fails"
+    marker.touch()
+    passed, output, calls = stop(project)
+    assert not passed
+    assert "[FAIL] terraform init:\nFailed to install provider" in output
+    assert "validate" not in calls
+
+    marker.unlink()
+    passed, output, calls = stop(project)
+    assert passed
+    assert "init" in calls and "validate" in calls and "tflint" in calls
+    assert "[PASS] terraform validate\n" in output
+
+
+def test_only_runs_without_skips_or_init_failures_are_finished(project):
+    tools = Path(os.environ["FAKE_TOOLS_DIR"])
+    (tools / "tflint").rename(tools / "tflint.off")
+    passed, output, finished = run_tests_on_stop.run_terraform_tests(project)
+    assert passed and "[SKIP] tflint not installed" in output
+    assert not finished
+
+    (tools / "tflint.off").rename(tools / "tflint")
+    assert run_tests_on_stop.run_terraform_tests(project)[2]
+
+    (project / "infra" / "main.tf").write_text('module "vpc" {\n  source = "./vpc"\n}\n')
+    (tools / "init_fails").touch()
+    assert not run_tests_on_stop.run_terraform_tests(project)[2]
@@ -0,0 +1,123 @@
+import io
+import json
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import run_tests_on_stop
+import workspace_fingerprint
+from workspace_fingerprint import WorkspaceFingerprint
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'p'\n")
+    (tmp_path / "src" / "a.py").write_text("x = 1\n")
+    return tmp_path
+
+
+def fingerprint(project: Path, settings: str = "") -> WorkspaceFingerprint:
+    return WorkspaceFingerprint(project, "hook", [project / "src", project / "pyproject.toml"], settings)
+
+
+def test_verdict_is_reused_while_files_are_unchanged(project):
+    fingerprint(project).store({"decision": "block", "reason": "red"})
+    assert fingerprint(project).cached_verdict() == {"decision": "block", "reason": "red"}
+    assert (project / ".claude" / "hooks-cache" / ".gitignore").read_text() == "*\n"
+
+
+@pytest.mark.parametrize("change", [
+    lambda root: (root / "src" / "a.py").write_text("x = 2\n"),
+    lambda root: (root / "src" / "b.py").write_text("y = 1\n"),
+    lambda root: (root / "src" / "a.py").unlink(),
+    lambda root: (root / "pyproject.toml").write_text("[project]\nname = 'q'\n"),
+])
+def test_any_change_invalidates_the_verdict(project, change):
+    fingerprint(project).store({})
+    change(project)
+    assert fingerprint(project).cached_verdict() is None
+
+
+def test_settings_are_part_of_the_fingerprint(project):
+    fingerprint(project, "min_coverage=70").store({})
+    assert fingerprint(project, "min_coverage=80").cached_verdict() is None
+
+
+def test_caches_and_hidden_directories_are_ignored(project):
+    fingerprint(project).store({})
+    (project / "src" / "__pycache__").mkdir()
+    (project / "src" / "__pycache__" / "a.cpython-311.pyc").write_bytes(b"\0")
+    (project / "src" / ".hidden").mkdir()
+    (project / "src" / ".hidden" / "state").write_text("1")
+    assert fingerprint(project).cached_verdict() == {}
+
+
+@pytest.mark.parametrize("config", [".tfsec/config.yml", ".tflint.hcl"])
+def test_terraform_tool_configuration_is_part_of_the_fingerprint(project, config):
+    infra = project / "infra"
+    (infra / ".tfsec").mkdir(parents=True)
+    (infra / config).write_text("v1\n")
+    stop = WorkspaceFingerprint(project, "hook", [infra])
+    stop.store({})
+    (infra / config).write_text("v2\n")
+    assert WorkspaceFingerprint(project, "hook", [infra]).cached_verdict() is None
+
+
+def test_touch_without_content_change_keeps_the_verdict(project):
+    fingerprint(project).store({})
+    path = project / "src" / "a.py"
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    assert fingerprint(project).cached_verdict() == {}
+
+
+def test_disabled_cache(project, monkeypatch):
+    monkeypatch.setattr(workspace_fingerprint, "ENABLED", False)
+    fingerprint(project).store({})
+    assert fingerprint(project).cached_verdict() is None
+
+
+def stop_hook(project: Path, monkeypatch) -> dict:
+    monkeypatch.chdir(project)
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps({"hook_event_name": "Stop"})))
+    output = io.StringIO()
+    monkeypatch.setattr("sys.stdout", output)
+    run_tests_on_stop.main()
+    return json.loads(output.getvalue())
+
+
+def test_stop_verdict_of_a_finished_run_is_cached(project, monkeypatch):
+    runs = []
+    monkeypatch.setattr(run_tests_on_stop, "run_python_tests",
+                        lambda root: runs.append(root) or (True, "", 90.0, None, True))
+    assert stop_hook(project, monkeypatch) == {}
+    assert stop_hook(project, monkeypatch) == {}
+    assert len(runs) == 1
+
+
+@pytest.mark.parametrize("outcome", [
+    (False, "Tests timed out after 120 seconds:\n", None, None, False),
+    (True, "pytest not found, skipping tests", None, None, False),
+    (True, "Error running tests: boom", None, None, False),
+])
+def test_stop_verdict_of_an_unfinished_run_is_not_cached(project, monkeypatch, outcome):
+    runs = []
+    monkeypatch.setattr(run_tests_on_stop, "run_python_tests", lambda root: runs.append(root) or outcome)
+    first = stop_hook(project, monkeypatch)
+    assert (first.get("decision") == "block") == (not outcome[0])
+    stop_hook(project, monkeypatch)
+    assert len(runs) == 2
+
+
+def test_timeout_is_reported_as_unfinished(project, monkeypatch):
+    def timeout(*args, **kwargs):
+        raise subprocess.TimeoutExpired("pytest", 1)
+
+    monkeypatch.setattr(run_tests_on_stop.subprocess, "run", timeout)
+    monkeypatch.setattr(run_tests_on_stop, "TEST_SERVER", False)
+    passed, summary, _, _, finished = run_tests_on_stop.run_python_tests(project)
+    assert not passed and not finished
+    assert summary.startswith("Tests timed out")